@@ -0,0 +1,175 @@
+'''
+__main__.py (entry-point)
+Benchmark suite of the pricing pipeline.
+
+To run: `python -m benchmarks --scenario small` (from top-level folder)
+        `python -m benchmarks --gate` (regression gate, see regression.py)
+
+README.md for more information.
+'''
+import sys
+import json
+import argparse
+from benchmarks.suite import SCENARIOS, run_scenario, environment
+from cli_price_calculator_pkg.json_backend import set_backend, \
+                                                 BACKENDS as JSON_BACKENDS
+from benchmarks.regression import run_samples, baseline_path, load_baseline, \
+                                  save_baseline, compare, skipped, \
+                                  format_diff, BASELINE_DIR, WARMUP, REPEAT, THRESHOLD, \
+                                  SIGMA
+
+def extract_args():
+    '''
+    Returns the scenarios and options from CLI.
+
+    Args:
+        None
+    Returns:
+        (argparse.Namespace): scenario ([str]), seed (int), no_memory (bool),
+                              output (str), json_backend (str), the
+                              custom workload arguments,
+                              and the regression gate arguments
+    '''
+    parser = argparse.ArgumentParser(description="Benchmarks each phase of \
+                pricing synthetic carts against synthetic base-prices, and \
+                reports the timings as JSON.")
+
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, \
+                help="Named workload - repeat for several (default small).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of \
+                the generated workloads.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the \
+                (slower) peak memory measurement of each phase.")
+    parser.add_argument("--output", metavar="PATH", help="Write the report \
+                to PATH instead of stdout.")
+    parser.add_argument("--json-backend", choices=JSON_BACKENDS, \
+                default="auto", help="JSON decoder of the pipeline.")
+
+    custom = parser.add_argument_group("custom workload (instead of \
+                --scenario)")
+    custom.add_argument("--product-types", type=int)
+    custom.add_argument("--option-types", type=int)
+    custom.add_argument("--values-per-option", type=int)
+    custom.add_argument("--fanout", type=int)
+    custom.add_argument("--cart-size", type=int)
+    custom.add_argument("--skew", type=float)
+    custom.add_argument("--duplication", type=float)
+
+    gate = parser.add_argument_group("regression gate")
+    gate.add_argument("--gate", action="store_true", help="Sample the \
+                scenarios repeatedly and compare them with the baseline of \
+                this machine - exits with an error on a regression. The \
+                first run records the baseline.")
+    gate.add_argument("--update-baseline", action="store_true", help="Record \
+                the samples as the baseline of this machine.")
+    gate.add_argument("--baseline-dir", default=BASELINE_DIR, help="Directory \
+                of the baselines, one per machine fingerprint.")
+    gate.add_argument("--warmup", type=int, default=WARMUP, help="Untimed \
+                runs before sampling.")
+    gate.add_argument("--repeat", type=int, default=REPEAT, help="Timed \
+                samples per scenario.")
+    gate.add_argument("--threshold", type=float, default=THRESHOLD, \
+                help="Relative slowdown of a phase median tolerated.")
+    gate.add_argument("--sigma", type=float, default=SIGMA, help="Baseline \
+                robust standard deviations of a phase median tolerated.")
+
+    return parser.parse_args()
+
+def custom_params(args):
+    '''
+    Returns the custom workload of args - the small scenario, with any given
+    workload argument replaced - or None if no workload argument is given.
+
+    Args:
+        args (argparse.Namespace): Arguments (see extract_args()).
+    Returns:
+        (dict): Generator arguments, or None.
+    '''
+    given = {name: getattr(args, name) for name in SCENARIOS["small"] \
+                if getattr(args, name) is not None}
+    if not given:
+        return None
+    return dict(SCENARIOS["small"], **given)
+
+def main_gate(args, scenarios):
+    '''
+    Driver of the regression gate - samples the scenarios, and compares them
+    with the stored baseline of this machine (or records it).
+
+    Args:
+        args (argparse.Namespace): Arguments (see extract_args()).
+        scenarios ([tuple]): (name, params) of each scenario.
+    Returns:
+        None.
+    Raises:
+        SystemExit: if a phase regressed, or a scenario could not be compared
+                    with the baseline (recorded by --update-baseline).
+    '''
+    results = run_samples(scenarios, seed = args.seed, warmup = args.warmup, \
+                          repeat = args.repeat)
+    path = baseline_path(results["fingerprint"], args.baseline_dir)
+    baseline = load_baseline(path)
+
+    if baseline is None or args.update_baseline:
+        save_baseline(path, results)
+        print(f"Baseline recorded - {path}", file = sys.stderr)
+        return
+
+    rows = compare(baseline, results, threshold = args.threshold, \
+                   sigma = args.sigma)
+    if rows:
+        print(format_diff(rows))
+    unmatched = skipped(baseline, results)
+    for name, reason in unmatched:
+        print(f"Skipped scenario {name} - {reason}", file = sys.stderr)
+
+    regressed = [row for row in rows if row["regressed"]]
+    if regressed:
+        sys.exit(f"Benchmark regression in {len(regressed)} phase(s) - " + \
+                 ", ".join(f"{row['scenario']}/{row['phase']} " \
+                           f"{row['change']:+.1%}" for row in regressed))
+    if unmatched:
+        sys.exit(f"{len(unmatched)} scenario(s) not compared with the " \
+                 f"baseline {path} - record them with --update-baseline")
+
+def main():
+    '''
+    Driver program of the benchmark suite.
+
+    Args:
+        None
+    Returns:
+        None.
+    '''
+    args = extract_args()
+    try:
+        set_backend(args.json_backend)
+    except ValueError as error:
+        sys.exit(str(error))
+
+    scenarios = [(name, SCENARIOS[name]) for name in args.scenario or []]
+    params = custom_params(args)
+    if params is not None:
+        scenarios.append(("custom", params))
+    if not scenarios:
+        scenarios.append(("small", SCENARIOS["small"]))
+
+    if args.gate:
+        main_gate(args, scenarios)
+        return
+
+    results = [run_scenario(name, params, seed = args.seed, \
+                            memory = not args.no_memory) \
+                for name, params in scenarios]
+    report = json.dumps({"environment": environment(), "results": results}, \
+                        indent = 2)
+
+    if args.output:
+        with open(args.output, "w") as output_f:
+            output_f.write(report + "\n")
+    else:
+        print(report)
+
+################################### MAIN #######################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+'''
+generator.py
+Seeded generator of synthetic base-prices catalogs and carts.
+'''
+import json
+import random
+from itertools import product
+
+def option_values(option_type, values_per_option):
+    '''
+    Returns the values of a synthetic option-type.
+
+    Args:
+        option_type (str): Option-type, ex. "option-0".
+        values_per_option (int): Number of values.
+    Returns:
+        ([str]): Option-values.
+    '''
+    return [f"{option_type}-value-{index}" for index in range(values_per_option)]
+
+def generate_catalog(seed = 0, product_types = 10, option_types = 3, \
+                     values_per_option = 4, fanout = 2):
+    '''
+    Returns a synthetic base-prices catalog. Every product-type has
+    option_types option-types of values_per_option values each; the values
+    of each option-type are split into groups of fanout values, and there is
+    one base-price record per combination of groups - so every record
+    expands to (up to) fanout ** option_types leaves of the price-tree.
+
+    Args:
+        seed (int): Random seed - the same arguments give the same catalog.
+        product_types (int): Number of product-types.
+        option_types (int): Option-types per product-type.
+        values_per_option (int): Values per option-type.
+        fanout (int): Values per option-type in a single record (cartesian
+                      fan-out of a record).
+    Returns:
+        ([dict]): Base-price records, as in a base-prices JSON.
+    '''
+    rng = random.Random(seed)
+    records = []
+    for type_index in range(product_types):
+        product_type = f"product-{type_index}"
+        groups = []
+        for option_index in range(option_types):
+            option_type = f"option-{option_index}"
+            values = option_values(option_type, values_per_option)
+            groups.append([(option_type, values[start:start + fanout]) \
+                            for start in range(0, len(values), fanout)])
+
+        for combination in product(*groups):
+            records.append({
+                "product-type": product_type,
+                "options": dict(combination),
+                "base-price": rng.randrange(100, 10000),
+            })
+    return records
+
+def generate_cart(seed = 0, product_types = 10, option_types = 3, \
+                  values_per_option = 4, size = 1000, skew = 1.0, \
+                  duplication = 0.0):
+    '''
+    Returns a synthetic cart for the catalog of generate_catalog() with the
+    same product_types, option_types and values_per_option.
+
+    Args:
+        seed (int): Random seed - the same arguments give the same cart.
+        product_types (int), option_types (int), values_per_option (int): 
+            Shape of the catalog.
+        size (int): Number of line items.
+        skew (float): Zipf exponent of the product-type popularity (0 for
+                      uniform).
+        duplication (float): Probability of a line item repeating an earlier
+                             one (with its own quantity).
+    Returns:
+        ([dict]): Cart products, as in a cart JSON.
+    '''
+    rng = random.Random(seed)
+    types = [f"product-{index}" for index in range(product_types)]
+    weights = [1 / (rank + 1) ** skew for rank in range(product_types)]
+    values = {f"option-{index}": option_values(f"option-{index}", \
+                                               values_per_option) \
+                for index in range(option_types)}
+
+    cart = []
+    for _ in range(size):
+        if cart and rng.random() < duplication:
+            line = dict(rng.choice(cart))
+        else:
+            line = {
+                "product-type": rng.choices(types, weights)[0],
+                "options": {option_type: rng.choice(option_values) \
+                    for option_type, option_values in values.items()},
+                "artist-markup": rng.randrange(0, 101),
+            }
+        line["quantity"] = rng.randrange(1, 6)
+        cart.append(line)
+    return cart
+
+def write_json(path, data):
+    '''
+    Writes data to path as JSON.
+
+    Args:
+        path (str): Output file.
+        data (any): JSON data.
+    Returns:
+        None.
+    '''
+    with open(path, "w") as json_f:
+        json.dump(data, json_f)
@@ -0,0 +1,252 @@
+'''
+regression.py
+Benchmark regression gate - compares repeated timings of the benchmark
+scenarios (see suite.py) with a baseline stored per machine fingerprint.
+'''
+import gc
+import os
+import json
+import shutil
+import hashlib
+import platform
+import tempfile
+from statistics import median
+from benchmarks.suite import PHASES, write_workload, time_phases
+from cli_price_calculator_pkg.json_backend import get_backend
+
+# Baselines are stored under this directory, one JSON file per machine
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), \
+                            "baselines")
+# Untimed runs before sampling, and timed samples per scenario
+WARMUP = 1
+REPEAT = 5
+# A phase regresses when its median is more than THRESHOLD slower (relative)
+# and more than SIGMA robust standard deviations above the baseline median
+THRESHOLD = 0.10
+SIGMA = 3.0
+# Scale of the median absolute deviation to a standard deviation (normal)
+MAD_SCALE = 1.4826
+
+def machine_fingerprint():
+    '''
+    Returns the fingerprint of the machine and interpreter - timings are only
+    compared with baselines of the same fingerprint.
+
+    Args:
+        None
+    Returns:
+        (str): Hex digest of the machine, processor, CPU count, platform,
+               Python version and implementation, and JSON backend.
+    '''
+    machine = "|".join(str(part) for part in (platform.machine(), \
+                platform.processor(), os.cpu_count(), platform.system(), \
+                platform.release(), platform.python_implementation(), \
+                platform.python_version(), get_backend()))
+    return hashlib.sha1(machine.encode()).hexdigest()[:16]
+
+def baseline_path(fingerprint = None, baseline_dir = BASELINE_DIR):
+    '''
+    Returns the path of the baseline of a machine.
+
+    Args:
+        fingerprint (str): Machine fingerprint (this machine if None).
+        baseline_dir (str): Directory of the baselines.
+    Returns:
+        (str): Path of the baseline JSON.
+    '''
+    return os.path.join(baseline_dir, \
+                        f"{fingerprint or machine_fingerprint()}.json")
+
+def summarise(samples):
+    '''
+    Returns the summary statistics of timing samples.
+
+    Args:
+        samples ([float]): Seconds of each sample.
+    Returns:
+        (dict): samples, median, mad (median absolute deviation), min, max
+    '''
+    center = median(samples)
+    return {"samples": samples, "median": center, 
+            "mad": median(abs(sample - center) for sample in samples), 
+            "min": min(samples), "max": max(samples)}
+
+def sample_scenario(params, seed = 0, warmup = WARMUP, repeat = REPEAT):
+    '''
+    Times the phases of a scenario repeat times, after warmup untimed runs,
+    on a single generated workload.
+
+    Args:
+        params (dict): Generator arguments (see suite.SCENARIOS).
+        seed (int): Random seed.
+        warmup (int): Untimed runs.
+        repeat (int): Timed samples.
+    Returns:
+        (dict): Summary of the samples of each phase (see summarise()).
+    Raises:
+        ValueError: for a non-positive repeat, or a negative warmup.
+    '''
+    if repeat <= 0 or warmup < 0:
+        raise ValueError("repeat must be positive and warmup non-negative")
+
+    work_dir = tempfile.mkdtemp(prefix = "rb-benchmark-")
+    try:
+        json_prices, json_cart = write_workload(work_dir, params, seed)
+        for _ in range(warmup):
+            time_phases(json_prices, json_cart)
+        samples = {phase: [] for phase in PHASES}
+        for _ in range(repeat):
+            # Garbage of earlier samples is not collected within this one
+            gc.collect()
+            seconds, _ = time_phases(json_prices, json_cart)
+            for phase in PHASES:
+                samples[phase].append(seconds[phase])
+    finally:
+        shutil.rmtree(work_dir)
+
+    return {phase: summarise(samples[phase]) for phase in PHASES}
+
+def run_samples(scenarios, seed = 0, warmup = WARMUP, repeat = REPEAT):
+    '''
+    Samples every scenario (see sample_scenario()).
+
+    Args:
+        scenarios ([tuple]): (name, params) of each scenario.
+        seed, warmup, repeat: As for sample_scenario().
+    Returns:
+        (dict): Results - fingerprint, environment, and per scenario name: 
+                params, seed and phases.
+    '''
+    results = {"fingerprint": machine_fingerprint(), 
+               "environment": {"machine": platform.machine(), 
+                               "processor": platform.processor(), 
+                               "cpu_count": os.cpu_count(), 
+                               "platform": platform.platform(), 
+                               "python": platform.python_version()}, 
+               "scenarios": {}}
+    for name, params in scenarios:
+        results["scenarios"][name] = {"params": params, "seed": seed, 
+            "phases": sample_scenario(params, seed, warmup, repeat)}
+    return results
+
+def load_baseline(path):
+    '''
+    Returns the stored baseline at path, or None if there is none.
+
+    Args:
+        path (str): Path of the baseline JSON.
+    Returns:
+        (dict): Baseline (see run_samples()), or None.
+    '''
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r") as baseline_f:
+        return json.load(baseline_f)
+
+def save_baseline(path, results):
+    '''
+    Stores results as the baseline at path.
+
+    Args:
+        path (str): Path of the baseline JSON.
+        results (dict): Results of run_samples().
+    Returns:
+        None.
+    '''
+    os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+    with open(path, "w") as baseline_f:
+        json.dump(results, baseline_f, indent = 2)
+        baseline_f.write("\n")
+
+def mismatch(stored, current):
+    '''
+    Returns why a scenario of the current results cannot be compared with
+    the baseline, or None if it can.
+
+    Args:
+        stored (dict): Scenario of the baseline, or None.
+        current (dict): Same scenario of the current results.
+    Returns:
+        (str): Reason, or None.
+    '''
+    if stored is None:
+        return "not in the baseline"
+    if stored["params"] != current["params"]:
+        return "params differ from the baseline"
+    if stored["seed"] != current["seed"]:
+        return "seed differs from the baseline"
+    return None
+
+def skipped(baseline, results):
+    '''
+    Returns the scenarios of results that compare() skips (see mismatch()).
+
+    Args:
+        baseline (dict): Stored baseline (see run_samples()).
+        results (dict): Current results (see run_samples()).
+    Returns:
+        ([tuple]): (scenario, reason) per skipped scenario.
+    '''
+    unmatched = []
+    for name, current in results["scenarios"].items():
+        reason = mismatch(baseline["scenarios"].get(name), current)
+        if reason is not None:
+            unmatched.append((name, reason))
+    return unmatched
+
+def compare(baseline, results, threshold = THRESHOLD, sigma = SIGMA):
+    '''
+    Compares the phases of results with those of the baseline. A phase 
+    regresses when its median is both more than threshold (relative) slower
+    than the baseline median, and more than sigma robust standard deviations
+    (MAD_SCALE x MAD of the baseline samples) above it.
+
+    Scenarios missing from the baseline, or sampled with other params or
+    seed, are not compared (see skipped()).
+
+    Args:
+        baseline (dict): Stored baseline (see run_samples()).
+        results (dict): Current results (see run_samples()).
+        threshold (float): Relative slowdown tolerated, ex. 0.10 for 10%.
+        sigma (float): Robust standard deviations tolerated.
+    Returns:
+        ([dict]): Row per phase compared - scenario, phase, baseline and
+                  current median seconds, change (relative) and regressed.
+    '''
+    rows = []
+    for name, current in results["scenarios"].items():
+        stored = baseline["scenarios"].get(name)
+        if mismatch(stored, current) is not None:
+            continue
+
+        for phase in PHASES:
+            before = stored["phases"][phase]
+            after = current["phases"][phase]["median"]
+            change = (after - before["median"]) / before["median"] \
+                        if before["median"] else 0.0
+            noise = sigma * MAD_SCALE * before["mad"]
+            rows.append({"scenario": name, "phase": phase, 
+                         "baseline": before["median"], "current": after, 
+                         "change": change, 
+                         "regressed": change > threshold and \
+                                      after - before["median"] > noise})
+    return rows
+
+def format_diff(rows):
+    '''
+    Returns the comparison rows as a table, regressions marked.
+
+    Args:
+        rows ([dict]): Rows of compare().
+    Returns:
+        (str): Table - scenario, phase, baseline and current median (ms), 
+               change.
+    '''
+    lines = [f"{'':2}{'scenario':<12}{'phase':<12}{'baseline ms':>13}" \
+             f"{'current ms':>13}{'change':>10}"]
+    for row in rows:
+        mark = "!!" if row["regressed"] else ""
+        lines.append(f"{mark:<2}{row['scenario']:<12}{row['phase']:<12}" \
+                     f"{row['baseline'] * 1000:>13.3f}" \
+                     f"{row['current'] * 1000:>13.3f}{row['change']:>+10.1%}")
+    return "\n".join(lines)
@@ -0,0 +1,198 @@
+'''
+suite.py
+Benchmark suite of the pricing pipeline - times each phase of pricing a
+synthetic cart against a synthetic catalog (see generator.py).
+'''
+import os
+import time
+import shutil
+import platform
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.json_backend import load_path, get_backend, \
+                                                 get_decoders_used
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+from cli_price_calculator_pkg.memory_report import max_rss_bytes
+from benchmarks.generator import generate_catalog, generate_cart, write_json
+
+PHASES = ("json_load", "tree_build", "cart_load", "lookup", "total")
+
+# Named workloads - generator arguments
+SCENARIOS = {
+    "small": {"product_types": 5, "option_types": 2, "values_per_option": 4,
+              "fanout": 2, "cart_size": 1000, "skew": 1.0,
+              "duplication": 0.1},
+    "medium": {"product_types": 20, "option_types": 3, "values_per_option": 6,
+               "fanout": 2, "cart_size": 50000, "skew": 1.0,
+               "duplication": 0.2},
+    "large": {"product_types": 50, "option_types": 4, "values_per_option": 8,
+              "fanout": 2, "cart_size": 500000, "skew": 1.2,
+              "duplication": 0.3},
+}
+
+def write_workload(work_dir, params, seed = 0):
+    '''
+    Generates the catalog and cart of params into work_dir.
+
+    Args:
+        work_dir (str): Directory to write base-prices.json and cart.json to.
+        params (dict): Generator arguments (see SCENARIOS).
+        seed (int): Random seed.
+    Returns:
+        (tuple): Paths of the base-prices JSON and the cart JSON (str)
+    '''
+    shape = {"product_types": params["product_types"],
+             "option_types": params["option_types"],
+             "values_per_option": params["values_per_option"]}
+    json_prices = os.path.join(work_dir, "base-prices.json")
+    json_cart = os.path.join(work_dir, "cart.json")
+    write_json(json_prices, generate_catalog(seed, fanout = params["fanout"], \
+                                             **shape))
+    write_json(json_cart, generate_cart(seed, size = params["cart_size"], \
+                                        skew = params["skew"], \
+                                        duplication = params["duplication"], \
+                                        **shape))
+    return json_prices, json_cart
+
+def run_pipeline(json_prices, json_cart, measure):
+    '''
+    Runs the phases of the pricing pipeline, each within measure(phase).
+    tree_build compiles the base-price products decoded by json_load, so it
+    does not time their parse again.
+
+    Args:
+        json_prices (str): Path to the base-prices JSON.
+        json_cart (str): Path to the cart JSON.
+        measure (callable): Context manager factory, given the phase name.
+    Returns:
+        (dict): Items processed per phase (int), and the cart total.
+    '''
+    with measure("json_load"):
+        price_products = load_path(json_prices)
+        lines = len(load_path(json_cart))
+    records = len(price_products)
+
+    with measure("tree_build"):
+        prices = BaseProductData.from_records(price_products)
+    del price_products
+
+    with measure("cart_load"):
+        cart = Cart(json_cart)
+
+    with measure("lookup"):
+        base_price = prices.cart_product_base_price
+        for product in cart.products:
+            base_price(product)
+
+    with measure("total"):
+        cart_total = CLIPriceCalculator(cart, prices).cart_total
+
+    return {"json_load": records + lines, "tree_build": records, \
+            "cart_load": lines, "lookup": lines, "total": lines, \
+            "cart_total": cart_total}
+
+def time_phases(json_prices, json_cart):
+    '''
+    Times each phase of the pipeline.
+
+    Args:
+        json_prices (str): Path to the base-prices JSON.
+        json_cart (str): Path to the cart JSON.
+    Returns:
+        (tuple): Seconds per phase (dict), and the result of run_pipeline().
+    '''
+    seconds = {}
+
+    @contextmanager
+    def measure(phase):
+        start = time.perf_counter()
+        yield
+        seconds[phase] = time.perf_counter() - start
+
+    return seconds, run_pipeline(json_prices, json_cart, measure)
+
+def trace_phases(json_prices, json_cart):
+    '''
+    Measures the peak memory allocated by each phase of the pipeline (with
+    tracemalloc - in a separate run, as tracing slows the phases down).
+
+    Args:
+        json_prices (str): Path to the base-prices JSON.
+        json_cart (str): Path to the cart JSON.
+    Returns:
+        (dict): Peak bytes allocated per phase, above the memory in use at
+                its start.
+    '''
+    peak_bytes = {}
+
+    @contextmanager
+    def measure(phase):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        yield
+        peak_bytes[phase] = tracemalloc.get_traced_memory()[1] - start
+
+    tracemalloc.start()
+    try:
+        run_pipeline(json_prices, json_cart, measure)
+    finally:
+        tracemalloc.stop()
+    return peak_bytes
+
+def run_scenario(name, params, seed = 0, memory = True):
+    '''
+    Generates the workload of params and benchmarks the pipeline on it.
+
+    Args:
+        name (str): Scenario name, for the report.
+        params (dict): Generator arguments (see SCENARIOS).
+        seed (int): Random seed.
+        memory (bool): Measure the peak memory of each phase too.
+    Returns:
+        (dict): Report - scenario, params, seed, cart_total, and per phase:
+                seconds, items, items_per_second (and peak_bytes).
+    '''
+    work_dir = tempfile.mkdtemp(prefix = "rb-benchmark-")
+    try:
+        json_prices, json_cart = write_workload(work_dir, params, seed)
+        seconds, items = time_phases(json_prices, json_cart)
+        peak_bytes = trace_phases(json_prices, json_cart) if memory else {}
+    finally:
+        shutil.rmtree(work_dir)
+
+    phases = {}
+    for phase in PHASES:
+        phases[phase] = {"seconds": seconds[phase], "items": items[phase],
+                         "items_per_second": items[phase] / seconds[phase] \
+                                                if seconds[phase] else None}
+        if phase in peak_bytes:
+            phases[phase]["peak_bytes"] = peak_bytes[phase]
+
+    return {"scenario": name, "params": params, "seed": seed,
+            "cart_total": items["cart_total"], "phases": phases}
+
+def environment():
+    '''
+    Returns a description of the machine and interpreter running the suite.
+
+    Args:
+        None
+    Returns:
+        (dict): Python version and implementation, platform, machine, CPU
+                count, JSON backend (and the decoders that actually parsed
+                documents and arrays), and the peak resident set size so far
+                (if known).
+    '''
+    report = {"python": platform.python_version(),
+              "json_backend": get_backend(),
+              "json_decoders": get_decoders_used(),
+              "implementation": platform.python_implementation(),
+              "platform": platform.platform(), "machine": platform.machine(),
+              "cpu_count": os.cpu_count()}
+    rss = max_rss_bytes()
+    if rss is not None:
+        report["max_rss_bytes"] = rss
+    return report
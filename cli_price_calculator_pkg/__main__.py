@@ -7,68 +7,371 @@ Email: me@example.com
 
 README.md for more information.
 '''
+import os
 import sys
 import json
+import asyncio
 import argparse
 from cli_price_calculator_pkg.cart import Cart
-from cli_price_calculator_pkg.exceptions import CLIArgumentException
+from cli_price_calculator_pkg.cart_batch import CartBatch
+from cli_price_calculator_pkg.exceptions import CLIArgumentException, \
+                                               SchemaException
 from cli_price_calculator_pkg.product_data import BaseProductData
 from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+from cli_price_calculator_pkg.pricing_kernels import ENGINES
+from cli_price_calculator_pkg.batch import price_carts, write_results
+from cli_price_calculator_pkg.parallel import price_carts_parallel, CHUNK_SIZE
+from cli_price_calculator_pkg.server import PricingServer, MAX_CONCURRENT
+from cli_price_calculator_pkg.breakdown import BreakdownWriter, FORMATS
+from cli_price_calculator_pkg.profiling import enable, disable, phase, count
+from cli_price_calculator_pkg.memory_report import memory_report
+from cli_price_calculator_pkg.json_backend import set_backend, \
+                                                 set_whole_arrays, \
+                                                 BACKENDS as JSON_BACKENDS
 
 def extract_args():
     ''' 
-    Returns the retrieved cart and base-prices JSON files from CLI.
+    Returns the retrieved cart and base-prices JSON files, and options, from
+    CLI.
 
     Args:
         None
     Returns:
-        (tuple): cart JSON file, base-prices JSON file 
+        (argparse.Namespace): cart (cart JSON file), base_prices (base-prices
+                              JSON file), snapshot (snapshot file or None),
+                              lazy (bool), backend (str), cache_size (int),
+                              build_workers (int), validate (bool), 
+                              stream (bool), coalesce (bool), columnar (bool),
+                              engine (str), batch (bool), workers (int),
+                              chunk_size (int), unordered (bool), 
+                              serve (str), max_concurrent (int), 
+                              breakdown (str), breakdown_format (str),
+                              profile (bool), profile_lookups (bool),
+                              memory_report (bool), json_backend (str),
+                              json_whole_arrays (bool)
     Raises:
-        CLIArgumentException - for missing JSON file paths.
+        CLIArgumentException - for missing JSON file paths, or 
+                               --memory-report with --stream.
     '''
     parser = argparse.ArgumentParser(description="RedBubble CLI price \
                 calculator program. Calculates total price for a 'cart' given \
                 base-prices. Need cart and base-prices JSON files.")
 
-    parser.add_argument("cart", nargs="?", help="Cart JSON file")
+    parser.add_argument("cart", nargs="?", help="Cart JSON file (with --batch: \
+                a directory or glob of cart JSON files, an NDJSON file of \
+                carts, or - for NDJSON carts on stdin)")
     parser.add_argument("base_prices", nargs="?", help="Base Prices JSON file")
+    parser.add_argument("--snapshot", metavar="PATH", help="Binary snapshot \
+                of the compiled base-prices. Used while valid for the \
+                base-prices JSON, rebuilt otherwise.")
+    parser.add_argument("--lazy", action="store_true", help="Only generate \
+                the price-tree of product-types found in the cart.")
+    parser.add_argument("--backend", choices=BaseProductData.BACKENDS, \
+                default="dict", help="Storage of the compiled base-prices: \
+                nested-dicts (default) or integer-coded compact tables.")
+    parser.add_argument("--cache-size", type=int, metavar="N", help="Memoise \
+                up to N resolved base-prices (least recently used evicted).")
+    parser.add_argument("--build-workers", type=int, metavar="N", help="Generate \
+                the price-tree of each product-type in N worker processes.")
+    parser.add_argument("--validate", action="store_true", help="Validate \
+                the cart and base-prices JSON against the Schema/ contracts \
+                before any pricing work.")
+    parser.add_argument("--stream", action="store_true", help="Read the cart \
+                (JSON array or NDJSON) incrementally and price each product \
+                as it is read, in constant memory.")
+    parser.add_argument("--coalesce", action="store_true", help="Sum the \
+                quantities of cart products with the same product-type, \
+                relevant options and markup, and price each group once.")
+    parser.add_argument("--columnar", action="store_true", help="Store the \
+                cart products in columns (CartBatch) instead of one object \
+                per product.")
+    parser.add_argument("--engine", choices=ENGINES, default="python", \
+                help="Price one product at a time (default), or vectorised \
+                with numpy (falls back to python without numpy).")
+
+    parser.add_argument("--batch", action="store_true", help="Price many \
+                carts against one load of the base-prices, printing one NDJSON \
+                result (cart id, and total or error) per cart.")
+
+    parser.add_argument("--workers", type=int, metavar="N", help="Price in N \
+                worker processes sharing the base-prices - the carts of \
+                --batch, or else chunks of the line items of the cart.")
+    parser.add_argument("--chunk-size", type=int, metavar="N", \
+                default=CHUNK_SIZE, help=f"With --workers, carts sent to a \
+                worker per task (default {CHUNK_SIZE}).")
+    parser.add_argument("--unordered", action="store_true", help="With \
+                --workers, print results as soon as they are priced instead \
+                of in order of the carts.")
+
+    parser.add_argument("--serve", metavar="ADDRESS", help="Run a pricing \
+                daemon on a Unix socket path, or HOST:PORT (:PORT for \
+                localhost) over TCP, keeping the base-prices loaded. Only \
+                the base-prices JSON file is given.")
+    parser.add_argument("--max-concurrent", type=int, metavar="N", \
+                default=MAX_CONCURRENT, help=f"With --serve, requests in \
+                flight at once (default {MAX_CONCURRENT}).")
+
+    parser.add_argument("--breakdown", metavar="PATH", help="Write the \
+                base-price, markup amount, quantity and total of every line \
+                item to PATH (- for stdout) as it is priced.")
+    parser.add_argument("--breakdown-format", choices=FORMATS, \
+                default="ndjson", help="Format of --breakdown (default \
+                ndjson).")
+
+    parser.add_argument("--profile", action="store_true", help="Write the \
+                wall and CPU time of each phase, and counts of items, lookups, \
+                misses and tree nodes, as JSON to stderr.")
+    parser.add_argument("--profile-lookups", action="store_true", \
+                help="With --profile, also a latency histogram of every \
+                base-price lookup.")
+
+    parser.add_argument("--memory-report", action="store_true", \
+                help="Write the memory footprint of the cart JSON, the cart \
+                products, the base-prices and the price-index of each \
+                product-type as JSON to stderr (the cart is loaded whole, \
+                not with --stream).")
+
+    parser.add_argument("--json-backend", choices=JSON_BACKENDS, \
+                default="auto", help="Decoder of the cart and base-prices \
+                JSON: orjson when installed (auto, default), or the stdlib.")
+    parser.add_argument("--json-whole-arrays", action="store_true", \
+                help="With orjson, parse the base-prices array whole instead \
+                of streaming it element by element (holds it in memory).")
 
     args = parser.parse_args()
 
-    if not args.cart:
+    if args.serve:
+        # No cart - the only JSON file is the base-prices
+        if not args.base_prices:
+            args.cart, args.base_prices = None, args.cart
+    elif not args.cart:
         raise CLIArgumentException(message = "Missing cart JSON file.")
     if not args.base_prices:
         raise CLIArgumentException(message = "Missing base-prices JSON file.")
+    if args.memory_report and args.stream:
+        raise CLIArgumentException(message = "--memory-report loads the " + \
+                                   "whole cart, it cannot be used with --stream.")
 
-    return args.cart, args.base_prices
+    return args
 
-def main():
+def price_options(args):
+    '''
+    Returns the options of BaseProductData given on the CLI.
+
+    Args:
+        args (argparse.Namespace): Arguments (see extract_args()).
+    Returns:
+        (dict): Keyword arguments of BaseProductData.
     '''
-    Driver program to calculate the total cart price.
+    return {"snapshot": args.snapshot, "lazy": args.lazy, \
+            "backend": args.backend, "cache_size": args.cache_size, \
+            "workers": args.build_workers, "validate": args.validate}
 
-    Might exit early in the case of CLIArgumentException.
+def load_prices(args):
+    '''
+    Returns the BaseProductData of the base-prices JSON file and options.
 
     Args:
-        None
+        args (argparse.Namespace): Arguments (see extract_args()).
     Returns:
-        (int): The total price amount of cart in cents.
+        (BaseProductData): Loaded base-prices.
+    Raises:
+        SchemaException: for conflicting or invalid base-prices.
+    '''
+    return BaseProductData(args.base_prices, **price_options(args))
+
+def read_results(results, source):
+    '''
+    Yields the results of a batch, exiting if its source cannot be read - so
+    failing to read the carts is told apart from failing to write results.
+
+    Args:
+        results (iterable): Results of the batch (see batch.price_carts()).
+        source (str): Batch source.
+    Yields:
+        (dict): Result of each cart.
     '''
     try:
-        cart_json, prices_json = extract_args()
-    except CLIArgumentException as error:
+        yield from results
+    except OSError as error:
+        sys.exit(f"Something went wrong! Could not read {source} - {error}")
+
+def main_batch(args):
+    '''
+    Driver program to price a batch of carts (see batch.py) against a single
+    load of the base-prices. Prints one NDJSON result per cart.
+
+    Might exit early in the case of SchemaException for the base-prices, or
+    if the batch source cannot be read or the results cannot be written. 
+    Stops quietly if the reader of stdout goes away (ex. `| head`).
+
+    Args:
+        args (argparse.Namespace): Arguments (see extract_args()).
+    Returns:
+        None.
+    '''
+    try:
+        prices = load_prices(args)
+    except SchemaException as error:
         sys.exit(error.message)
 
+    options = {"validate": args.validate, "stream": args.stream, \
+               "columnar": args.columnar, "coalesce": args.coalesce, \
+               "engine": args.engine}
+    if args.workers:
+        try:
+            results = price_carts_parallel(args.cart, prices, args.workers, \
+                                           chunk_size = args.chunk_size, \
+                                           ordered = not args.unordered, \
+                                           **options)
+        except ValueError as error:
+            sys.exit(str(error))
+    else:
+        results = price_carts(args.cart, prices, **options)
+    try:
+        write_results(read_results(results, args.cart))
+    except BrokenPipeError:
+        # Nothing left to write to - point stdout at devnull, so flushing it
+        # at exit does not fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except OSError as error:
+        sys.exit(f"Something went wrong! Could not write results - {error}")
+
+def main_serve(args):
+    '''
+    Driver program of the pricing daemon (see server.py). Serves until 
+    interrupted.
+
+    Might exit early in the case of SchemaException for the base-prices.
+
+    Args:
+        args (argparse.Namespace): Arguments (see extract_args()).
+    Returns:
+        None.
+    '''
+    try:
+        server = PricingServer(args.base_prices, \
+                               max_concurrent = args.max_concurrent, \
+                               snapshot = args.snapshot, \
+                               backend = args.backend, \
+                               cache_size = args.cache_size, \
+                               workers = args.build_workers, \
+                               validate = args.validate)
+    except SchemaException as error:
+        sys.exit(error.message)
+
+    try:
+        asyncio.run(server.serve(args.serve))
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        sys.exit(f"Something went wrong! Could not listen on {args.serve} - " + \
+                 f"{error}")
+
+def main_cart(args):
+    '''
+    Driver program to calculate the total price of a single cart. Prints the
+    total price amount of cart in cents (and with --memory-report, writes the
+    memory footprint of the run to stderr, see memory_report.py).
+
+    Might exit early in the case of SchemaException.
+
+    Args:
+        args (argparse.Namespace): Arguments (see extract_args()).
+    Returns:
+        None.
+    '''
+    report = None
+    try:
+        if args.memory_report:
+            cart, prices, report = memory_report(args.cart, args.base_prices, \
+                                                 args.validate, \
+                                                 **price_options(args))
+        else:
 # ################ CART ####################
-    cart = Cart(cart_json)
+            cart = Cart(args.cart, validate = args.validate, \
+                        stream = args.stream)
 
 # ########## BASE-PRICES DATA ##############
-    prices = BaseProductData(prices_json)
+            prices = load_prices(args)
+
+        if args.columnar:
+            cart = CartBatch.from_products(cart.iter_products(), prices)
+    except SchemaException as error:
+        sys.exit(error.message)
 
 # ############ PRICE CALCULATOR ############
-    calculator = CLIPriceCalculator(cart, prices)
+    try:
+        breakdown = None
+        if args.breakdown:
+            breakdown = BreakdownWriter(args.breakdown, args.breakdown_format)
+        try:
+            calculator = CLIPriceCalculator(cart, prices, \
+                                            coalesce = args.coalesce, \
+                                            engine = args.engine, \
+                                            workers = args.workers, \
+                                            breakdown = breakdown)
+        finally:
+            if breakdown is not None:
+                breakdown.close()
+    except ValueError as error:
+        sys.exit(str(error))
+    except OSError as error:
+        sys.exit(f"Something went wrong! Could not write {args.breakdown} - " + \
+                 f"{error}")
+
+    if prices.cache is not None:
+        count("cache_hits", prices.cache.hits)
+        count("cache_misses", prices.cache.misses)
 
     print(f"{calculator.cart_total}\n")
+    if report is not None:
+        sys.stdout.flush()
+        sys.stderr.write(json.dumps(report) + "\n")
+
+def main():
+    '''
+    Driver program to calculate the total cart price - or to price a batch
+    of carts, or serve pricing requests. With --profile, writes the profile
+    of the run to stderr once done (see profiling.py).
+
+    Might exit early in the case of CLIArgumentException or SchemaException.
+
+    Args:
+        None
+    Returns:
+        None.
+    '''
+    try:
+        args = extract_args()
+    except CLIArgumentException as error:
+        sys.exit(error.message)
+
+    try:
+        set_backend(args.json_backend)
+        set_whole_arrays(args.json_whole_arrays)
+    except ValueError as error:
+        sys.exit(str(error))
+
+    profiler = None
+    if args.profile:
+        profiler = enable(histogram = args.profile_lookups)
+    try:
+        with phase("total"):
+            if args.serve:
+                main_serve(args)
+            elif args.batch:
+                main_batch(args)
+            else:
+                main_cart(args)
+    finally:
+        if profiler is not None:
+            disable()
+            profiler.write_report(sys.stderr)
 
 
 ################################### MAIN #######################################
-main()
\ No newline at end of file
+# Guarded, so worker processes importing this module do not run main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+'''
+batch.py
+'''
+import os
+import sys
+import glob
+import json
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.cart_batch import CartBatch
+from cli_price_calculator_pkg.exceptions import PriceCalcException
+from cli_price_calculator_pkg.json_stream import NDJSON_EXTENSIONS
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+
+# Magic characters of a glob pattern
+GLOB_CHARACTERS = "*?["
+
+def iter_cart_sources(source):
+    '''
+    Yields the carts of a batch source, one at a time:
+    - "-" -> an NDJSON stream of carts on stdin,
+    - an NDJSON file (.ndjson or .jsonl) -> one cart per line,
+    - a directory -> its *.json cart files, by name,
+    - a glob pattern (ex. "carts/*.json") -> the matching cart files, by name,
+    - otherwise -> the single cart file source.
+
+    A line of an NDJSON stream of carts is either the list of cart products,
+    or an object {"id": ..., "products": [...]}. Its cart id is "id", or the
+    index of the line.
+
+    Args:
+        source (str): Batch source.
+    Yields:
+        (tuple): cart id, and cart JSON file (str) or decoded line (list, 
+                 dict or None).
+    Raises:
+        OSError: if an NDJSON source cannot be read.
+    '''
+    if source == "-" or source.endswith(NDJSON_EXTENSIONS):
+        yield from iter_ndjson_carts(source)
+    elif os.path.isdir(source):
+        for cart_file in sorted(glob.glob(os.path.join(glob.escape(source), \
+                                                       "*.json"))):
+            yield cart_file, cart_file
+    elif any(character in source for character in GLOB_CHARACTERS):
+        for cart_file in sorted(glob.glob(source)):
+            yield cart_file, cart_file
+    else:
+        yield source, source
+
+def iter_ndjson_carts(source):
+    '''
+    Yields the carts of an NDJSON stream of carts (see iter_cart_sources()).
+    Lines that are not a JSON list or object are yielded as None, and 
+    reported as errors by price_cart().
+
+    Args:
+        source (str): NDJSON file, or "-" for stdin.
+    Yields:
+        (tuple): cart id, and decoded line (list or dict) or None.
+    Raises:
+        OSError: if source cannot be read.
+    '''
+    lines = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        index = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, (list, dict)):
+                record = None
+
+            cart_id = index
+            if isinstance(record, dict) and "id" in record:
+                cart_id = record["id"]
+            yield cart_id, record
+            index += 1
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+def price_cart(cart_id, cart, prices, validate = False, stream = False, \
+               columnar = False, coalesce = False, engine = "python"):
+    '''
+    Prices a single cart of a batch against prices. Errors - which would exit
+    the single cart CLI - are returned in the result instead.
+
+    Args:
+        cart_id (any): Id of the cart, returned with its result.
+        cart (str, list, dict or None): Cart JSON file, or decoded NDJSON 
+                                        line.
+        prices (BaseProductData): Base-prices, shared by the whole batch.
+        validate, stream, columnar: As for the Cart (see Cart, CartBatch).
+        coalesce, engine: As for CLIPriceCalculator.
+    Returns:
+        (dict): {"cart": cart_id, "total": cents} or
+                {"cart": cart_id, "error": message}
+    '''
+    try:
+        if isinstance(cart, str):
+            cart = Cart(cart, validate = validate, stream = stream)
+        else:
+            items = cart.get("products") if isinstance(cart, dict) else cart
+            if not isinstance(items, list):
+                return {"cart": cart_id, "error": "Malformed cart"}
+            cart = Cart.from_items(items, name = f"cart {cart_id}", \
+                                   validate = validate)
+
+        if columnar:
+            cart = CartBatch.from_products(cart.iter_products(), prices)
+        calculator = CLIPriceCalculator(cart, prices, coalesce = coalesce, \
+                                        engine = engine)
+    except PriceCalcException as error:
+        return {"cart": cart_id, "error": error.message}
+    except SystemExit as error:
+        return {"cart": cart_id, "error": str(error.code)}
+    except (KeyError, TypeError, AttributeError) as error:
+        # Cart product missing a field, or not an object
+        return {"cart": cart_id, "error": f"Malformed cart product - {error!r}"}
+
+    return {"cart": cart_id, "total": calculator.cart_total}
+
+def price_carts(source, prices, **options):
+    '''
+    Prices every cart of a batch source (see iter_cart_sources()) against the
+    same prices, one cart at a time.
+
+    Args:
+        source (str): Batch source.
+        prices (BaseProductData): Base-prices, loaded once for the batch.
+        options: Options of price_cart().
+    Yields:
+        (dict): Result of each cart (see price_cart()), in order.
+    '''
+    for cart_id, cart in iter_cart_sources(source):
+        yield price_cart(cart_id, cart, prices, **options)
+
+def write_results(results, out = None):
+    '''
+    Writes results as NDJSON - one line per cart, as each cart is priced, so
+    results stream out while the batch runs.
+
+    Args:
+        results (iterable): Results of price_cart().
+        out (file): Output stream (stdout if None).
+    Returns:
+        (tuple): Number of carts (int), number of errors (int)
+    '''
+    out = out or sys.stdout
+    count = errors = 0
+    for result in results:
+        out.write(json.dumps(result) + "\n")
+        count += 1
+        errors += "error" in result
+    out.flush()
+    return count, errors
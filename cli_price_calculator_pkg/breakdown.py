@@ -0,0 +1,109 @@
+'''
+breakdown.py
+'''
+import sys
+import csv
+import json
+
+FORMATS = ("ndjson", "csv")
+# Fields of a breakdown row, in order
+FIELDS = ("line", "product_type", "base_price", "markup", "quantity", \
+          "line_total")
+# Bytes buffered before a write to the output
+BUFFER_SIZE = 1 << 20
+
+class BreakdownWriter:
+    '''
+    Implementation of BreakdownWriter as the per-line-item price breakdown
+    output of CLIPriceCalculator - one row per line item (see FIELDS), as
+    NDJSON or CSV (with a header).
+    - Rows go through a large write buffer as items are priced, so the
+      breakdown is never held in memory.
+    - Use it as a context manager, or call close().
+    '''
+    def __init__(self, path, fmt = "ndjson", buffer_size = BUFFER_SIZE):
+        '''
+        Constructor for BreakdownWriter - opens the output.
+
+        Args:
+            path (str): Output file, or "-" for stdout.
+            fmt (str): One of FORMATS.
+            buffer_size (int): Bytes buffered before a write.
+        Returns:
+            None.
+        Raises:
+            ValueError: for an unknown fmt.
+            OSError: if path cannot be opened.
+        '''
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown breakdown format - {fmt}")
+
+        if path == "-":
+            sys.stdout.flush()
+            self.__out = open(sys.stdout.fileno(), "w", buffering = buffer_size, \
+                              newline = "", closefd = False)
+        else:
+            self.__out = open(path, "w", buffering = buffer_size, newline = "")
+
+        self.__csv = None
+        if fmt == "csv":
+            self.__csv = csv.writer(self.__out)
+            self.__csv.writerow(FIELDS)
+
+    def write_line(self, line, product, base_price, markup, line_total):
+        '''
+        Writes the breakdown row of a priced line item.
+
+        Args:
+            line (int): Index of the line item in the cart.
+            product (CartProduct): Line item.
+            base_price (int): Resolved base-price.
+            markup (int): Artist-markup amount, per item.
+            line_total (int): Line item total.
+        Returns:
+            None.
+        '''
+        row = (line, product.product_type, base_price, markup, \
+               product.quantity, line_total)
+        if self.__csv is not None:
+            self.__csv.writerow(row)
+        else:
+            self.__out.write(json.dumps(dict(zip(FIELDS, row))) + "\n")
+
+    def close(self):
+        '''
+        Flushes and closes the output (stdout is only flushed).
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.__out.close()
+
+    ##############################  Overridden  ################################
+
+    def __enter__(self):
+        '''
+        Context manager entry - the writer.
+        '''
+        return self
+
+    def __exit__(self, *exc_info):
+        '''
+        Context manager exit - closes the output.
+        '''
+        self.close()
+
+class BreakdownList(list):
+    '''
+    Implementation of BreakdownList as an in-memory breakdown - a list of
+    row dicts (see FIELDS), ex. for a response of the pricing daemon.
+    '''
+    def write_line(self, line, product, base_price, markup, line_total):
+        '''
+        Appends the breakdown row of a priced line item (see
+        BreakdownWriter.write_line()).
+        '''
+        self.append(dict(zip(FIELDS, (line, product.product_type, base_price, \
+                                       markup, product.quantity, line_total))))
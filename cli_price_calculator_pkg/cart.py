@@ -1,33 +1,245 @@
 '''
 cart.py
 '''
-import json
 import sys
 from cli_price_calculator_pkg.cart_product import CartProduct
+from cli_price_calculator_pkg.validators import get_validator, CART_SCHEMA
+from cli_price_calculator_pkg.json_stream import iter_json_records
+from cli_price_calculator_pkg.json_backend import load_path
+from cli_price_calculator_pkg.profiling import phase, count
 
 class Cart:
     '''
     Implementation of Cart as a representation of a Redbubble Cart.
     - Loads data from provided cart JSON.
+    - Optionally, validates the loaded data against Schema/cart.schema.json
+      before constructing any CartProduct.
     - Constructs CartProduct(s) from loaded data and stores them for later 
       recall.
+    - Optionally (stream), reads the cart JSON array or NDJSON incrementally
+      and yields CartProduct(s) lazily instead of storing them, so memory
+      stays constant regardless of the cart size.
+    - Stored products are line items with stable line ids (their position 
+      at load, then increasing), which can be added, removed or updated. 
+      Listeners (ex. LiveCartCalculator) are notified of every change.
     '''
-    def __init__(self, json_cart):
+    def __init__(self, json_cart, validate = False, stream = False):
         '''
         Constructor for Cart - intialise cart JSON.
 
         Args:
             (str): Path to the cart JSON.
+            validate (bool): Validate every cart product against the cart 
+                             schema before constructing CartProduct(s).
+            stream (bool): Do not load the cart - stream its products on
+                           every iteration (see iter_products()).
         Returns:
             None.
+        Raises:
+            ValidationException: for cart products violating the schema
+                                 (validate).
         '''
         self.__json_cart = json_cart
-        self.__loaded_cart = self.__load_cart()
-        self.__products = self.__load_products()
+        self.__stream = stream
+        if stream:
+            # Single streamed validation pass, before any product is priced
+            if validate:
+                get_validator(CART_SCHEMA).validate(self.__stream_cart(), \
+                                                    source = json_cart)
+            self.__products = None
+            self.__listeners = []
+            return
+
+        with phase("cart_load"):
+            self.__loaded_cart = self.__load_cart()
+            if validate:
+                get_validator(CART_SCHEMA).validate(self.__loaded_cart, \
+                                                    source = json_cart)
+            self.__set_lines(self.__load_products())
+        count("cart_items", len(self.__products))
+
+    @classmethod
+    def from_items(cls, items, name = None, validate = False):
+        '''
+        Returns the Cart of already decoded cart products (ex. one line of an
+        NDJSON stream of carts), without reading a cart JSON.
+
+        Args:
+            items (list): Cart products, as in a cart JSON.
+            name (str): Name of the cart, for json_cart and error messages.
+            validate (bool): Validate every cart product against the cart 
+                             schema before constructing CartProduct(s).
+        Returns:
+            (Cart): The cart of items.
+        Raises:
+            ValidationException: for cart products violating the schema
+                                 (validate).
+        '''
+        cart = cls.__new__(cls)
+        cart.__json_cart = name
+        cart.__stream = False
+        cart.__loaded_cart = items
+        with phase("cart_load"):
+            if validate:
+                get_validator(CART_SCHEMA).validate(items, source = name)
+            cart.__set_lines(cart.__load_products())
+        count("cart_items", len(cart.__products))
+        return cart
+
+    def __set_lines(self, products):
+        '''
+        Stores products as line items, with their positions as line ids.
+
+        Args:
+            products ([CartProduct]): Loaded cart products.
+        Returns:
+            None.
+        '''
+        self.__products = dict(enumerate(products))
+        self.__next_line_id = len(products)
+        self.__listeners = []
+
+    def add_listener(self, listener):
+        '''
+        Registers listener(line_id, old_product, new_product) to be called on
+        every change of a line item - old_product is None for an added line,
+        new_product is None for a removed line.
+
+        Listeners are called before the change is applied - a listener raising
+        rejects the change.
+
+        Args:
+            listener (callable): Change listener.
+        Returns:
+            None.
+        '''
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener):
+        '''
+        Unregisters listener (see add_listener()).
+
+        Args:
+            listener (callable): Change listener.
+        Returns:
+            None.
+        Raises:
+            ValueError: if listener is not registered.
+        '''
+        self.__listeners.remove(listener)
+
+    def __change(self, line_id, old_product, new_product):
+        '''
+        Notifies the listeners of a change, then applies it.
+
+        Args:
+            line_id (int): Changed line.
+            old_product (CartProduct): Line item before, or None (added).
+            new_product (CartProduct): Line item after, or None (removed).
+        Returns:
+            None.
+        Raises:
+            ValueError: for a streamed cart.
+        '''
+        if self.__stream:
+            raise ValueError("Streamed carts cannot be modified")
+
+        for listener in self.__listeners:
+            listener(line_id, old_product, new_product)
+
+        if new_product is None:
+            del self.__products[line_id]
+        else:
+            self.__products[line_id] = new_product
+
+    def add_product(self, cart_product):
+        '''
+        Adds cart_product as a new line item, after all the others.
+
+        Args:
+            cart_product (CartProduct): Product to add.
+        Returns:
+            (int): Line id of the new line item.
+        Raises:
+            ValueError: for a streamed cart.
+        '''
+        line_id = self.__next_line_id
+        self.__change(line_id, None, cart_product)
+        self.__next_line_id += 1
+        return line_id
+
+    def remove_product(self, line_id):
+        '''
+        Removes the line item line_id.
+
+        Args:
+            line_id (int): Line id of the line item.
+        Returns:
+            (CartProduct): The removed product.
+        Raises:
+            KeyError: for an unknown line_id.
+            ValueError: for a streamed cart.
+        '''
+        cart_product = self.get_product(line_id)
+        self.__change(line_id, cart_product, None)
+        return cart_product
+
+    def update_product(self, line_id, quantity = None, artist_markup = None):
+        '''
+        Changes the quantity and/or artist-markup of the line item line_id.
+
+        Args:
+            line_id (int): Line id of the line item.
+            quantity (int): New quantity (unchanged if None).
+            artist_markup (int): New artist-markup (unchanged if None).
+        Returns:
+            (CartProduct): The updated product.
+        Raises:
+            KeyError: for an unknown line_id.
+            ValueError: for a streamed cart.
+        '''
+        old_product = self.get_product(line_id)
+        new_product = CartProduct(old_product.product_type, \
+                    old_product.options, \
+                    old_product.artist_markup if artist_markup is None \
+                                              else artist_markup, \
+                    old_product.quantity if quantity is None else quantity)
+        self.__change(line_id, old_product, new_product)
+        return new_product
+
+    def get_product(self, line_id):
+        '''
+        Returns the line item line_id.
+
+        Args:
+            line_id (int): Line id of the line item.
+        Returns:
+            (CartProduct): The product.
+        Raises:
+            KeyError: for an unknown line_id (or a streamed cart).
+        '''
+        if self.__stream:
+            raise KeyError(line_id)
+        return self.__products[line_id]
+
+    def lines(self):
+        '''
+        Returns an iterator over the line items of the cart. (Line ids of a
+        streamed cart are positions.)
+
+        Args:
+            (self)
+        Returns:
+            (iterator): (line id, CartProduct) pairs, in order.
+        '''
+        if self.__stream:
+            return enumerate(self.iter_products())
+        return iter(self.__products.items())
 
     def __load_cart(self):
         '''
-        Loads cart JSON returned to and stored by self.__loaded_cart.
+        Loads cart JSON returned to and stored by self.__loaded_cart, read as
+        bytes and parsed by the JSON backend (see json_backend.py).
 
         -> Can cause early exit, if unable to load JSON file.
 
@@ -37,12 +249,28 @@ class Cart:
             (dict): JSON data from cart JSON.
         '''
         try:
-            with open(self.__json_cart, "r") as cart_f:
-                cart_data = json.load(cart_f)
+            cart_data = load_path(self.__json_cart)
         except:
             sys.exit(f"Something went wrong! Could not load {self.__json_cart}")
         return cart_data
 
+    def __stream_cart(self):
+        '''
+        Streams the cart products of cart JSON/NDJSON (see json_stream.py), 
+        one at a time.
+
+        -> Can cause early exit, if unable to load JSON file.
+
+        Args:
+            (self)
+        Yields:
+            (dict): Cart products from cart JSON.
+        '''
+        try:
+            yield from iter_json_records(self.__json_cart)
+        except (OSError, ValueError):
+            sys.exit(f"Something went wrong! Could not load {self.__json_cart}")
+
     def __load_products(self):
         '''
         Retrieve products from cart JSON and construct corresponding 
@@ -53,27 +281,52 @@ class Cart:
         Returns:
             ([CartProduct]): List of CartProducts from cart JSON.
         '''
-        products = []
-        for product in self.__loaded_cart:
+        return list(self.__construct_products(self.__loaded_cart))
+
+    def __construct_products(self, loaded_products):
+        '''
+        Constructs CartProduct(s) from cart products, one at a time.
+
+        Args:
+            loaded_products (iterable): Cart products from cart JSON.
+        Yields:
+            (CartProduct): CartProducts, in order.
+        '''
+        for product in loaded_products:
             product_type = product["product-type"]
             options = product["options"]
             markup = product["artist-markup"]
             quantity= product["quantity"]
 
-            cart_product = CartProduct(product_type, options, markup, quantity)
-            products.append(cart_product)
+            yield CartProduct(product_type, options, markup, quantity)
+
+    def iter_products(self):
+        '''
+        Returns an iterator over the products in cart - for a streamed cart,
+        a generator reading the cart JSON again, constructing each 
+        CartProduct only when it is reached.
 
-        return products
+        Args:
+            (self)
+        Returns:
+            (iterator): CartProduct(s), in order.
+        '''
+        if self.__stream:
+            return self.__construct_products(self.__stream_cart())
+        return iter(self.__products.values())
 
     def get_count(self):
         '''
-        Returns the amount of total products in cart.
+        Returns the amount of total products in cart. (For a streamed cart, 
+        the cart JSON is read again to count them.)
         
         Args:
             (self)
         Returns:
             (int): Number of stored products in cart.
         '''
+        if self.__stream:
+            return sum(1 for _ in self.__stream_cart())
         return len(self.__products)
 
     ##############################  Properties  ################################
@@ -86,9 +339,25 @@ class Cart:
         Args:
             (self)
         Returns
-            ([CartProduct]): List of CartProduct(s).
+            ([CartProduct]): List of CartProduct(s), in line order - for a
+                             streamed cart, a generator of them (see 
+                             iter_products()).
+        '''
+        if self.__stream:
+            return self.iter_products()
+        return list(self.__products.values())
+
+    @property
+    def stream(self):
+        '''
+        Property-based Getter for stream.
+
+        Args:
+            (self)
+        Returns
+            (bool): Whether the products are streamed from cart JSON.
         '''
-        return self.__products
+        return self.__stream
 
     @property
     def json_cart(self):
@@ -115,4 +384,5 @@ class Cart:
         Returns
             (str): String representation of all stored products in cart. 
         '''
-        return "\n" + "\n".join([str(product) for product in self.__products])
+        return "\n" + "\n".join([str(product) for product in \
+                                    self.iter_products()])
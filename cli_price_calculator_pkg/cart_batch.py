@@ -0,0 +1,272 @@
+'''
+cart_batch.py
+'''
+from array import array
+from cli_price_calculator_pkg.exceptions import SchemaException
+from cli_price_calculator_pkg.cart_product import SlottedCartProduct
+
+class CartBatch:
+    '''
+    Implementation of CartBatch as a columnar store of the products of a cart,
+    for carts too large to hold one CartProduct object per product.
+    - Product-types are interned to integer ids.
+    - Option values are encoded against the price_index of the base-prices:
+      each distinct price_index key (see BaseProductData.price_key()) is
+      stored once and referenced by an integer id.
+    - Artist-markups and quantities are stored in array columns.
+    - Quacks like a Cart (iter_products(), products, get_count()), yielding
+      SlottedCartProduct rows, so CLIPriceCalculator can price it.
+    '''
+    def __init__(self, prices):
+        '''
+        Constructor for CartBatch - empty batch, encoded against prices.
+
+        Args:
+            prices (BaseProductData): Base-prices to encode option values
+                                      against.
+        Returns:
+            None.
+        '''
+        self.__prices = prices
+
+        # product-type <-> id
+        self.__product_types = []
+        self.__product_type_ids = {}
+        # price_index key <-> id, and the cart options of its first product
+        self.__keys = []
+        self.__key_ids = {}
+        self.__key_options = []
+
+        self.__product_type_column = array("I")
+        self.__key_column = array("I")
+        self.__markup_column = array("i")
+        self.__quantity_column = array("q")
+
+    @classmethod
+    def from_products(cls, products, prices):
+        '''
+        Returns the CartBatch of products (ex. Cart.iter_products() of a
+        streamed Cart, so no list of CartProduct(s) is ever built).
+
+        Args:
+            products (iterable): CartProduct(s).
+            prices (BaseProductData): Base-prices to encode option values
+                                      against.
+        Returns:
+            (CartBatch): Batch of the products.
+        Raises:
+            SchemaException: If the product-type of a product is not in
+                             base-prices, its option values are unhashable, 
+                             or its artist-markup or quantity does not fit 
+                             its column.
+        '''
+        batch = cls(prices)
+        for product in products:
+            batch.append(product)
+        return batch
+
+    def append(self, cart_product):
+        '''
+        Appends cart_product to the columns.
+
+        Args:
+            cart_product (CartProduct): Product to append.
+        Returns:
+            None.
+        Raises:
+            SchemaException: If the product-type of cart_product is not in
+                             base-prices, its option values are unhashable, 
+                             or its artist-markup or quantity is not an 
+                             integer that fits its column.
+        '''
+        key = self.__prices.price_key(cart_product)
+        try:
+            key_id = self.__key_ids.get(key)
+        except TypeError:
+            # Unhashable (ex. list) option value in cart
+            raise SchemaException(f"Incorrect option values for - {cart_product}")
+
+        if key_id is None:
+            key_id = len(self.__keys)
+            self.__key_ids[key] = key_id
+            self.__keys.append(key)
+            # Rows of the key reuse the options of its first product
+            self.__key_options.append(cart_product.options)
+
+        product_type = key[0]
+        product_type_id = self.__product_type_ids.get(product_type)
+        if product_type_id is None:
+            product_type_id = len(self.__product_types)
+            self.__product_type_ids[product_type] = product_type_id
+            self.__product_types.append(product_type)
+
+        try:
+            self.__markup_column.append(cart_product.artist_markup)
+            self.__quantity_column.append(cart_product.quantity)
+        except (OverflowError, TypeError):
+            # Keep the columns the same length
+            del self.__markup_column[len(self.__product_type_column):]
+            raise SchemaException("Artist-markup or quantity out of range " + \
+                                  f"for - {cart_product}")
+        self.__product_type_column.append(product_type_id)
+        self.__key_column.append(key_id)
+
+    def base_prices(self):
+        '''
+        Resolves the base-price of every distinct price_index key, in key id
+        order - so the base-price of product i is
+        base_prices()[key_ids[i]].
+
+        Args:
+            (self)
+        Returns:
+            (array('q')): Base-price per key id.
+        Raises:
+            SchemaException: If a key has no base-price.
+        '''
+        base_prices = array("q")
+        for key_id in range(len(self.__keys)):
+            base_prices.append(self.__prices.cart_product_base_price( \
+                                                        self.row(key_id)))
+        return base_prices
+
+    def row(self, key_id, artist_markup = 0, quantity = 0):
+        '''
+        Returns a SlottedCartProduct of the key key_id.
+
+        Args:
+            key_id (int): Id of a price_index key.
+            artist_markup (int): Markup of the row.
+            quantity (int): Quantity of the row.
+        Returns:
+            (SlottedCartProduct): Row object.
+        '''
+        return SlottedCartProduct(self.__keys[key_id][0], \
+                                  self.__key_options[key_id], \
+                                  artist_markup, quantity)
+
+    def iter_products(self):
+        '''
+        Yields the products of the batch as SlottedCartProduct rows. Products
+        with the same price_index key share the options of the first of them
+        - identical for the option-types relevant to the base-prices.
+
+        Args:
+            (self)
+        Yields:
+            (SlottedCartProduct): Rows, in order.
+        '''
+        for key_id, markup, quantity in zip(self.__key_column, \
+                                            self.__markup_column, \
+                                            self.__quantity_column):
+            yield self.row(key_id, markup, quantity)
+
+    def get_count(self):
+        '''
+        Returns the amount of total products in the batch.
+
+        Args:
+            (self)
+        Returns:
+            (int): Number of products.
+        '''
+        return len(self.__key_column)
+
+    ##############################  Properties  ################################
+
+    @property
+    def products(self):
+        '''
+        Property-based Getter for products.
+
+        Args:
+            (self)
+        Returns
+            (generator): SlottedCartProduct rows (see iter_products()).
+        '''
+        return self.iter_products()
+
+    @property
+    def product_types(self):
+        '''
+        Property-based Getter for the interned product-types.
+
+        Args:
+            (self)
+        Returns
+            ([str]): Product-type per product-type id.
+        '''
+        return self.__product_types
+
+    @property
+    def keys(self):
+        '''
+        Property-based Getter for the interned price_index keys.
+
+        Args:
+            (self)
+        Returns
+            ([tuple]): price_index key per key id.
+        '''
+        return self.__keys
+
+    @property
+    def product_type_ids(self):
+        '''
+        Property-based Getter for the product-type id column.
+
+        Args:
+            (self)
+        Returns
+            (array('I')): Product-type id per product.
+        '''
+        return self.__product_type_column
+
+    @property
+    def key_ids(self):
+        '''
+        Property-based Getter for the price_index key id column.
+
+        Args:
+            (self)
+        Returns
+            (array('I')): Key id per product.
+        '''
+        return self.__key_column
+
+    @property
+    def artist_markups(self):
+        '''
+        Property-based Getter for the artist-markup column.
+
+        Args:
+            (self)
+        Returns
+            (array('i')): Artist-markup per product.
+        '''
+        return self.__markup_column
+
+    @property
+    def quantities(self):
+        '''
+        Property-based Getter for the quantity column.
+
+        Args:
+            (self)
+        Returns
+            (array('q')): Quantity per product.
+        '''
+        return self.__quantity_column
+
+    ##############################  Overridden  ################################
+
+    def __len__(self):
+        '''
+        Number of products in the batch.
+
+        Args:
+            (self)
+        Returns:
+            (int): Number of products.
+        '''
+        return len(self.__key_column)
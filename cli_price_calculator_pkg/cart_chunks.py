@@ -0,0 +1,195 @@
+'''
+cart_chunks.py
+'''
+import os
+import json
+from collections import deque
+from itertools import islice
+from cli_price_calculator_pkg.cart_product import CartProduct
+from cli_price_calculator_pkg.exceptions import SchemaException, \
+                                               PriceCalcException
+from cli_price_calculator_pkg.json_stream import NDJSON_EXTENSIONS
+from cli_price_calculator_pkg.pricing import product_total
+from cli_price_calculator_pkg.pool import create_pool, worker_prices, \
+                                         TASKS_PER_WORKER
+
+# Line items per task sent to a worker (carts other than NDJSON files)
+CHUNK_SIZE = 10000
+
+def price_line_items(products, prices):
+    '''
+    Prices a contiguous chunk of line items of a cart.
+
+    Args:
+        products (iterable): CartProduct(s) (ex. parsed lazily by a
+                             generator, so parsing errors are caught per 
+                             line item too).
+        prices (BaseProductData): Base-prices.
+    Returns:
+        (tuple): Number of line items priced (int), partial total (int), and
+                 the chunk index and message of the first error, or None.
+    '''
+    count = total = 0
+    try:
+        for product in products:
+            base_price = prices.cart_product_base_price(product)
+            total += product_total(base_price, product.artist_markup, \
+                                   product.quantity)
+            count += 1
+    except PriceCalcException as error:
+        return count, total, (count, error.message)
+    except SystemExit as error:
+        # Non-integer markup or quantity (CartProduct)
+        return count, total, (count, str(error.code))
+    except (KeyError, TypeError, AttributeError, ValueError) as error:
+        return count, total, (count, f"Malformed cart product - {error!r}")
+
+    return count, total, None
+
+def parse_line(line):
+    '''
+    Returns the CartProduct of an NDJSON line.
+
+    Args:
+        line (bytes): Line of an NDJSON cart.
+    Returns:
+        (CartProduct): Cart product of the line.
+    Raises:
+        ValueError, KeyError, TypeError: for a malformed line.
+    '''
+    product = json.loads(line)
+    return CartProduct(product["product-type"], product["options"], \
+                       product["artist-markup"], product["quantity"])
+
+def iter_range_lines(cart_f, start, end):
+    '''
+    Yields the non-blank lines starting within bytes [start, end) of cart_f.
+
+    Args:
+        cart_f (file): NDJSON cart, opened in binary mode.
+        start (int): First byte of the range.
+        end (int): Byte after the range.
+    Yields:
+        (bytes): Lines, in order.
+    '''
+    if start > 0:
+        # Skip the line started by the previous range
+        cart_f.seek(start - 1)
+        cart_f.readline()
+    else:
+        cart_f.seek(0)
+
+    while cart_f.tell() < end:
+        line = cart_f.readline()
+        if not line:
+            break
+        if line.strip():
+            yield line
+
+def price_byte_range(json_cart, start, end):
+    '''
+    Parses and prices the line items of NDJSON cart json_cart starting
+    within bytes [start, end), in a worker process.
+
+    Args:
+        json_cart (str): Path to an NDJSON cart.
+        start (int): First byte of the range.
+        end (int): Byte after the range.
+    Returns:
+        (tuple): As price_line_items().
+    '''
+    with open(json_cart, "rb") as cart_f:
+        lines = iter_range_lines(cart_f, start, end)
+        return price_line_items((parse_line(line) for line in lines), \
+                                worker_prices())
+
+def price_product_chunk(products):
+    '''
+    Prices a chunk of CartProduct(s), in a worker process.
+
+    Args:
+        products ([CartProduct]): Contiguous line items of a cart.
+    Returns:
+        (tuple): As price_line_items().
+    '''
+    return price_line_items(products, worker_prices())
+
+def iter_chunk_tasks(cart, workers, chunk_size):
+    '''
+    Yields the tasks splitting cart into contiguous chunks of line items -
+    byte ranges of a streamed NDJSON cart file (parsed by the workers), or
+    chunks of chunk_size CartProduct(s) otherwise.
+
+    Args:
+        cart (Cart or CartBatch): Cart to split.
+        workers (int): Number of worker processes.
+        chunk_size (int): Line items per chunk (not NDJSON files).
+    Yields:
+        (tuple): Task function and its arguments.
+    '''
+    json_cart = getattr(cart, "json_cart", None)
+    if getattr(cart, "stream", False) and json_cart.endswith(NDJSON_EXTENSIONS):
+        size = os.path.getsize(json_cart)
+        ranges = workers * TASKS_PER_WORKER
+        bounds = [size * index // ranges for index in range(ranges + 1)]
+        for start, end in zip(bounds, bounds[1:]):
+            if start < end:
+                yield price_byte_range, json_cart, start, end
+        return
+
+    products = cart.iter_products()
+    for chunk in iter(lambda: list(islice(products, chunk_size)), []):
+        yield price_product_chunk, chunk
+
+def price_cart_parallel(cart, prices, workers, chunk_size = CHUNK_SIZE):
+    '''
+    Prices the line items of a single cart in contiguous chunks, each parsed
+    and priced in a pool of worker processes sharing prices (see pool.py),
+    and reduces the partial integer totals - exactly the sequential total.
+
+    Args:
+        cart (Cart or CartBatch): Cart to price.
+        prices (BaseProductData): Base-prices built by the parent.
+        workers (int): Number of worker processes.
+        chunk_size (int): Line items per chunk (not NDJSON files).
+    Returns:
+        (int): The total value of products in cart.
+    Raises:
+        SchemaException: for the first line item (in cart order) that cannot
+                         be priced, with its global (0-based) index.
+        ValueError: for a non-positive workers or chunk_size.
+    '''
+    if workers <= 0 or chunk_size <= 0:
+        raise ValueError("workers and chunk_size must be positive")
+
+    cart_total = 0
+    # Line items of the chunks reduced so far - offset of the next chunk
+    offset = 0
+    max_pending = workers * TASKS_PER_WORKER
+
+    def reduce_chunk(future):
+        nonlocal cart_total, offset
+        count, total, error = future.result()
+        if error is not None:
+            index, message = error
+            exception = SchemaException()
+            exception.message = f"Line-item {offset + index}: {message}"
+            raise exception
+        cart_total += total
+        offset += count
+
+    with create_pool(workers, prices) as executor:
+        pending = deque()
+        try:
+            for task, *args in iter_chunk_tasks(cart, workers, chunk_size):
+                pending.append(executor.submit(task, *args))
+                if len(pending) >= max_pending:
+                    reduce_chunk(pending.popleft())
+            while pending:
+                reduce_chunk(pending.popleft())
+        except SchemaException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    return cart_total
@@ -3,12 +3,17 @@ cart_product_.py
 '''
 import sys
 
-class CartProduct:
+class SlottedCartProduct:
     '''
-    Implementation of CartProduct as a representation of a product in a provided
-    cart JSON consisting of its type, options, markup, and quantity.
+    Implementation of SlottedCartProduct as the __slots__ variant of 
+    CartProduct - the same attributes and accessors, without a per-instance
+    __dict__. For code that needs row objects of large carts (ex. rows of a 
+    CartBatch).
     -> Check Schema
     '''
+    __slots__ = ("__product_type", "__options", "__artist_markup", \
+                 "__quantity")
+
     def __init__(self, product_type, options, artist_markup, quantity):
         '''
         Initialises below mentioned attributes of a cart product.
@@ -110,3 +115,12 @@ class CartProduct:
         return f"\nType: {self.__product_type}\nOptions: {option_types}\n" + \
                 f"Markup: {self.__artist_markup}\nQuantity: {self.__quantity}\n"
 
+
+class CartProduct(SlottedCartProduct):
+    '''
+    Implementation of CartProduct as a representation of a product in a provided
+    cart JSON consisting of its type, options, markup, and quantity.
+    - Adds a per-instance __dict__ to SlottedCartProduct, so attributes can 
+      still be set on cart products.
+    -> Check Schema
+    '''
@@ -2,14 +2,27 @@
 cli_price_calculator.py
 '''
 from cli_price_calculator_pkg.exceptions import SchemaException
+from cli_price_calculator_pkg.coalesce import coalesce_products
+from cli_price_calculator_pkg.cart_batch import CartBatch
+from cli_price_calculator_pkg.pricing_kernels import total_cents
+from cli_price_calculator_pkg.cart_chunks import price_cart_parallel
+from cli_price_calculator_pkg.profiling import phase, instrument_lookup
+from cli_price_calculator_pkg.pricing import product_total, markup_amount
 import sys
 
 class CLIPriceCalculator:
     '''
     Implementation of CLIPriceCalculator as the central class to drive workflow
     from products in the Cart to calculating their totals via. BaseProductData.
+    - Optionally (coalesce), groups identically priced products and prices
+      each group once (see coalesce.py).
+    - Optionally (engine="numpy"), prices the cart as a CartBatch with the
+      vectorised kernel (see pricing_kernels.py).
+    - Optionally (workers), splits the line items of the cart into chunks 
+      priced in worker processes (see cart_chunks.py).
     '''
-    def __init__(self, cart, prices):
+    def __init__(self, cart, prices, coalesce = False, engine = "python", \
+                 workers = None, breakdown = None):
         '''
         Use the provided cart and base-prices to calculate the total value
         of the cart.
@@ -17,12 +30,30 @@ class CLIPriceCalculator:
         Args:
             cart (Cart): The Cart to calculate the total of.
             prices (BaseProductData): Database of base-prices -> price_tree
+            coalesce (bool): Sum the quantities of products with the same 
+                             product-type, relevant options and markup 
+                             before pricing.
+            engine (str): "python" - price one product at a time, or "numpy" 
+                          - vectorised over a CartBatch (falls back to a 
+                          python kernel without numpy; coalesce is ignored).
+            workers (int): Price chunks of line items in worker processes
+                           (coalesce and engine are ignored).
+            breakdown (BreakdownWriter): Write the base-price, markup, 
+                                         quantity and total of every line 
+                                         item to breakdown as it is priced
+                                         (coalesce, engine and workers are
+                                         ignored).
         Returns:
             None.
         '''
         self.__cart = cart
         self.__prices = prices
-        self.__cart_total = self.__calculate_cart_total_cents()
+        self.__coalesce = coalesce
+        self.__engine = engine
+        self.__workers = workers
+        self.__breakdown = breakdown
+        with phase("pricing"):
+            self.__cart_total = self.__calculate_cart_total_cents()
         
     def __calculate_cart_total_cents(self):
         '''
@@ -37,26 +68,101 @@ class CLIPriceCalculator:
         Returns:
             (int): The total value of products in cart.
         '''
+        if self.__breakdown is not None:
+            return self.__calculate_breakdown_total_cents()
+
+        if self.__workers:
+            try:
+                return price_cart_parallel(self.__cart, self.__prices, \
+                                           self.__workers)
+            except SchemaException as error:
+                sys.exit(error.message)
+
+        if self.__engine == "numpy":
+            return self.__calculate_batch_total_cents()
+
         cart_total = 0
 
-        for product in self.__cart.products:
+        # Consumed as a generator - a streamed cart is never materialised
+        products = self.__cart.iter_products()
+        if self.__coalesce:
+            try:
+                line_items = coalesce_products(products, self.__prices)
+            except SchemaException as error:
+                sys.exit(error.message)
+        else:
+            line_items = ((product, product.quantity) for product in products)
+
+        # The lookup itself unless profiling (see profiling.py)
+        cart_product_base_price = \
+            instrument_lookup(self.__prices.cart_product_base_price)
+
+        for product, quantity in line_items:
             artist_markup = product.artist_markup
-            quantity = product.quantity
 
             # Retrieve base-price of product from ProductData 
             try:
-                base_price = self.__prices.cart_product_base_price(product)
+                base_price = cart_product_base_price(product)
             except SchemaException as error:
                 sys.exit(error.message)
 
-            product_total = (base_price +   \
-                            round(base_price * (artist_markup / 100))) *  \
-                            quantity
+            cart_total += product_total(base_price, artist_markup, quantity)
+
+        return cart_total
+
+    def __calculate_breakdown_total_cents(self):
+        '''
+        Return the total cart price as __calculate_cart_total_cents(), one 
+        line item at a time, writing the breakdown of each line item as it
+        is priced.
+
+        Might exit early in case the SchemaException is encountered.
+
+        Args:
+            (self) 
+        Returns:
+            (int): The total value of products in cart.
+        '''
+        cart_total = 0
+        write_line = self.__breakdown.write_line
+        cart_product_base_price = \
+            instrument_lookup(self.__prices.cart_product_base_price)
+
+        for line, product in enumerate(self.__cart.iter_products()):
+            try:
+                base_price = cart_product_base_price(product)
+            except SchemaException as error:
+                sys.exit(error.message)
 
-            cart_total += product_total
+            markup = markup_amount(base_price, product.artist_markup)
+            line_total = product_total(base_price, product.artist_markup, \
+                                       product.quantity)
+            write_line(line, product, base_price, markup, line_total)
+            cart_total += line_total
 
         return cart_total
 
+    def __calculate_batch_total_cents(self):
+        '''
+        Return the total cart price, computed by the vectorised kernel over
+        the CartBatch of the cart (the cart itself, if already one).
+
+        Might exit early in case the SchemaException is encountered.
+
+        Args:
+            (self) 
+        Returns:
+            (int): The total value of products in cart.
+        '''
+        try:
+            batch = self.__cart
+            if not isinstance(batch, CartBatch):
+                batch = CartBatch.from_products(self.__cart.iter_products(), \
+                                                self.__prices)
+            return total_cents(batch, self.__engine)
+        except SchemaException as error:
+            sys.exit(error.message)
+
     ##############################  Properties  ################################
 
     @property
@@ -0,0 +1,43 @@
+'''
+coalesce.py
+'''
+from cli_price_calculator_pkg.exceptions import SchemaException
+
+def coalesce_products(products, prices):
+    '''
+    Groups cart products that price identically - same product-type, values
+    of the relevant option-types (their price_index key, see
+    BaseProductData.price_key()) and artist-markup - and sums their
+    quantities, so each group needs a single base-price lookup and markup
+    computation.
+
+    The product total is linear in quantity and computed in integers, so
+    pricing a group once with the summed quantity gives the exact same cart
+    total as pricing its products one by one.
+
+    Args:
+        products (iterable): CartProduct(s) (ex. Cart.iter_products()).
+        prices (BaseProductData): Base-prices the products are priced with.
+    Returns:
+        ([(CartProduct, int)]): First product of each group and the total
+                                quantity of the group, in order of first
+                                occurrence.
+    Raises:
+        SchemaException: If the product-type of a product is not in
+                         base-prices, or its option values are unhashable.
+    '''
+    groups = {}
+    for product in products:
+        key = (prices.price_key(product), product.artist_markup)
+        try:
+            group = groups.get(key)
+        except TypeError:
+            # Unhashable (ex. list) option value in cart
+            raise SchemaException(f"Incorrect option values for - {product}")
+
+        if group is None:
+            groups[key] = [product, product.quantity]
+        else:
+            group[1] += product.quantity
+
+    return [(product, quantity) for product, quantity in groups.values()]
@@ -0,0 +1,317 @@
+'''
+compact_index.py
+'''
+import sys
+from array import array
+from itertools import product
+from math import prod
+from cli_price_calculator_pkg.exceptions import SchemaException
+
+# Leaf value of an option combination without a base-price
+MISSING = -2 ** 31
+# Tables filling less than this share of their cells are kept as a dict
+# instead - below it, ~4 bytes per dense cell outweigh ~130 bytes per dict
+# entry (and its key tuple)
+MIN_DENSITY = 1 / 32
+
+class CompactPriceIndex:
+    '''
+    Implementation of CompactPriceIndex as a memory-compact alternative to the
+    nested-dict price_tree and flat price_index, with the same dict-like
+    (product-type, option-value-1, .., option-value-n) -> base-price lookups.
+    - Option-values are interned to small integer ids per product-type and
+      option position (ex. "white" -> 0, "dark" -> 1 for a hoodie's colour).
+    - The base-prices of a product-type are stored in a dense array('i')
+      table, addressed by the mixed-radix code of the option-value ids.
+    - Base-price products are staged unexpanded and only fanned out into the
+      table by compile(), which also detects conflicting base-prices.
+    - Sparse tables (see MIN_DENSITY), where the cartesian product of the
+      interned option-values is mostly empty, fall back to the dict backend's
+      (product-type, option-value-1, ..) -> base-price entries.
+    Memory is traded for lookup speed - a lookup adds up one offset per option
+    position, which is slower than the single hash of the dict backend's
+    price_index (see --cache-size for carts of repeated products).
+    '''
+    def __init__(self):
+        '''
+        Constructor for CompactPriceIndex - empty index.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        # (product-type, number of options) -> [{option-value: id}] per option
+        self.__values = {}
+        # product-type -> [(table key, [[value ids]] per option, base-price)]
+        self.__staged = {}
+        # (product-type, number of options) -> ([{option-value: offset}],
+        #                                        array('i') of base-prices)
+        #                                   or (None, {key: base-price}) sparse
+        self.__tables = {}
+        self.__length = 0
+
+    def add(self, product_type, options_tuples, base_price):
+        '''
+        Stages a base-price product, interning its option-values.
+
+        Args:
+            product_type (str): Type of product, ex. "hoodie"
+            options_tuples ([tuple]): (option-type, [option-values]) pairs,
+                                      sorted by option-type
+            base_price (int): base-price of the product
+        Returns:
+            None.
+        '''
+        table_key = (product_type, len(options_tuples))
+        if table_key not in self.__values:
+            self.__values[table_key] = [{} for _ in options_tuples]
+
+        value_ids = []
+        for ids, (_, options) in zip(self.__values[table_key], options_tuples):
+            value_ids.append([ids.setdefault(option, len(ids)) \
+                                for option in options])
+
+        if product_type not in self.__staged:
+            self.__staged[product_type] = []
+        self.__staged[product_type].append((table_key, value_ids, base_price))
+
+    def compile(self, product_type):
+        '''
+        Fans the staged base-price products of product_type out into its
+        tables - one per number of options, with a cell for every combination
+        of option-value ids; or into a dict of its keys, for a table the staged
+        base-price products would fill less than MIN_DENSITY of.
+
+        Args:
+            product_type (str): A product-type with staged base-price products.
+        Returns:
+            None.
+        Raises:
+            SchemaException: if the exact same product-type, options-
+                             -combination is staged with different base-prices,
+                             or a base-price does not fit the table.
+        '''
+        staged = self.__staged[product_type]
+        # Upper bound of the filled cells of each table
+        cells = {}
+        for table_key, value_ids, _ in staged:
+            cells[table_key] = cells.get(table_key, 0) + \
+                                prod(len(ids) for ids in value_ids)
+
+        tables, sparse_values = {}, {}
+        for table_key, value_ids, base_price in staged:
+            if table_key not in tables:
+                sizes = [len(ids) for ids in self.__values[table_key]]
+                if cells[table_key] < prod(sizes) * MIN_DENSITY:
+                    tables[table_key] = (None, {})
+                    # Option-values by id, per option
+                    sparse_values[table_key] = [list(ids) for ids in \
+                                                self.__values[table_key]]
+                else:
+                    strides = [1] * len(sizes)
+                    for position in range(len(sizes) - 2, -1, -1):
+                        strides[position] = strides[position + 1] * \
+                                            sizes[position + 1]
+                    tables[table_key] = (strides, array("i", [MISSING]) * \
+                                                  prod(sizes))
+            strides, leaves = tables[table_key]
+
+            if strides is None:
+                self.__fill_sparse(leaves, product_type, \
+                                   sparse_values[table_key], value_ids, \
+                                   base_price)
+                continue
+
+            if not MISSING < base_price < 2 ** 31:
+                raise SchemaException(f"Base-price out of range - {base_price}")
+
+            # An option-less product has a single cell, which (as in the
+            # price_tree) a later base-price replaces
+            if not value_ids:
+                leaves[0] = base_price
+                continue
+
+            for combination in product(*value_ids):
+                code = sum(value_id * stride for value_id, stride \
+                                in zip(combination, strides))
+                if leaves[code] != MISSING and leaves[code] != base_price:
+                    raise SchemaException("Same base-product has " + \
+                                          "different base values.")
+                leaves[code] = base_price
+
+        # Premultiply the ids by their stride, so a lookup only adds offsets
+        for table_key, (strides, leaves) in tables.items():
+            if strides is None:
+                del self.__values[table_key]
+                self.__tables[table_key] = (None, leaves)
+                self.__length += len(leaves)
+                continue
+            offsets = [{option: value_id * stride \
+                            for option, value_id in ids.items()} \
+                        for ids, stride in zip(self.__values.pop(table_key), \
+                                               strides)]
+            self.__tables[table_key] = (offsets, leaves)
+            self.__length += sum(1 for leaf in leaves if leaf != MISSING)
+
+        del self.__staged[product_type]
+
+    @staticmethod
+    def __fill_sparse(entries, product_type, options, value_ids, base_price):
+        '''
+        Fans a staged base-price product out into the dict of a sparse table.
+
+        Args:
+            entries (dict): (product-type, option-value-1, ..) -> base-price
+            product_type (str): Type of product, ex. "hoodie"
+            options ([[str]]): Option-values of the table by id, per option.
+            value_ids ([[int]]): Ids of its option-values, per option.
+            base_price (int): base-price of the product
+        Returns:
+            None.
+        Raises:
+            SchemaException: if a key is already filled with a different
+                             base-price.
+        '''
+        for combination in product(*(
+                    [position[value_id] for value_id in ids] \
+                        for position, ids in zip(options, value_ids))):
+            key = (product_type,) + combination
+            if entries.setdefault(key, base_price) != base_price:
+                raise SchemaException("Same base-product has " + \
+                                      "different base values.")
+
+    def product_type_bytes(self):
+        '''
+        Returns the bytes of the compiled tables of every product-type - their
+        offsets (or, sparse, their entries and key tuples) and base-price 
+        arrays; option-values counted once.
+
+        Args:
+            (self)
+        Returns:
+            (dict): product-type -> bytes.
+        '''
+        sizes = {}
+        seen = set()
+        for (product_type, _), (offsets, leaves) in self.__tables.items():
+            size = sys.getsizeof(leaves)
+            objects = []
+            if offsets is None:
+                for key, base_price in leaves.items():
+                    size += sys.getsizeof(key)
+                    objects.extend(key)
+                    objects.append(base_price)
+            else:
+                for position in offsets:
+                    size += sys.getsizeof(position)
+                    objects.extend(position)
+            for value in objects:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+            sizes[product_type] = sizes.get(product_type, 0) + size
+        return sizes
+
+    def discard(self, product_type):
+        '''
+        Drops the staged (uncompiled) base-price products of product_type,
+        ex. after compile() failed on them.
+
+        Args:
+            product_type (str): A product-type with staged base-price products.
+        Returns:
+            None.
+        '''
+        for table_key, _, _ in self.__staged.pop(product_type, []):
+            self.__values.pop(table_key, None)
+
+    def get(self, key, default = None):
+        '''
+        Returns the base-price for key, or default if key is not in the index.
+
+        Args:
+            key (tuple): (product-type, option-value-1, .., option-value-n)
+            default: Returned for a missing key.
+        Returns:
+            (int): Base-price.
+        '''
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        '''
+        Returns all (key, base-price) pairs of the index, table by table.
+
+        Args:
+            (self)
+        Returns:
+            ([tuple]): (key, base-price) pairs.
+        '''
+        pairs = []
+        for (product_type, _), (offsets, leaves) in self.__tables.items():
+            if offsets is None:
+                pairs.extend(leaves.items())
+                continue
+            by_offset = [sorted((offset, option) for option, offset \
+                                    in position.items()) \
+                         for position in offsets]
+            for combination in product(*by_offset):
+                code = sum(offset for offset, _ in combination)
+                if leaves[code] != MISSING:
+                    key = (product_type,) + \
+                            tuple(option for _, option in combination)
+                    pairs.append((key, leaves[code]))
+        return pairs
+
+    ##############################  Overridden  ################################
+
+    def __getitem__(self, key):
+        '''
+        Adds up the offsets of key's option-values to address its base-price
+        in the product-type's table (or looks key up, in a sparse table).
+
+        Args:
+            key (tuple): (product-type, option-value-1, .., option-value-n)
+        Returns:
+            (int): Base-price.
+        Raises:
+            KeyError: if key is not in the index.
+            TypeError: if an option-value is unhashable.
+        '''
+        offsets, leaves = self.__tables[(key[0], len(key) - 1)]
+        if offsets is None:
+            return leaves[key]
+
+        code = 0
+        for position, offset in enumerate(offsets, 1):
+            code += offset[key[position]]
+
+        base_price = leaves[code]
+        if base_price == MISSING:
+            raise KeyError(key)
+        return base_price
+
+    def __contains__(self, key):
+        '''
+        Membership (in) of key in the index.
+
+        Args:
+            key (tuple): (product-type, option-value-1, .., option-value-n)
+        Returns:
+            (bool): Whether key is in the index.
+        '''
+        return self.get(key) is not None
+
+    def __len__(self):
+        '''
+        Number of keys (option combinations with a base-price) in the index.
+
+        Args:
+            (self)
+        Returns:
+            (int): Number of keys.
+        '''
+        return self.__length
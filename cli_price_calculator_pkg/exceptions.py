@@ -72,3 +72,25 @@ class SchemaException(PriceCalcException):
     def __init__(self, message = None):
         super().__init__(message = message)
 
+class ValidationException(SchemaException):
+    '''
+    Used to represent input JSON records violating the Schema/*.json 
+    contracts, raised before any of the input is used.
+
+    Holds the index and violation of every offending record.
+    '''
+    def __init__(self, message = None, errors = None):
+        super().__init__(message = message)
+        self.__errors = errors or []
+
+    @property
+    def errors(self):
+        '''
+        Property-based Getter for errors.
+
+        Args:
+            (self)
+        Returns
+            ([tuple]): (record index, violation message) pairs.
+        '''
+        return self.__errors
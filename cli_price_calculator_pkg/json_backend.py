@@ -0,0 +1,184 @@
+'''
+json_backend.py
+'''
+import os
+import json
+import mmap
+from cli_price_calculator_pkg.json_stream import iter_json_array
+
+# Optional - accelerated decoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ("auto", "orjson", "stdlib")
+# Files of at least this many bytes are memory-mapped (orjson)
+MMAP_THRESHOLD = 1 << 20
+
+# Decoder in use - orjson when installed
+_backend = "orjson" if orjson is not None else "stdlib"
+# Parse arrays whole with orjson (iter_array()) instead of streaming them
+_whole_arrays = False
+# Decoders that actually parsed each kind of input - "documents" (loads(),
+# load_path()) and "arrays" (iter_array()) -> {"orjson", "stdlib"}
+_decoders_used = {}
+
+def set_backend(backend):
+    '''
+    Selects the JSON decoder of the loaders.
+
+    Args:
+        backend (str): One of BACKENDS - "auto" is orjson when installed,
+                       stdlib otherwise.
+    Returns:
+        (str): The decoder in use ("orjson" or "stdlib").
+    Raises:
+        ValueError: for an unknown backend, or orjson when not installed.
+    '''
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend - {backend}")
+    if backend == "auto":
+        backend = "orjson" if orjson is not None else "stdlib"
+    if backend == "orjson" and orjson is None:
+        raise ValueError("JSON backend orjson is not installed")
+    _backend = backend
+    return _backend
+
+def get_backend():
+    '''
+    Returns the JSON decoder in use ("orjson" or "stdlib") - the decoder of
+    whole documents. Arrays are streamed by the stdlib decoder unless parsed
+    whole (see iter_array()); see get_decoders_used() for what actually ran.
+    '''
+    return _backend
+
+def get_decoders_used():
+    '''
+    Returns the decoders that actually parsed the JSON loaded so far, by kind
+    of input - "documents" (loads(), load_path(), ex. a cart) and "arrays" 
+    (iter_array(), ex. the base-prices). A kind parsed by both decoders (ex.
+    a document orjson rejected, parsed again by the stdlib) lists both.
+
+    Args:
+        None
+    Returns:
+        (dict): kind -> sorted [decoder]
+    '''
+    return {kind: sorted(decoders) for kind, decoders in \
+                _decoders_used.items()}
+
+def record_decoder(kind, decoder):
+    '''
+    Records that decoder parsed an input of kind (see get_decoders_used()).
+
+    Args:
+        kind (str): "documents" or "arrays".
+        decoder (str): "orjson" or "stdlib".
+    Returns:
+        None.
+    '''
+    _decoders_used.setdefault(kind, set()).add(decoder)
+
+def set_whole_arrays(whole_arrays):
+    '''
+    Opts iter_array() in (or out) of parsing arrays whole with orjson.
+
+    Args:
+        whole_arrays (bool): Parse arrays whole when the decoder in use is 
+                             orjson, instead of streaming them.
+    Returns:
+        (bool): Whether arrays are parsed whole.
+    '''
+    global _whole_arrays
+    _whole_arrays = bool(whole_arrays)
+    return _whole_arrays
+
+def loads(data, kind = "documents"):
+    '''
+    Parses the JSON document data with the decoder in use.
+
+    Documents orjson rejects but the stdlib accepts (NaN/Infinity, integers
+    beyond 64 bits, non-UTF-8 encodings) are parsed again by the stdlib, so
+    both backends give identical results.
+
+    Args:
+        data (bytes, bytearray or memoryview): JSON document.
+        kind (str): Kind of input the decoder is recorded for (see 
+                    get_decoders_used()).
+    Returns:
+        (any): The decoded document.
+    Raises:
+        ValueError: if data is not valid JSON (json.JSONDecodeError).
+    '''
+    if _backend == "orjson":
+        try:
+            decoded = orjson.loads(data)
+            record_decoder(kind, "orjson")
+            return decoded
+        except orjson.JSONDecodeError:
+            pass
+    decoded = json.loads(bytes(data))
+    record_decoder(kind, "stdlib")
+    return decoded
+
+def load_path(json_path, mmap_threshold = MMAP_THRESHOLD, kind = "documents"):
+    '''
+    Reads json_path as bytes - memory-mapped when at least mmap_threshold
+    bytes and parsed by orjson, so the file is not copied to the heap - and
+    parses it with the decoder in use (see loads()).
+
+    Args:
+        json_path (str): Path to a JSON file.
+        mmap_threshold (int): Size from which the file is memory-mapped.
+        kind (str): Kind of input the decoder is recorded for (see 
+                    get_decoders_used()).
+    Returns:
+        (any): The decoded document.
+    Raises:
+        OSError: if json_path cannot be read.
+        ValueError: if the file is not valid JSON (json.JSONDecodeError).
+    '''
+    with open(json_path, "rb") as json_f:
+        size = os.fstat(json_f.fileno()).st_size
+        if _backend != "orjson" or size < mmap_threshold or size == 0:
+            return loads(json_f.read(), kind)
+
+        with mmap.mmap(json_f.fileno(), 0, access = mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return loads(view, kind)
+            finally:
+                view.release()
+
+def iter_array(json_path):
+    '''
+    Yields the elements of the top-level JSON array in json_path - streamed
+    incrementally by the stdlib decoder (see json_stream.iter_json_array()),
+    so the array is never held in memory. Only when opted in (see
+    set_whole_arrays()) and the decoder in use is orjson, parsed whole (see
+    load_path()) and then yielded - a faster parse, but the whole array is
+    held in memory and nothing is yielded until it is parsed, so the
+    consumer (ex. building the price_tree) no longer overlaps the read.
+
+    Args:
+        json_path (str): Path to a JSON file with an array at the top-level.
+    Yields:
+        (any): The decoded array elements, in order.
+    Raises:
+        OSError: if json_path cannot be read.
+        ValueError: if the file is not a JSON array.
+    '''
+    if _backend != "orjson" or not _whole_arrays:
+        record_decoder("arrays", "stdlib")
+        yield from iter_json_array(json_path)
+        return
+
+    elements = load_path(json_path, kind = "arrays")
+    if not isinstance(elements, list):
+        raise ValueError(f"Expecting a JSON array - {json_path}")
+    # Popped in order, so each element is released once consumed
+    elements.reverse()
+    while elements:
+        yield elements.pop()
@@ -0,0 +1,165 @@
+'''
+json_stream.py
+'''
+import json
+
+# Characters read from the file per chunk
+CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\n\r"
+# Characters that may follow an array element
+DELIMITERS = WHITESPACE + ",]"
+# Characters at the end of the buffer within which a decoding error may be
+# a token cut by the chunk boundary (ex. "tru", "1e", "\u00")
+TOKEN_MARGIN = 16
+# File extensions of newline-delimited JSON
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+def iter_json_array(json_path, chunk_size = CHUNK_SIZE):
+    '''
+    Incrementally parses the top-level JSON array in json_path, yielding one
+    element at a time. Only the element being decoded (and the rest of the
+    current chunk) is held in memory, never the whole array.
+
+    Elements are decoded with the stdlib json.JSONDecoder.raw_decode() over
+    buffered chunks - an element straddling a chunk boundary is decoded again
+    once more is read (doubling the read each time, so a large element costs
+    linear time). A decoding error away from the end of the buffer is raised
+    immediately, without reading the rest of the file.
+
+    Args:
+        json_path (str): Path to a JSON file with an array at the top-level.
+        chunk_size (int): Number of characters read per chunk.
+    Yields:
+        (any): The decoded array elements, in order.
+    Raises:
+        OSError: if json_path cannot be read.
+        ValueError: if the file is not a JSON array (json.JSONDecodeError).
+    '''
+    decoder = json.JSONDecoder()
+
+    with open(json_path, "r", encoding="utf-8") as json_f:
+        buffer = ""
+        index = 0
+        eof = False
+
+        def fill(buffer, index, size = chunk_size):
+            '''
+            Drops the consumed part of buffer and appends the next size
+            characters.
+            '''
+            chunk = json_f.read(size)
+            return buffer[index:] + chunk, 0, not chunk
+
+        def incomplete(error, buffer):
+            '''
+            Whether a decoding error may only be the end of the buffer 
+            cutting the element short (an unterminated string's error is at
+            its start).
+            '''
+            return error.pos >= len(buffer) - TOKEN_MARGIN or \
+                   error.msg.startswith("Unterminated string")
+
+        def skip_whitespace(buffer, index, eof):
+            '''
+            Advances index past whitespace, reading chunks as needed.
+            '''
+            while True:
+                while index < len(buffer) and buffer[index] in WHITESPACE:
+                    index += 1
+                if index < len(buffer) or eof:
+                    return buffer, index, eof
+                buffer, index, eof = fill(buffer, index)
+
+        buffer, index, eof = skip_whitespace(buffer, index, eof)
+        if not buffer.startswith("[", index):
+            raise json.JSONDecodeError("Expecting '['", buffer, index)
+        index += 1
+
+        buffer, index, eof = skip_whitespace(buffer, index, eof)
+        if buffer.startswith("]", index):
+            return
+
+        while True:
+            # Decode the next element, reading more until it is complete. A
+            # number cut by the end of the buffer decodes as its prefix (ex.
+            # "1e" -> 1), so an element is only accepted once a delimiter
+            # follows it, at end-of-file, or away from the end of the buffer
+            # (a malformed document, raised by the delimiter check).
+            size = chunk_size
+            while True:
+                try:
+                    element, end = decoder.raw_decode(buffer, index)
+                    if eof or end < len(buffer) and \
+                            (buffer[end] in DELIMITERS or \
+                             end < len(buffer) - TOKEN_MARGIN):
+                        break
+                except json.JSONDecodeError as error:
+                    if eof or not incomplete(error, buffer):
+                        raise
+                buffer, index, eof = fill(buffer, index, size)
+                size *= 2
+
+            yield element
+            index = end
+
+            buffer, index, eof = skip_whitespace(buffer, index, eof)
+            if buffer.startswith("]", index):
+                return
+            if not buffer.startswith(",", index):
+                raise json.JSONDecodeError("Expecting ',' delimiter", \
+                                           buffer, index)
+            buffer, index, eof = skip_whitespace(buffer, index + 1, eof)
+
+def iter_ndjson(json_path):
+    '''
+    Parses the newline-delimited JSON (NDJSON) file json_path one line at a
+    time, yielding one value per non-blank line.
+
+    Args:
+        json_path (str): Path to an NDJSON file.
+    Yields:
+        (any): The decoded values, in order.
+    Raises:
+        OSError: if json_path cannot be read.
+        ValueError: if a line is not valid JSON (json.JSONDecodeError).
+    '''
+    with open(json_path, "r", encoding="utf-8") as json_f:
+        for line in json_f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_json_records(json_path, chunk_size = CHUNK_SIZE):
+    '''
+    Incrementally yields the records of json_path, which is either:
+    - NDJSON (.ndjson or .jsonl extension) -> one record per line,
+    - a JSON array -> one record per element (see iter_json_array()),
+    - any other JSON document (ex. an empty {} cart) -> loaded whole and
+      iterated, as the non-streaming loaders do.
+
+    Args:
+        json_path (str): Path to the JSON/NDJSON file.
+        chunk_size (int): Number of characters read per chunk.
+    Yields:
+        (any): The decoded records, in order.
+    Raises:
+        OSError: if json_path cannot be read.
+        ValueError: if the file is not valid JSON/NDJSON.
+    '''
+    if json_path.endswith(NDJSON_EXTENSIONS):
+        yield from iter_ndjson(json_path)
+        return
+
+    with open(json_path, "r", encoding="utf-8") as json_f:
+        first = ""
+        while True:
+            chunk = json_f.read(chunk_size)
+            first = chunk.lstrip(WHITESPACE)[:1]
+            if first or not chunk:
+                break
+
+        if first != "[":
+            json_f.seek(0)
+            yield from json.load(json_f)
+            return
+
+    yield from iter_json_array(json_path, chunk_size)
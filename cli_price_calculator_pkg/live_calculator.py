@@ -0,0 +1,135 @@
+'''
+live_calculator.py
+'''
+from cli_price_calculator_pkg.pricing import product_total
+
+class LiveCartCalculator:
+    '''
+    Implementation of LiveCartCalculator as a calculator keeping the total of
+    a mutable Cart up to date as its line items change (see 
+    Cart.add_product(), remove_product() and update_product()).
+    - Keeps the resolved base-price and total of every line item, so a 
+      change only subtracts the old line total and adds the new one - O(1),
+      instead of pricing the whole cart again.
+    - A changed quantity or markup reuses the resolved base-price.
+    - A change that cannot be priced raises SchemaException, and is rejected
+      by the cart.
+    '''
+    def __init__(self, cart, prices):
+        '''
+        Prices every line item of cart, then listens to its changes.
+
+        Args:
+            cart (Cart): Stored (not streamed) cart to keep the total of.
+            prices (BaseProductData): Database of base-prices.
+        Returns:
+            None.
+        Raises:
+            SchemaException: If a line item has no base-price.
+        '''
+        self.__cart = cart
+        self.__prices = prices
+        # line id -> (base-price, line total)
+        self.__lines = {}
+        self.__cart_total = 0
+
+        for line_id, product in cart.lines():
+            self.__add_line(line_id, product, self.__base_price(product))
+
+        cart.add_listener(self.__on_change)
+
+    def __base_price(self, product):
+        '''
+        Resolves the base-price of product.
+
+        Args:
+            product (CartProduct): Product to price.
+        Returns:
+            (int): Base-price.
+        Raises:
+            SchemaException: If product has no base-price.
+        '''
+        return self.__prices.cart_product_base_price(product)
+
+    def __add_line(self, line_id, product, base_price):
+        '''
+        Adds the total of the line item line_id to the cart total.
+
+        Args:
+            line_id (int): Line id.
+            product (CartProduct): Line item.
+            base_price (int): Its base-price.
+        Returns:
+            None.
+        '''
+        line_total = product_total(base_price, product.artist_markup, \
+                                   product.quantity)
+        self.__lines[line_id] = (base_price, line_total)
+        self.__cart_total += line_total
+
+    def __on_change(self, line_id, old_product, new_product):
+        '''
+        Cart listener - updates the total for a changed line item (see
+        Cart.add_listener()).
+
+        Args:
+            line_id (int): Changed line.
+            old_product (CartProduct): Line item before, or None (added).
+            new_product (CartProduct): Line item after, or None (removed).
+        Returns:
+            None.
+        Raises:
+            SchemaException: If new_product has no base-price (the change is
+                             rejected, the total is unchanged).
+        '''
+        if new_product is not None:
+            if old_product is not None and \
+                    old_product.product_type == new_product.product_type and \
+                    old_product.options is new_product.options:
+                # Same product - only quantity or markup changed
+                base_price = self.__lines[line_id][0]
+            else:
+                base_price = self.__base_price(new_product)
+
+        if old_product is not None:
+            self.__cart_total -= self.__lines.pop(line_id)[1]
+        if new_product is not None:
+            self.__add_line(line_id, new_product, base_price)
+
+    def close(self):
+        '''
+        Stops following the changes of the cart.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.__cart.remove_listener(self.__on_change)
+
+    def line_total(self, line_id):
+        '''
+        Returns the total of the line item line_id.
+
+        Args:
+            line_id (int): Line id.
+        Returns:
+            (int): Line item total in cents.
+        Raises:
+            KeyError: for an unknown line_id.
+        '''
+        return self.__lines[line_id][1]
+
+    ##############################  Properties  ################################
+
+    @property
+    def cart_total(self):
+        '''
+        Property-based Getter for cart_total.
+
+        Args:
+            (self)
+        Returns
+            (int): the current total of the cart.
+        '''
+        return self.__cart_total
@@ -0,0 +1,292 @@
+'''
+memory_report.py
+'''
+import sys
+import tracemalloc
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.json_backend import load_path, iter_array, \
+                                                 get_backend, get_decoders_used
+from cli_price_calculator_pkg.product_data import BaseProductData
+
+# Optional - peak resident set size (not on Windows)
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def max_rss_bytes():
+    '''
+    Returns the peak resident set size of the process so far.
+
+    Args:
+        None
+    Returns:
+        (int): Bytes, or None where unavailable.
+    '''
+    if resource is None:
+        return None
+    # KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+def traced(allocations, name, build):
+    '''
+    Calls build() under tracemalloc (already started), recording the bytes
+    it left allocated and its peak above the memory in use before it.
+
+    Args:
+        allocations (dict): name -> {"retained_bytes", "peak_bytes"}, filled.
+        name (str): Name of the allocation.
+        build (callable): Builds the measured structure.
+    Returns:
+        (any): Result of build().
+    '''
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    allocations[name] = {"retained_bytes": current - start,
+                         "peak_bytes": peak - start}
+    return result
+
+def load_traced(json_cart, json_prices, validate_cart = False, **options):
+    '''
+    Loads the cart and base-prices as the CLI does, tracing the memory of
+    the decoded cart JSON, the CartProduct(s) built from it, and the
+    BaseProductData (including its streamed JSON parse).
+
+    -> Can cause early exit, if unable to load the cart JSON.
+
+    Args:
+        json_cart (str): Path to the cart JSON.
+        json_prices (str): Path to the base-prices JSON.
+        validate_cart (bool): Validate the cart products against the cart 
+                              schema (see Cart.from_items()).
+        options: Options of BaseProductData.
+    Returns:
+        (tuple): Cart, BaseProductData, and allocations (dict) - cart_json,
+                 cart_products and prices -> retained_bytes and peak_bytes.
+    Raises:
+        SchemaException: for conflicting or invalid base-prices, or (a
+                         ValidationException) cart products.
+    '''
+    def load_cart():
+        try:
+            return load_path(json_cart)
+        except (OSError, ValueError):
+            sys.exit(f"Something went wrong! Could not load {json_cart}")
+
+    allocations = {}
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        items = traced(allocations, "cart_json", load_cart)
+        cart = traced(allocations, "cart_products", \
+                      lambda: Cart.from_items(items, name = json_cart, \
+                                              validate = validate_cart))
+        prices = traced(allocations, "prices", \
+                        lambda: BaseProductData(json_prices, **options))
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return cart, prices, allocations
+
+def deep_sizeof(product_tree, seen):
+    '''
+    Returns the bytes of a product-type's price_tree level - its levels,
+    option-value keys and base-price leaves, each object counted once
+    (across calls sharing seen).
+
+    Args:
+        product_tree (dict or int): price_tree level of a product-type.
+        seen (set): Ids of the objects counted so far.
+    Returns:
+        (int): Bytes.
+    '''
+    size = 0
+    stack = [product_tree]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        size += sys.getsizeof(node)
+        if isinstance(node, dict):
+            stack.extend(node.keys())
+            stack.extend(node.values())
+    return size
+
+def product_tree_stats(product_tree, records):
+    '''
+    Returns the shape of a product-type's price_tree level.
+
+    Args:
+        product_tree (dict or int): price_tree level of a product-type (a
+                                    base-price if it has no options).
+        records (int): Number of its base-price products in the JSON.
+    Returns:
+        (dict): records, nodes (distinct levels), leaves (base-prices),
+                depth (option levels), mean_fanout and max_fanout (children
+                per level), expansion (leaves per record) and bytes (see
+                deep_sizeof()).
+    '''
+    nodes = leaves = depth = max_fanout = children = 0
+    seen = set()
+    stack = [(product_tree, 0)]
+    while stack:
+        node, level_depth = stack.pop()
+        if not isinstance(node, dict):
+            leaves += 1
+            depth = max(depth, level_depth)
+            continue
+        if id(node) in seen:
+            # Shared subtree - counted once
+            continue
+        seen.add(id(node))
+        nodes += 1
+        children += len(node)
+        max_fanout = max(max_fanout, len(node))
+        stack.extend((child, level_depth + 1) for child in node.values())
+
+    return {"records": records, "nodes": nodes, "leaves": leaves,
+            "depth": depth,
+            "mean_fanout": children / nodes if nodes else 0.0,
+            "max_fanout": max_fanout,
+            "expansion": leaves / records if records else None,
+            "bytes": deep_sizeof(product_tree, set())}
+
+def count_records(json_prices):
+    '''
+    Counts the base-price products of each product-type in the base-prices
+    JSON, streamed.
+
+    Args:
+        json_prices (str): Path to the base-prices JSON.
+    Returns:
+        (dict): product-type -> number of base-price products.
+    '''
+    records = {}
+    for price_product in iter_array(json_prices):
+        product_type = price_product["product-type"]
+        records[product_type] = records.get(product_type, 0) + 1
+    return records
+
+def index_report(prices, records):
+    '''
+    Returns the entries and size of the price_index of every product-type,
+    largest first, and their totals - the structure lookups read and the 
+    process keeps.
+
+    Args:
+        prices (BaseProductData): Loaded base-prices.
+        records (dict): product-type -> base-price products (see 
+                        count_records()).
+    Returns:
+        (dict): product_types (product-type -> records, entries, expansion 
+                - entries per record - and bytes: key tuples, option-values
+                and base-prices, each object counted once; None for a 
+                snapshot or shared price_index), and totals (records, 
+                entries, bytes - including the dict itself).
+    '''
+    price_index = prices.price_index
+    entries, sizes = {}, {}
+    if isinstance(price_index, dict):
+        seen = set()
+        for key, base_price in price_index.items():
+            product_type = key[0]
+            entries[product_type] = entries.get(product_type, 0) + 1
+            size = sys.getsizeof(key)
+            for value in key + (base_price,):
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+            sizes[product_type] = sizes.get(product_type, 0) + size
+        total_bytes = sys.getsizeof(price_index) + sum(sizes.values())
+    else:
+        for key, _ in price_index.items():
+            entries[key[0]] = entries.get(key[0], 0) + 1
+        product_type_bytes = getattr(price_index, "product_type_bytes", None)
+        if product_type_bytes is not None:
+            sizes = product_type_bytes()
+        total_bytes = sum(sizes.values()) if sizes else None
+
+    product_types = {}
+    for product_type, count in entries.items():
+        product_records = records.get(product_type, 0)
+        product_types[product_type] = {"records": product_records,
+            "entries": count,
+            "expansion": count / product_records if product_records else None,
+            "bytes": sizes.get(product_type)}
+
+    totals = {"records": sum(records.values()),
+              "entries": sum(entries.values()), "bytes": total_bytes}
+    ordered = dict(sorted(product_types.items(), \
+                          key = lambda item: (item[1]["bytes"] or 0, \
+                                              item[1]["entries"]), \
+                          reverse = True))
+    return {"product_types": ordered, "totals": totals}
+
+def tree_report(prices, records):
+    '''
+    Returns the shape and size of the price_tree view of every product-type
+    (see product_tree_stats()), largest first, and their totals. Only 
+    meaningful while the view is built (see 
+    BaseProductData.price_tree_built) - otherwise it is rebuilt from the 
+    price_index for the report.
+
+    Args:
+        prices (BaseProductData): Loaded base-prices.
+        records (dict): product-type -> base-price products (see 
+                        count_records()).
+    Returns:
+        (dict): product_types (product-type -> stats), and totals (records,
+                nodes, leaves, bytes - shared levels counted once).
+    '''
+    price_tree = prices.price_tree
+    product_types = {product_type: product_tree_stats(product_tree, \
+                                                records.get(product_type, 0)) \
+                        for product_type, product_tree in price_tree.items()}
+
+    seen = set()
+    totals = {"records": sum(records.values()),
+              "nodes": sum(stats["nodes"] for stats in product_types.values()),
+              "leaves": sum(stats["leaves"] \
+                                for stats in product_types.values()),
+              "bytes": sum(deep_sizeof(product_tree, seen) \
+                                for product_tree in price_tree.values())}
+    ordered = dict(sorted(product_types.items(), \
+                          key = lambda item: item[1]["bytes"], reverse = True))
+    return {"product_types": ordered, "totals": totals}
+
+def memory_report(json_cart, json_prices, validate_cart = False, **options):
+    '''
+    Loads the cart and base-prices, and reports their memory footprint -
+    the traced allocations of the cart JSON, the CartProduct(s) and the
+    base-prices (see load_traced()), the entries and size of every
+    product-type's price_index (see index_report()) and, only if the 
+    price_tree view is built, its shape (see tree_report()), and the peak 
+    RSS. Nothing is built for the report.
+
+    Args:
+        json_cart (str): Path to the cart JSON.
+        json_prices (str): Path to the base-prices JSON.
+        validate_cart (bool): Validate the cart products against the cart
+                              schema.
+        options: Options of BaseProductData.
+    Returns:
+        (tuple): Cart, BaseProductData and the report (dict).
+    Raises:
+        SchemaException: for conflicting or invalid base-prices, or (a
+                         ValidationException) cart products.
+    '''
+    cart, prices, allocations = load_traced(json_cart, json_prices, \
+                                            validate_cart, **options)
+    records = count_records(json_prices)
+    report = {"json_backend": get_backend(), 
+              "json_decoders": get_decoders_used(), "allocations": allocations,
+              "price_index": index_report(prices, records), 
+              "price_tree": tree_report(prices, records) \
+                                if prices.price_tree_built else None}
+    report["max_rss_bytes"] = max_rss_bytes()
+    return cart, prices, report
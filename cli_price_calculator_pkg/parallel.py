@@ -0,0 +1,84 @@
+'''
+parallel.py
+'''
+from collections import deque
+from itertools import islice
+from concurrent.futures import wait, as_completed, FIRST_COMPLETED
+from cli_price_calculator_pkg.batch import iter_cart_sources, price_cart
+from cli_price_calculator_pkg.pool import create_pool, worker_prices, \
+                                         TASKS_PER_WORKER
+
+# Carts per task sent to a worker
+CHUNK_SIZE = 64
+
+def price_chunk(chunk, options):
+    '''
+    Prices a chunk of carts in a worker process (see batch.price_cart()).
+
+    Args:
+        chunk ([tuple]): (cart id, cart) pairs.
+        options (dict): Options of price_cart().
+    Returns:
+        ([dict]): Result of each cart, in order.
+    '''
+    prices = worker_prices()
+    return [price_cart(cart_id, cart, prices, **options) \
+                for cart_id, cart in chunk]
+
+def price_carts_parallel(source, prices, workers, chunk_size = CHUNK_SIZE, \
+                         ordered = True, **options):
+    '''
+    Prices every cart of a batch source (see batch.iter_cart_sources()) in a
+    pool of worker processes sharing prices, built once by the parent (see
+    pool.py).
+
+    Carts are dispatched in chunks of chunk_size, with at most
+    TASKS_PER_WORKER chunks per worker in flight, so the source is read as
+    the results are consumed.
+
+    Args:
+        source (str): Batch source.
+        prices (BaseProductData): Base-prices, loaded once for the batch.
+        workers (int): Number of worker processes.
+        chunk_size (int): Carts per task.
+        ordered (bool): Yield the results in order of the source, or as soon
+                        as their chunk is priced.
+        options: Options of batch.price_cart().
+    Returns:
+        (generator): Result of each cart (see batch.price_cart()).
+    Raises:
+        ValueError: for a non-positive workers or chunk_size.
+    '''
+    if workers <= 0 or chunk_size <= 0:
+        raise ValueError("workers and chunk_size must be positive")
+    return _price_carts_parallel(source, prices, workers, chunk_size, \
+                                 ordered, options)
+
+def _price_carts_parallel(source, prices, workers, chunk_size, ordered, \
+                          options):
+    '''
+    Generator of price_carts_parallel(), once its arguments are checked.
+    '''
+    carts = iter_cart_sources(source)
+    chunks = iter(lambda: list(islice(carts, chunk_size)), [])
+    max_pending = workers * TASKS_PER_WORKER
+
+    with create_pool(workers, prices) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(price_chunk, chunk, options))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(price_chunk, chunk, options))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when = FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in as_completed(pending):
+                yield from future.result()
@@ -0,0 +1,63 @@
+'''
+pool.py
+'''
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Tasks in flight per worker - bounds the work read ahead of the results
+TASKS_PER_WORKER = 4
+
+# BaseProductData of a worker process (see init_worker())
+_prices = None
+
+def init_worker(prices):
+    '''
+    Initialiser of a pricing worker process. Under the fork start method,
+    prices is inherited from the parent (copy-on-write) rather than pickled.
+
+    Args:
+        prices (BaseProductData): Base-prices built by the parent.
+    Returns:
+        None.
+    '''
+    global _prices
+    _prices = prices
+
+def worker_prices():
+    '''
+    Returns the BaseProductData of the current worker process.
+
+    Args:
+        None
+    Returns:
+        (BaseProductData): Base-prices set by init_worker().
+    '''
+    return _prices
+
+def get_context():
+    '''
+    Returns the multiprocessing context of the pricing pools - fork where
+    available, so workers inherit the BaseProductData built by the parent.
+
+    Args:
+        None
+    Returns:
+        (multiprocessing.context.BaseContext): Context.
+    '''
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+def create_pool(workers, prices):
+    '''
+    Returns a pool of pricing worker processes sharing prices.
+
+    Args:
+        workers (int): Number of worker processes.
+        prices (BaseProductData): Base-prices built by the parent.
+    Returns:
+        (ProcessPoolExecutor): Pool, to use as a context manager.
+    '''
+    return ProcessPoolExecutor(workers, mp_context = get_context(), \
+                               initializer = init_worker, \
+                               initargs = (prices,))
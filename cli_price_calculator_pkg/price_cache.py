@@ -0,0 +1,167 @@
+'''
+price_cache.py
+'''
+from collections import OrderedDict
+
+class PriceCache:
+    '''
+    Implementation of PriceCache as a bounded, least-recently-used memo of
+    resolved base-prices, keyed on price_index keys (see
+    BaseProductData.price_key()).
+    - Misses of the price_index are cached too (as PriceCache.NEGATIVE), so a
+      repeatedly requested unknown option combination is not probed again.
+    - Counts hits, misses and evictions.
+    '''
+    # Cached value of a key without a base-price
+    NEGATIVE = object()
+
+    def __init__(self, max_size):
+        '''
+        Constructor for PriceCache - empty cache of at most max_size keys.
+
+        Args:
+            max_size (int): Maximum number of cached keys (> 0).
+        Returns:
+            None.
+        Raises:
+            ValueError: for a non-positive max_size.
+        '''
+        if max_size <= 0:
+            raise ValueError("PriceCache max_size must be positive")
+
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, key):
+        '''
+        Returns the cached value for key, marking it most recently used.
+
+        Args:
+            key (tuple): price_index key.
+        Returns:
+            (int), PriceCache.NEGATIVE or None: base-price, cached miss, or
+                                                None if key is not cached.
+        Raises:
+            TypeError: if key is unhashable.
+        '''
+        try:
+            value = self.__entries[key]
+        except KeyError:
+            self.__misses += 1
+            return None
+
+        self.__entries.move_to_end(key)
+        self.__hits += 1
+        return value
+
+    def put(self, key, value):
+        '''
+        Caches value for key, evicting the least recently used key if the
+        cache is full.
+
+        Args:
+            key (tuple): price_index key.
+            value (int or PriceCache.NEGATIVE): base-price, or cached miss.
+        Returns:
+            None.
+        '''
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last = False)
+            self.__evictions += 1
+
+    def clear(self):
+        '''
+        Empties the cache (ex. once the base-prices are replaced). Counters
+        are kept.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.__entries.clear()
+
+    def stats(self):
+        '''
+        Returns the cache counters.
+
+        Args:
+            (self)
+        Returns:
+            (dict): size, max_size, hits, misses, evictions.
+        '''
+        return {
+            "size": len(self.__entries),
+            "max_size": self.__max_size,
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "evictions": self.__evictions,
+        }
+
+    ##############################  Properties  ################################
+
+    @property
+    def max_size(self):
+        '''
+        Property-based Getter for max_size.
+
+        Args:
+            (self)
+        Returns
+            (int): Maximum number of cached keys.
+        '''
+        return self.__max_size
+
+    @property
+    def hits(self):
+        '''
+        Property-based Getter for hits.
+
+        Args:
+            (self)
+        Returns
+            (int): Number of lookups answered from the cache.
+        '''
+        return self.__hits
+
+    @property
+    def misses(self):
+        '''
+        Property-based Getter for misses.
+
+        Args:
+            (self)
+        Returns
+            (int): Number of lookups not in the cache.
+        '''
+        return self.__misses
+
+    @property
+    def evictions(self):
+        '''
+        Property-based Getter for evictions.
+
+        Args:
+            (self)
+        Returns
+            (int): Number of keys evicted to stay within max_size.
+        '''
+        return self.__evictions
+
+    ##############################  Overridden  ################################
+
+    def __len__(self):
+        '''
+        Number of cached keys.
+
+        Args:
+            (self)
+        Returns:
+            (int): Number of cached keys.
+        '''
+        return len(self.__entries)
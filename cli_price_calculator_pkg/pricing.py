@@ -0,0 +1,30 @@
+'''
+pricing.py
+'''
+
+def markup_amount(base_price, artist_markup):
+    '''
+    Returns the artist-markup of a product - its percentage of the base-price,
+    rounded (half to even) to a whole cent.
+
+    Args:
+        base_price (int): Base-price of the product.
+        artist_markup (int): Percentage increase for artist.
+    Returns:
+        (int): Markup in cents.
+    '''
+    return round(base_price * (artist_markup / 100))
+
+def product_total(base_price, artist_markup, quantity):
+    '''
+    Returns the total of a line item - its base-price plus the (rounded)
+    artist-markup (see markup_amount()), times its quantity.
+
+    Args:
+        base_price (int): Base-price of the product.
+        artist_markup (int): Percentage increase for artist.
+        quantity (int): Quantity.
+    Returns:
+        (int): Line item total in cents.
+    '''
+    return (base_price + markup_amount(base_price, artist_markup)) * quantity
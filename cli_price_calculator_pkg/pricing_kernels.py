@@ -0,0 +1,79 @@
+'''
+pricing_kernels.py
+'''
+from cli_price_calculator_pkg.pricing import product_total
+
+# Optional - the numpy engine falls back to the python kernel without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ENGINES = ("python", "numpy")
+
+def total_cents_python(base_prices, key_ids, artist_markups, quantities):
+    '''
+    Returns the total of the product totals (see pricing.product_total()),
+    one product at a time.
+
+    Args:
+        base_prices (sequence): Base-price per key id (CartBatch.base_prices()).
+        key_ids (sequence): Key id per product.
+        artist_markups (sequence): Artist-markup per product.
+        quantities (sequence): Quantity per product.
+    Returns:
+        (int): Total in cents.
+    '''
+    cart_total = 0
+    for key_id, artist_markup, quantity in zip(key_ids, artist_markups, \
+                                               quantities):
+        cart_total += product_total(base_prices[key_id], artist_markup, \
+                                    quantity)
+    return cart_total
+
+def total_cents_numpy(base_prices, key_ids, artist_markups, quantities):
+    '''
+    Vectorised total_cents_python() - the product totals are computed as
+    whole-array int64/float64 operations, summed by a single reduction.
+
+    Bit-for-bit identical to the python kernel: the markup is computed on the
+    same float64 values (base_price * (artist_markup / 100.0)) and rounded
+    with numpy.rint(), which rounds half to even like round(). Totals must
+    fit in an int64.
+
+    Args:
+        base_prices (sequence): Base-price per key id (CartBatch.base_prices()).
+        key_ids (sequence): Key id per product.
+        artist_markups (sequence): Artist-markup per product.
+        quantities (sequence): Quantity per product.
+    Returns:
+        (int): Total in cents.
+    '''
+    if not len(key_ids):
+        return 0
+
+    base_price = numpy.asarray(base_prices, dtype = numpy.int64)[ \
+                    numpy.asarray(key_ids, dtype = numpy.intp)]
+    markup = numpy.asarray(artist_markups, dtype = numpy.float64) / 100.0
+    marked_up = numpy.rint(base_price * markup).astype(numpy.int64)
+    quantity = numpy.asarray(quantities, dtype = numpy.int64)
+
+    return int(((base_price + marked_up) * quantity).sum())
+
+def total_cents(batch, engine = "numpy"):
+    '''
+    Returns the total of CartBatch batch with the kernel of engine, falling
+    back to the python kernel if numpy is not installed.
+
+    Args:
+        batch (CartBatch): Products to total.
+        engine (str): One of ENGINES.
+    Returns:
+        (int): Total in cents.
+    Raises:
+        SchemaException: If a product has no base-price.
+    '''
+    kernel = total_cents_numpy if engine == "numpy" and numpy is not None \
+                               else total_cents_python
+    return kernel(batch.base_prices(), batch.key_ids, batch.artist_markups, \
+                  batch.quantities)
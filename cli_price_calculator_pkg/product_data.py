@@ -1,48 +1,538 @@
 '''
 product_data.py
 '''
-import json
+import os
 import sys
+import struct
+from concurrent.futures import ProcessPoolExecutor
 from cli_price_calculator_pkg.exceptions import SchemaException
+from cli_price_calculator_pkg.json_backend import iter_array
+from cli_price_calculator_pkg.compact_index import CompactPriceIndex
+from cli_price_calculator_pkg.tree_sharing import share_subtrees, share_index
+from cli_price_calculator_pkg.price_cache import PriceCache
+from cli_price_calculator_pkg.shared_prices import attach_shared_index
+from cli_price_calculator_pkg.validators import get_validator, \
+                                               BASE_PRICES_SCHEMA
+from cli_price_calculator_pkg.snapshot import load_snapshot, write_snapshot, \
+                                             source_fingerprint
+from cli_price_calculator_pkg.profiling import phase, count, get_profiler, \
+                                              count_tree_nodes
+
+def insert_price_product(price_tree, relevant_options, price_product):
+    '''
+    Inserts the base-price of a single base-price product into the price_tree
+    level of its product-type, recording its option-types in 
+    relevant_options.
+
+    Calls recursive function generate_tree_helper().
+
+    Args:
+        price_tree (dict): price_tree (by product-type) being generated
+        relevant_options (dict): product-type -> [option-types] being recorded
+        price_product (dict): A base-price product from base-prices JSON.
+    Returns:
+        None: (fills price_tree and relevant_options by reference)
+    Raises:
+        SchemaException: as in generate_tree_helper().
+    '''
+    product_type = price_product["product-type"]
+    product_options = price_product["options"]
+    product_price = price_product["base-price"]
+
+    # First occurence of product_type -> initialise value in 
+    # price_tree and relevant_options
+    if product_type not in price_tree:
+        price_tree[product_type] = {}
+        relevant_options[product_type] = []
+
+    options_tuples = []
+    for option_type, options in product_options.items():
+        # Record relevant option types for current product_type
+        if option_type not in relevant_options[product_type]:
+            relevant_options[product_type].append(option_type)
+
+        options_tuples.append((option_type, options))
+
+    if options_tuples:
+        options_tuples = sorted(options_tuples)
+        generate_tree_helper(price_tree[product_type], options_tuples, \
+                             product_price)
+    else:
+        # If no options, the top-level is the last, ie. contains
+        # base-prices.
+        price_tree[product_type] = product_price
+
+def generate_tree_helper(level, options_tuples, base_price):
+    '''
+    Algorithm to recursively build the levels of the price_tree by calling
+    itself for each option-value (like, "small" for option-type "size") 
+    with the next 'level' and remaining option-types as arguments.
+
+    Stops when all option-types for the current product are exhausted, and
+    then uses the base-prices as values (at the last level).
+
+    Args:
+        level (dict): the current dict in price_tree
+        options_tuples ([tuple]): list of tuples with first value being
+                                  option-type (ex. "size") and second value
+                                  being a list of corresponding options
+                                  (like ["small", "big"]), corresponding to
+                                  a product-object in base-prices
+        base_price (int): base-price of the product
+
+    Returns:
+        None: (creates the price_tree by reference from argument, level)
+    Raises:
+        SchemaException: if the exact same product-type, options-
+                         -combination is encountered but with a different 
+                         base-price.
+    '''
+    first_option_type = options_tuples[0]
+    # List of option values ex. 'small', 'xl', corresponding to the first
+    # option type of options_tuples
+    options = first_option_type[1]
+
+    for option in options:
+
+        # Base case: last option type
+        if len(options_tuples) == 1:
+
+            # For the last option, the values are base-prices i.e, 'leafs'
+            # of the tree
+            if option in level and level[option] != base_price:
+                raise SchemaException("Same base-product has different base values.")
+            else:
+                level[option] = base_price
+        else:
+
+            if option not in level:
+                level[option] = {}
+
+            # Call helper on the remaining option_tuples and the next 
+            # 'level' in the nested-dict structure
+            generate_tree_helper(level[option], options_tuples[1:], base_price)
+
+def generate_product_tree(price_products):
+    '''
+    Generates the price_tree level and relevant option-types of a single
+    product-type from its base-price products - independent of every other
+    product-type, so it can run in a worker process.
+
+    Args:
+        price_products ([dict]): Base-price products of one product-type.
+    Returns:
+        product_tree (nested-dict or int), relevant_options ([str])
+    Raises:
+        SchemaException: as in generate_tree_helper().
+    '''
+    price_tree, relevant_options = {}, {}
+    for price_product in price_products:
+        insert_price_product(price_tree, relevant_options, price_product)
+
+    product_type = price_products[0]["product-type"]
+    return price_tree[product_type], relevant_options[product_type]
 
 class BaseProductData:
     '''
     Implementation of BaseProductData as a representation of a Redbubble 
     base-prices database.
-    - Loads data from provided base-prices JSON.
+    - Streams data from provided base-prices JSON.
     - Generates a nested-dict tree-like structure to retrieve base-price(s) of
       requested CartProducts independent of the quantity of base-prices. 
+    - Compiles the price_tree into a flat price_index keyed on
+      (product-type, option-value, ..) for constant-time lookups.
+    - Optionally, writes the compiled structures to a binary snapshot and
+      maps them back in on later runs, skipping the JSON parse and tree 
+      generation while the base-prices JSON is unchanged.
+    - Optionally (lazy), generates the price_tree of a product-type only when
+      it is first looked up.
+    - Optionally (compact backend), stores base-prices in integer-coded 
+      array tables (see compact_index.py) instead of nested-dicts, with the
+      price_tree rebuilt as a view on request.
+    - Optionally, shares equal values of the price_index and identical 
+      subtrees of the price_tree view once generated (share_subtrees()).
+    - Optionally, memoises resolved base-prices in a bounded LRU PriceCache
+      (see price_cache.py), cleared whenever the base-prices are reloaded.
+    - Optionally, generates the price_tree of each product-type in parallel
+      worker processes.
+    - Alternatively, attaches to a price table published to shared memory by
+      another process (attach_shared(), see shared_prices.py), or compiles
+      already decoded base-price products (from_records()).
     - Retrieves base-price of a requested CartProduct
 
-      More information in generate_price_tree().
+      More information in generate_price_tree() and compile_price_index().
     '''
 
-    def __init__(self, json_prices):
+    BACKENDS = ("dict", "compact")
+
+    def __init__(self, json_prices, snapshot = None, lazy = False, \
+                 backend = "dict", cache_size = None, workers = None, \
+                 validate = False):
+        '''
+        Constructor for BaseProductData - loads base-prices JSON and compiles
+        the price_tree and price_index.
+
+        Args:
+            json_prices (str): Path to the base-prices JSON.
+            snapshot (str): Optional path to a snapshot of the compiled 
+                            structures. Used if valid for json_prices, 
+                            (re)written otherwise.
+            lazy (bool): Only group the base-prices by product-type on load,
+                         and build the price_tree/price_index of a 
+                         product-type the first time it is looked up. 
+                         (Ignored when a snapshot is used.)
+            backend (str): "dict" - nested-dict price_tree and dict 
+                           price_index, or "compact" - CompactPriceIndex.
+            cache_size (int): Optional maximum size of a PriceCache of
+                              resolved base-prices (no cache if None).
+            workers (int): Optional number of worker processes to generate
+                           the price_tree of each product-type in. The 
+                           result is identical to the serial generation.
+                           (dict backend, not lazy - ignored otherwise.)
+            validate (bool): Validate every base-price product against 
+                             Schema/base-prices.schema.json in a streamed 
+                             pass, before any generation.
+        Returns:
+            None.
+        Raises:
+            ValueError: for an unknown backend or non-positive cache_size.
+            ValidationException: for base-price products violating the
+                                 schema (validate).
+        '''
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown price backend - {backend}")
+
         self.__json_prices = json_prices
-        self.__loaded_prices = self.__load_prices()
+        self.__snapshot = snapshot
+        self.__lazy = lazy
+        self.__compact = backend == "compact"
+        self.__cache = PriceCache(cache_size) if cache_size else None
+        self.__workers = workers
+        self.__validate = validate
+
+        with phase("prices_load"):
+            self.__load()
+        self.__profile_load()
+
+    @classmethod
+    def attach_shared(cls, name, cache_size = None):
+        '''
+        Alternative constructor for BaseProductData - attaches to the price
+        table published to shared memory as name (by a SharedPriceTable in 
+        the owning process), without loading base-prices JSON or copying the
+        table. The price_tree is then rebuilt from the price_index only on 
+        request.
+
+        Args:
+            name (str): Shared memory segment name (SharedPriceTable.name).
+            cache_size (int): As in the constructor.
+        Returns:
+            (BaseProductData): Read-only base-prices - close() to detach.
+        Raises:
+            FileNotFoundError: if there is no segment called name.
+            ValueError: if the segment is not a price table.
+        '''
+        prices = cls.__new__(cls)
+        prices.__json_prices = None
+        prices.__snapshot = None
+        prices.__lazy = False
+        prices.__compact = False
+        prices.__cache = PriceCache(cache_size) if cache_size else None
+        prices.__workers = None
+        prices.__validate = False
+        prices.__pending = {}
+        prices.__shared = False
+        prices.__install_compiled(attach_shared_index(name))
+        return prices
+
+    @classmethod
+    def from_records(cls, price_products, lazy = False, backend = "dict", \
+                     cache_size = None, workers = None):
+        '''
+        Alternative constructor for BaseProductData - compiles already 
+        decoded base-price products (ex. parsed once and priced against 
+        several times), without reading base-prices JSON.
+
+        Args:
+            price_products (iterable): Base-price products.
+            lazy, backend, cache_size, workers: As in the constructor.
+        Returns:
+            (BaseProductData): Base-prices, which cannot be reloaded.
+        Raises:
+            ValueError: for an unknown backend or non-positive cache_size.
+            SchemaException: as in generate_tree_helper().
+        '''
+        if backend not in cls.BACKENDS:
+            raise ValueError(f"Unknown price backend - {backend}")
+
+        prices = cls.__new__(cls)
+        prices.__json_prices = None
+        prices.__snapshot = None
+        prices.__lazy = lazy
+        prices.__compact = backend == "compact"
+        prices.__cache = PriceCache(cache_size) if cache_size else None
+        prices.__workers = workers
+        prices.__validate = False
+        prices.__count = 0
+        prices.__pending = {}
+        prices.__shared = False
+        with phase("prices_load"):
+            prices.__build(price_products)
+        prices.__profile_load()
+        return prices
+
+    def close(self):
+        '''
+        Releases the snapshot mapping or shared memory segment the 
+        price_index is read from, if any. Lookups cannot be made afterwards.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        close = getattr(self.__price_index, "close", None)
+        if close is not None:
+            close()
+
+    def __load(self):
+        '''
+        Loads the base-prices - from the snapshot if valid, otherwise from 
+        the base-prices JSON - replacing any previously loaded structures, 
+        and clears the PriceCache.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        snapshot = self.__snapshot
         self.__count = 0
+        self.__pending = {}
+        self.__shared = False
+        if self.__cache is not None:
+            self.__cache.clear()
+
+        if snapshot and self.__load_snapshot(snapshot):
+            return
+
+        # Fingerprint of the JSON as it is before it is read, so a change
+        # made during the build can never be stamped on its result
+        fingerprint = None
+        if snapshot:
+            try:
+                fingerprint = source_fingerprint(self.__json_prices)
+            except OSError:
+                pass
+
+        if self.__validate:
+            self.__validate_prices()
+
+        # Base-prices are streamed from the JSON straight into the price_tree
+        # (or grouped, if lazy) - no reference to the raw list is kept.
+        self.__build(self.__load_prices())
+
+        if fingerprint is not None:
+            self.__write_snapshot(snapshot, fingerprint)
+
+    def __build(self, prices):
+        '''
+        Generates and compiles the price_tree of every product-type from
+        prices - or only groups them by product-type, if lazy (and no 
+        snapshot) - replacing any previously compiled structures.
+
+        Args:
+            prices (iterable): Base-price products.
+        Returns:
+            None.
+        '''
+        # price_tree is only rebuilt from price_index as a view, on request
+        self.__price_tree, self.__relevant_options = None, {}
+        self.__option_keys, self.__price_index = {}, {}
+        if self.__compact:
+            self.__price_index = CompactPriceIndex()
+
+        if self.__lazy and not self.__snapshot:
+            self.__pending = self.__group_prices(prices)
+        elif self.__workers and not self.__compact:
+            self.__generate_price_tree_parallel(prices)
+        else:
+            self.__generate_price_tree(prices)
+
+    def reload(self):
+        '''
+        Reloads the base-prices from the base-prices JSON (or its snapshot),
+        ex. after the catalog file was replaced. The PriceCache is cleared.
 
-        self.__price_tree, self.__relevant_options = self.__generate_price_tree()
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            SchemaException: as in generate_tree_helper().
+            ValueError: if attached to shared memory, or compiled from 
+                        records (no base-prices JSON).
+        '''
+        if self.__json_prices is None:
+            raise ValueError("Base-prices without a JSON file cannot be reloaded")
+        with phase("prices_load"):
+            self.__load()
+        self.__profile_load()
+
+    def __profile_load(self):
+        '''
+        Adds the size of the loaded base-prices to the counters of the 
+        enabled profiler (see profiling.py): price_records and 
+        index_entries.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        if get_profiler() is None:
+            return
+
+        count("price_records", self.__count)
+        count("index_entries", len(self.__price_index))
+
+    def __profile_tree(self, price_tree):
+        '''
+        Adds the levels and leaves of a generated price_tree (before it is
+        dropped) to the counters of the enabled profiler: tree_levels and
+        tree_leaves.
+
+        Args:
+            price_tree (dict): Generated price_tree (by product-type).
+        Returns:
+            None.
+        '''
+        if get_profiler() is None:
+            return
+
+        levels, leaves = count_tree_nodes(price_tree)
+        count("tree_levels", levels)
+        count("tree_leaves", leaves)
+
+    def __load_snapshot(self, snapshot):
+        '''
+        Loads the price_index, relevant_options and count from snapshot, if
+        it is valid for the base-prices JSON (same size, mtime and content).
+        The price_tree is then rebuilt from the price_index only on request.
+
+        Args:
+            snapshot (str): Path to the snapshot file.
+        Returns:
+            (bool): Whether the snapshot was loaded.
+        '''
+        compiled = load_snapshot(snapshot, self.__json_prices)
+        if compiled is None:
+            return False
+
+        self.__install_compiled(compiled)
+        return True
+
+    def __install_compiled(self, compiled):
+        '''
+        Installs a price_index read from a snapshot or shared memory, with 
+        its relevant_options and count. The price_tree is rebuilt from the
+        price_index only on request.
+
+        Args:
+            compiled (tuple): SnapshotPriceIndex, relevant_options (dict), 
+                              count (int)
+        Returns:
+            None.
+        '''
+        self.__price_index, self.__relevant_options, self.__count = compiled
+        self.__option_keys = {product_type: tuple(sorted(option_types)) \
+                    for product_type, option_types in \
+                    self.__relevant_options.items()}
+        self.__price_tree = None
+
+    def __write_snapshot(self, snapshot, fingerprint):
+        '''
+        Writes the compiled structures to snapshot, unless the base-prices 
+        JSON changed (size or modification time) since fingerprint was taken.
+        Failing to write (ex. a read-only location, or option values that 
+        cannot be snapshotted) only costs the next run its fast start, so it
+        is not an error.
+
+        Args:
+            snapshot (str): Path to the snapshot file.
+            fingerprint (tuple): source_fingerprint() of the base-prices JSON,
+                                 taken before it was read.
+        Returns:
+            None.
+        '''
+        try:
+            stat = os.stat(self.__json_prices)
+            if (stat.st_size, stat.st_mtime_ns) != fingerprint[:2]:
+                return
+            write_snapshot(snapshot, self.__price_index, \
+                           self.__relevant_options, self.__count, fingerprint)
+        except (OSError, SchemaException, struct.error):
+            pass
 
     def __load_prices(self):
         '''
-        Loads base-prices JSON returned to and stored by self.__loaded_prices.
+        Streams the base-prices JSON, one base-price product at a time, 
+        through the JSON backend (see json_backend.py) - unless whole arrays
+        are opted in, the whole array is never held in memory.
 
         -> Can cause early exit, if unable to load JSON file.
 
         Args:
             (self)
-        Returns:
-            (dict): JSON data from base-prices JSON.
+        Yields:
+            (dict): Base-price products from base-prices JSON.
         '''
         try:
-            with open(self.__json_prices, "r") as prices_f:
-                prices_data = json.load(prices_f)
-        except:
+            yield from iter_array(self.__json_prices)
+        except (OSError, ValueError):
             sys.exit(f"Something went wrong! Could not load {self.__json_prices}")
-        return prices_data
 
-    def __generate_price_tree(self):
+    def __validate_prices(self):
+        '''
+        Streams the base-prices JSON through the compiled base-prices schema
+        validator (see validators.py), rejecting it before any generation.
+
+        -> Can cause early exit, if unable to load JSON file.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            ValidationException: listing the offending base-price products.
+        '''
+        validator = get_validator(BASE_PRICES_SCHEMA)
+        validator.validate(self.__load_prices(), source = self.__json_prices)
+
+    def __group_prices(self, prices):
+        '''
+        Groups the loaded base-prices by product-type, in order of first
+        occurence, and counts them. A single cheap pass - no option 
+        combinations are expanded.
+
+        Args:
+            prices (iterable): Base-price products.
+        Returns:
+            (dict): product-type -> [base-price products] not yet in the
+                    price_tree.
+        '''
+        grouped = {}
+        for price_product in prices:
+            self.__count += 1
+            product_type = price_product["product-type"]
+
+            if product_type not in grouped:
+                grouped[product_type] = []
+            grouped[product_type].append(price_product)
+
+        return grouped
+
+    def __generate_price_tree(self, prices):
         '''
         Generates a nested-dict structure with product_types as keys at 
         top-level and base-price values at the bottom-levels ('leaf' values).
@@ -56,152 +546,318 @@ class BaseProductData:
         Also records option-types relevant in tracing the price_tree for a 
         product_type -> relevant_options.
 
-        Calls recursive function generate_price_helper().
+        Calls insert_price_product() for every base-price product, then 
+        compile_price_index() for every product-type. Lookups only read the
+        price_index, so the price_tree is then dropped - and rebuilt from the
+        price_index only on request (see the price_tree property).
 
         For a more visual explanation, check "Key Algorithms" in README.
 
         Args:
-            (self)
+            prices (iterable): Base-price products.
         Returns:
-            price_tree (nested-dict), 
-            relevant_options (dict) (from product-type to list of option-types) 
+            None: (fills self.__relevant_options, self.__option_keys and 
+                   self.__price_index)
         '''
         price_tree = {}
-        relevant_options = {}
-        for price_product in self.__loaded_prices:
+        for price_product in prices:
             self.__count += 1
-            product_type = price_product["product-type"]
-            product_options = price_product["options"]
-            product_price = price_product["base-price"]
-
-            # First occurence of product_type -> initialise value in 
-            # price_tree and relevant_options
-            if product_type not in price_tree:
-                price_tree[product_type] = {}
-                relevant_options[product_type] = []
-
-            options_tuples = []
-            for option_type, options in product_options.items():
-                # Record relevant option types for current product_type
-                if option_type not in relevant_options[product_type]:
-                    relevant_options[product_type].append(option_type)
-
-                options_tuples.append((option_type, options))
-
-            if options_tuples:
-                options_tuples = sorted(options_tuples)
-                self.__generate_tree_helper(price_tree[product_type], \
-                                          options_tuples, product_price)
-            else:
-                # If no options, the top-level is the last, ie. contains
-                # base-prices.
-                price_tree[product_type] = product_price
+            self.__insert_price_product(price_tree, price_product)
 
-        return price_tree, relevant_options
-            
-    def __generate_tree_helper(self, level, options_tuples, base_price):
+        for product_type in self.__relevant_options:
+            self.__compile_price_index(product_type, \
+                                       price_tree.get(product_type))
+        self.__profile_tree(price_tree)
+
+    def __generate_price_tree_parallel(self, prices):
         '''
-        Algorithm to recursively build the levels of the price_tree by calling
-        itself for each option-value (like, "small" for option-type "size") 
-        with the next 'level' and remaining option-types as arguments.
+        Generates the price_tree as in generate_price_tree(), but partitions
+        the base-price products by product-type and generates the levels of
+        the product-types in a pool of worker processes (see 
+        generate_product_tree()). The levels are compiled in order of 
+        first occurence, so the result is identical to the serial 
+        generation.
 
-        Stops when all option-types for the current product are exhausted, and
-        then uses the base-prices as values (at the last level).
+        Args:
+            prices (iterable): Base-price products.
+        Returns:
+            None: (fills self.__relevant_options, self.__option_keys and 
+                   self.__price_index)
+        Raises:
+            SchemaException: as in generate_tree_helper().
+        '''
+        grouped = self.__group_prices(prices)
+        workers = min(self.__workers, len(grouped))
+
+        if workers > 1:
+            chunksize = max(1, len(grouped) // (workers * 4))
+            with ProcessPoolExecutor(workers) as executor:
+                product_trees = list(executor.map(generate_product_tree, \
+                                        grouped.values(), chunksize=chunksize))
+        else:
+            product_trees = [generate_product_tree(price_products) \
+                                for price_products in grouped.values()]
+
+        price_tree = {}
+        for product_type, (product_tree, relevant_options) in \
+                                            zip(grouped, product_trees):
+            price_tree[product_type] = product_tree
+            self.__relevant_options[product_type] = relevant_options
+            self.__compile_price_index(product_type, product_tree)
+        self.__profile_tree(price_tree)
+
+    def __generate_pending(self):
+        '''
+        Lazy mode - generates every product-type still pending generation.
 
         Args:
-            level (dict): the current dict in price_tree
-            options_tuples ([tuple]): list of tuples with first value being
-                                      option-type (ex. "size") and second value
-                                      being a list of corresponding options
-                                      (like ["small", "big"]), corresponding to
-                                      a product-object in base-prices
-            base_price (int): base-price of the product
+            (self)
+        Returns:
+            None.
+        '''
+        for product_type in list(self.__pending):
+            self.__generate_product_tree(product_type)
+
+    def __generate_product_tree(self, product_type):
+        '''
+        Lazy mode - generates the price_tree level (and relevant_options) of a
+        single product-type from its grouped base-prices, then compiles it 
+        into the price_index (and drops the level). Any price_tree view is
+        invalidated, to be rebuilt with the product-type on request.
 
+        Args:
+            product_type (str): A product-type with grouped base-prices.
         Returns:
-            None: (creates the price_tree by reference from argument, level)
+            None.
         Raises:
-            SchemaException: if the exact same product-type, options-
-                             -combination is encountered but with a different 
-                             base-price.
-        '''
-        first_option_type = options_tuples[0]
-        # List of option values ex. 'small', 'xl', corresponding to the first
-        # option type of options_tuples
-        options = first_option_type[1]
-
-        for option in options:
-
-            # Base case: last option type
-            if len(options_tuples) == 1:
-
-                # For the last option, the values are base-prices i.e, 'leafs'
-                # of the tree
-                if option in level and level[option] != base_price:
-                    raise SchemaException("Same base-product has different base values.")
-                else:
-                    level[option] = base_price
-            else:
+            SchemaException: as in generate_tree_helper(). The product-type
+                             is then left ungenerated.
+        '''
+        price_tree = {}
+        try:
+            for price_product in self.__pending[product_type]:
+                self.__insert_price_product(price_tree, price_product)
+            self.__compile_price_index(product_type, \
+                                       price_tree.get(product_type))
+        except SchemaException:
+            if self.__compact:
+                self.__price_index.discard(product_type)
+            del self.__relevant_options[product_type]
+            raise
+
+        del self.__pending[product_type]
+        self.__price_tree = None
+        self.__profile_tree(price_tree)
+
+    def __insert_price_product(self, price_tree, price_product):
+        '''
+        Inserts the base-price of a single base-price product into the 
+        price_tree level of its product-type (see insert_price_product()), or
+        for the compact backend, stages it in the CompactPriceIndex.
+
+        Args:
+            price_tree (dict): price_tree (by product-type) being generated.
+            price_product (dict): A base-price product from base-prices JSON.
+        Returns:
+            None.
+        Raises:
+            SchemaException: as in generate_tree_helper().
+        '''
+        if not self.__compact:
+            insert_price_product(price_tree, self.__relevant_options, \
+                                 price_product)
+            return
+
+        product_type = price_product["product-type"]
+        if product_type not in self.__relevant_options:
+            self.__relevant_options[product_type] = []
+        relevant_options = self.__relevant_options[product_type]
+
+        options_tuples = []
+        for option_type, options in price_product["options"].items():
+            if option_type not in relevant_options:
+                relevant_options.append(option_type)
+            options_tuples.append((option_type, options))
+
+        # Staged unexpanded - fanned out in compile_price_index()
+        self.__price_index.add(product_type, sorted(options_tuples), \
+                               price_product["base-price"])
+
+    def __compile_price_index(self, product_type, product_tree):
+        '''
+        Compiles the generated price_tree of product_type into the flat dict 
+        (price_index) keyed on (product-type, option-value-1, .., 
+        option-value-n), with the option-values in the sorted order of the 
+        option-types - the same order the levels of the price_tree follow. 
 
-                if option not in level:
-                    level[option] = {}
+        Also freezes the relevant option-types of product_type into a sorted
+        tuple (option_keys), used to project a CartProduct's options onto a
+        price_index key.
 
-                # Call helper on the remaining option_tuples and the next 
-                # 'level' in the nested-dict structure
-                self.__generate_tree_helper(level[option], options_tuples[1:], \
-                                            base_price)
+        Retrieving a base-price is then a single key projection and dict get
+        instead of a filter, sort and walk through the nested-dicts. 
 
-    def cart_product_base_price(self, cart_product):
-        '''
-        Return the base-price of cart_product by tracing the route from
-        its product-type and option-values to the base-price at the final
-        level in the price_tree.
+        For the compact backend, compiles the staged base-prices of 
+        product_type into its CompactPriceIndex tables instead.
 
         Args:
-            (CartProduct): Product to get the base-price of
+            product_type (str): A product-type in the price_tree.
+            product_tree (dict or int): Its generated price_tree level (None
+                                        for the compact backend).
         Returns:
-            (int): Base-price for the product
+            None: (fills self.__option_keys and self.__price_index)
         Raises:
-            SchemaException: If a valid route to a base-price does not exist.
+            SchemaException: (compact backend) as in generate_tree_helper().
         '''
-        product_type = cart_product.product_type
-        option_tuples = cart_product.options_tuples()
+        self.__option_keys[product_type] = \
+                        tuple(sorted(self.__relevant_options[product_type]))
+        if self.__compact:
+            self.__price_index.compile(product_type)
+            return
 
-        # Filter out any option types not found in self.__price_tree
-        option_tuples = filter(lambda x: self.__is_relevant(x, product_type), \
-                                option_tuples)
+        self.__compile_index_helper(self.__price_index, (product_type,), \
+                                    product_tree)
 
-        # Retain the same key order as self.__price_tree of CartProduct's 
-        # options
-        option_tuples = sorted(option_tuples)
+    def __tree_from_index(self):
+        '''
+        Rebuilds the price_tree from the price_index (ex. after loading a 
+        snapshot), by following each key's option-values down the levels.
 
-        # Follow path from 'root' to 'leaf' via option values of cart product 
-        tree_level = self.__price_tree[product_type]
-        try:
-            for option_tuple in option_tuples[:-1]: 
-                option_val = option_tuple[1]
-                tree_level = tree_level[option_val]
-
-            # The 'leaf' values are the base- -prices, by definition
-            last_option_val = option_tuples[-1][1]
-            base_price = tree_level[last_option_val]
-        except (KeyError, IndexError):
-            raise SchemaException(f"Incorrect option values for - {cart_product}")
+        Args:
+            (self)
+        Returns:
+            price_tree (nested-dict)
+        '''
+        price_tree = {}
+        for key, base_price in self.__price_index.items():
+            if len(key) == 1:
+                price_tree[key[0]] = base_price
+                continue
+
+            level = price_tree
+            for option in key[:-1]:
+                level = level.setdefault(option, {})
+            level[key[-1]] = base_price
+
+        return price_tree
 
-        return base_price
+    def __compile_index_helper(self, price_index, key, level):
+        '''
+        Recursively walks the price_tree from level, extending key with the 
+        option-value of each level, and records every 'leaf' base-price 
+        against its full key in price_index.
 
-    def __is_relevant(self, option_tuple, product_type):
+        Args:
+            price_index (dict): the flat index being compiled
+            key (tuple): product-type and option-values leading to level
+            level (dict or int): current dict in price_tree or a base-price
+        Returns:
+            None: (fills price_index by reference)
         '''
-        Used in filter lambda function in cart_product_base_price() above.
+        if not isinstance(level, dict):
+            price_index[key] = level
+            return
+
+        for option, next_level in level.items():
+            self.__compile_index_helper(price_index, key + (option,), \
+                                        next_level)
+
+    def share_subtrees(self):
+        '''
+        Finalisation pass - shares the equal option-values and base-prices of
+        the dict price_index, which lookups read (see share_index()), and 
+        canonicalises identical subtrees of the price_tree view into shared,
+        immutable levels (see share_subtrees()) - now, if the view is built,
+        and whenever it is rebuilt on request.
         
+        Runs after generation, so conflicting base-prices have already raised
+        SchemaException. Lookups are unaffected. (Lazy mode - only 
+        product-types generated so far are shared.)
+
+        Args:
+            (self)
+        Returns:
+            (dict): index_bytes_before and index_bytes_after of the 
+                    price_index (None unless a dict); levels and bytes of 
+                    the price_tree view before and after sharing, only if 
+                    the view is built (it is not rebuilt for the report); 
+                    and bytes_saved in the structures kept.
+        '''
+        report = {"index_bytes_before": None, "index_bytes_after": None, 
+                  "bytes_saved": 0}
+        if type(self.__price_index) is dict:
+            self.__price_index, index_report = share_index(self.__price_index)
+            report.update(index_report)
+            report["bytes_saved"] = index_report["index_bytes_before"] - \
+                                    index_report["index_bytes_after"]
+
+        self.__shared = True
+        if self.__price_tree is not None:
+            self.__price_tree, tree_report = \
+                share_subtrees(self.__price_tree)
+            tree_report["bytes_saved"] += report["bytes_saved"]
+            report.update(tree_report)
+        return report
+
+    def price_key(self, cart_product):
+        '''
+        Projects cart_product onto its price_index key - its product-type 
+        followed by the values of its relevant option-types, in sorted 
+        option-type order. Option-types not relevant to the product-type 
+        are ignored.
+
+        Args:
+            (CartProduct): Product to get the price_index key of
+        Returns:
+            (tuple): (product-type, option-value-1, .., option-value-n)
+        Raises:
+            SchemaException: If the product-type is not in base-prices, or 
+                             (in lazy mode) its base-prices conflict.
+        '''
+        product_type = cart_product.product_type
+        try:
+            option_keys = self.__option_keys[product_type]
+        except KeyError:
+            if product_type not in self.__pending:
+                raise SchemaException(f"Unknown product-type for - {cart_product}")
+
+            # Lazy mode - first lookup of product_type
+            self.__generate_product_tree(product_type)
+            option_keys = self.__option_keys[product_type]
+
+        options = cart_product.options
+        return (product_type,) + \
+                tuple([options[option_type] for option_type in option_keys \
+                        if option_type in options])
+
+    def cart_product_base_price(self, cart_product):
+        '''
+        Return the base-price of cart_product by projecting its product-type
+        and option-values onto a price_index key, the flattened equivalent of
+        the route to the base-price at the final level in the price_tree.
+
         Args:
-            option_tuple (tuple): tuple of option_type, corresponding values
-            product_type (str): type of the product
+            (CartProduct): Product to get the base-price of
         Returns:
-            (Bool): Whether the option type is relevant to the product-type
-                    in respect to the price_tree.
+            (int): Base-price for the product
+        Raises:
+            SchemaException: If a valid route to a base-price does not exist.
         '''
-        option_type = option_tuple[0]
-        return option_type in self.__relevant_options[product_type]
+        key = self.price_key(cart_product)
+        try:
+            if self.__cache is None:
+                return self.__price_index[key]
+
+            base_price = self.__cache.get(key)
+            if base_price is None:
+                base_price = self.__price_index.get(key, PriceCache.NEGATIVE)
+                self.__cache.put(key, base_price)
+            if base_price is PriceCache.NEGATIVE:
+                raise KeyError(key)
+            return base_price
+        except (KeyError, TypeError):
+            # TypeError -> unhashable (ex. list) option value in cart
+            raise SchemaException(f"Incorrect option values for - {cart_product}")
 
     ##############################  Properties  ################################
 
@@ -216,8 +872,86 @@ class BaseProductData:
         Returns
             (dict->dict->..): (Nested-Dicts): price_tree.
         '''
+        # Lazy mode - the full structure is requested
+        if self.__pending:
+            self.__generate_pending()
+        if self.__price_tree is None:
+            self.__price_tree = self.__tree_from_index()
+            if self.__shared:
+                self.__price_tree = share_subtrees(self.__price_tree)[0]
         return self.__price_tree
 
+    @property
+    def price_index(self):
+        '''
+        Property-based Getter for price_index. Returns the flat dictionary 
+        compiled from the price_tree, as explained above.
+
+        Args:
+            (self)
+        Returns
+            (dict): (product-type, option-values..) -> base-price.
+        '''
+        # Lazy mode - the full structure is requested
+        if self.__pending:
+            self.__generate_pending()
+        return self.__price_index
+
+    @property
+    def price_tree_built(self):
+        '''
+        Property-based Getter for whether the price_tree view is built (and
+        kept) - without building it.
+
+        Args:
+            (self)
+        Returns
+            (bool): Whether price_tree is built.
+        '''
+        return self.__price_tree is not None
+
+    @property
+    def option_keys(self):
+        '''
+        Property-based Getter for option_keys. Returns a dictionary with 
+        product-types as keys and the sorted tuple of their relevant option
+        types as values - the order of option-values in a price_index key.
+
+        Args:
+            (self)
+        Returns
+            (dict): str:(str), like {"hoodie": ("colour", "size")}
+        '''
+        # Lazy mode - the full structure is requested
+        if self.__pending:
+            self.__generate_pending()
+        return self.__option_keys
+
+    @property
+    def pending_product_types(self):
+        '''
+        Property-based Getter for the product-types whose base-prices are 
+        grouped but not yet in the price_tree (always empty unless lazy).
+
+        Args:
+            (self)
+        Returns
+            ([str]): Product-types pending generation.
+        '''
+        return list(self.__pending)
+
+    @property
+    def cache(self):
+        '''
+        Property-based Getter for the PriceCache of resolved base-prices.
+
+        Args:
+            (self)
+        Returns
+            (PriceCache): The cache, or None if caching is disabled.
+        '''
+        return self.__cache
+
     @property
     def count(self):
         '''
@@ -245,6 +979,9 @@ class BaseProductData:
             (dict): str:[str], From product-types to option types, 
                              like {"hoodie": ["size", "colour"]}
         '''
+        # Lazy mode - the full structure is requested
+        if self.__pending:
+            self.__generate_pending()
         return self.__relevant_options
 
     ##############################  OVERRIDDEN  ################################
@@ -260,5 +997,5 @@ class BaseProductData:
         Returns
             (str): String representation of price_tree.
         '''
-        return str(self.__price_tree)
+        return str(self.price_tree)
 
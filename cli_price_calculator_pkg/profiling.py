@@ -0,0 +1,295 @@
+'''
+profiling.py
+'''
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from cli_price_calculator_pkg.exceptions import PriceCalcException
+from cli_price_calculator_pkg.json_backend import get_backend, \
+                                                 get_decoders_used
+
+# Active Profiler of the process, or None - instrumentation points are no-ops
+_profiler = None
+# Shared no-op phase of a disabled profiler
+_NO_PHASE = nullcontext()
+
+class Phase:
+    '''
+    Implementation of Phase as the context manager timing one run of a named
+    phase of a Profiler - wall (perf_counter) and CPU (process_time) time.
+    '''
+    __slots__ = ("__totals", "__wall", "__cpu")
+
+    def __init__(self, totals):
+        '''
+        Constructor for Phase.
+
+        Args:
+            totals (list): [calls, wall seconds, CPU seconds] of the phase,
+                           accumulated on exit.
+        Returns:
+            None.
+        '''
+        self.__totals = totals
+
+    def __enter__(self):
+        '''
+        Starts the clocks.
+        '''
+        self.__wall = time.perf_counter()
+        self.__cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        '''
+        Stops the clocks, and accumulates the times of the run.
+        '''
+        totals = self.__totals
+        totals[0] += 1
+        totals[1] += time.perf_counter() - self.__wall
+        totals[2] += time.process_time() - self.__cpu
+
+class Profiler:
+    '''
+    Implementation of Profiler as the instrumentation of a pricing run:
+    - wall and CPU time of named phases (ex. cart_load, prices_load, pricing),
+      accumulated over every run of the phase,
+    - named counters (ex. lookups, lookup_misses, tree_nodes),
+    - optionally (histogram), the latency of every base-price lookup, in
+      power-of-two nanosecond buckets.
+    Enabled for the process by enable() (or profile()); instrumentation
+    points of the package are no-ops while no Profiler is enabled.
+    '''
+    def __init__(self, histogram = False):
+        '''
+        Constructor for Profiler.
+
+        Args:
+            histogram (bool): Record the latency of every lookup.
+        Returns:
+            None.
+        '''
+        self.__histogram = histogram
+        self.__phases = {}
+        self.__counters = {}
+        self.__lookup_buckets = {}
+
+    def phase(self, name):
+        '''
+        Returns the context manager timing a run of phase name.
+
+        Args:
+            name (str): Phase name.
+        Returns:
+            (Phase): Context manager.
+        '''
+        totals = self.__phases.get(name)
+        if totals is None:
+            totals = self.__phases[name] = [0, 0.0, 0.0]
+        return Phase(totals)
+
+    def count(self, name, amount = 1):
+        '''
+        Adds amount to counter name.
+
+        Args:
+            name (str): Counter name.
+            amount (int): Amount to add.
+        Returns:
+            None.
+        '''
+        self.__counters[name] = self.__counters.get(name, 0) + amount
+
+    def wrap_lookup(self, lookup):
+        '''
+        Returns lookup (ex. BaseProductData.cart_product_base_price),
+        counting its calls ("lookups") and failures ("lookup_misses"), and
+        recording its latency if histogram.
+
+        Args:
+            lookup (callable): Base-price lookup of a CartProduct.
+        Returns:
+            (callable): Instrumented lookup.
+        '''
+        counters = self.__counters
+        buckets = self.__lookup_buckets
+        histogram = self.__histogram
+        clock = time.perf_counter_ns
+
+        def instrumented(cart_product):
+            counters["lookups"] = counters.get("lookups", 0) + 1
+            start = clock() if histogram else 0
+            try:
+                return lookup(cart_product)
+            except PriceCalcException:
+                counters["lookup_misses"] = \
+                    counters.get("lookup_misses", 0) + 1
+                raise
+            finally:
+                if histogram:
+                    bucket = (clock() - start).bit_length()
+                    buckets[bucket] = buckets.get(bucket, 0) + 1
+
+        return instrumented
+
+    def report(self):
+        '''
+        Returns the profile recorded so far.
+
+        Args:
+            (self)
+        Returns:
+            (dict): json_backend (decoder selected for the loaders), 
+                    json_decoders (decoders that actually parsed documents,
+                    ex. the cart, and arrays, ex. the base-prices - see 
+                    json_backend.py), phases (name -> calls, wall_seconds, 
+                    cpu_seconds), counters (name -> int) and, if histogram,
+                    lookup_latency_ns (upper bound of each bucket -> lookups).
+        '''
+        report = {"json_backend": get_backend(),
+                  "json_decoders": get_decoders_used(),
+                  "phases": {name: {"calls": calls, "wall_seconds": wall, \
+                                    "cpu_seconds": cpu} \
+                                for name, (calls, wall, cpu) in \
+                                    self.__phases.items()},
+                  "counters": dict(self.__counters)}
+        if self.__histogram:
+            report["lookup_latency_ns"] = {f"<{1 << bucket}": lookups \
+                        for bucket, lookups in \
+                            sorted(self.__lookup_buckets.items())}
+        return report
+
+    def write_report(self, out):
+        '''
+        Writes report() as a JSON line to out.
+
+        Args:
+            out (file): Output stream (ex. sys.stderr).
+        Returns:
+            None.
+        '''
+        out.write(json.dumps(self.report()) + "\n")
+        out.flush()
+
+def enable(histogram = False):
+    '''
+    Enables a new Profiler for the process - the programmatic hook for the
+    daemon or batch modes (see also profile()).
+
+    Args:
+        histogram (bool): Record the latency of every lookup.
+    Returns:
+        (Profiler): The enabled profiler.
+    '''
+    global _profiler
+    _profiler = Profiler(histogram)
+    return _profiler
+
+def disable():
+    '''
+    Disables the profiler of the process.
+
+    Args:
+        None
+    Returns:
+        (Profiler): The disabled profiler, or None.
+    '''
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+def get_profiler():
+    '''
+    Returns the enabled profiler of the process, or None.
+    '''
+    return _profiler
+
+@contextmanager
+def profile(histogram = False):
+    '''
+    Enables a new Profiler for the block, restoring the previously enabled
+    profiler after it:
+
+        with profile() as profiler:
+            ...
+        profiler.report()
+
+    Args:
+        histogram (bool): Record the latency of every lookup.
+    Yields:
+        (Profiler): The profiler of the block.
+    '''
+    global _profiler
+    previous = _profiler
+    try:
+        yield enable(histogram)
+    finally:
+        _profiler = previous
+
+def phase(name):
+    '''
+    Returns the context manager timing a run of phase name with the enabled
+    profiler - a shared no-op if disabled.
+
+    Args:
+        name (str): Phase name.
+    Returns:
+        (context manager): Phase, or a no-op.
+    '''
+    if _profiler is None:
+        return _NO_PHASE
+    return _profiler.phase(name)
+
+def count(name, amount = 1):
+    '''
+    Adds amount to counter name of the enabled profiler (no-op if disabled).
+
+    Args:
+        name (str): Counter name.
+        amount (int): Amount to add.
+    Returns:
+        None.
+    '''
+    if _profiler is not None:
+        _profiler.count(name, amount)
+
+def instrument_lookup(lookup):
+    '''
+    Returns lookup instrumented by the enabled profiler (see
+    Profiler.wrap_lookup()) - or lookup itself if disabled, so a disabled
+    profiler adds nothing per lookup.
+
+    Args:
+        lookup (callable): Base-price lookup of a CartProduct.
+    Returns:
+        (callable): lookup, or the instrumented lookup.
+    '''
+    if _profiler is None:
+        return lookup
+    return _profiler.wrap_lookup(lookup)
+
+def count_tree_nodes(price_tree):
+    '''
+    Counts the nodes of a price_tree - distinct levels (shared subtrees once)
+    and base-price leaves.
+
+    Args:
+        price_tree (dict): Nested-dict price_tree.
+    Returns:
+        (tuple): Number of levels (int), number of leaves (int)
+    '''
+    seen = set()
+    levels = leaves = 0
+    stack = [price_tree]
+    while stack:
+        level = stack.pop()
+        if id(level) in seen:
+            continue
+        seen.add(id(level))
+        levels += 1
+        for child in level.values():
+            if isinstance(child, dict):
+                stack.append(child)
+            else:
+                leaves += 1
+    return levels, leaves
@@ -0,0 +1,322 @@
+'''
+server.py
+'''
+import os
+import json
+import signal
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.breakdown import BreakdownList
+from cli_price_calculator_pkg.profiling import get_profiler
+from cli_price_calculator_pkg.exceptions import PriceCalcException
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+
+# Default number of requests priced concurrently
+MAX_CONCURRENT = 64
+# Maximum size of a request line (a whole cart) in bytes
+LINE_LIMIT = 1 << 24
+# Host of TCP addresses without one (ex. ":8765")
+LOCALHOST = "127.0.0.1"
+
+def parse_address(address):
+    '''
+    Parses a server address - "HOST:PORT" or ":PORT" for TCP, otherwise the
+    path of a Unix socket.
+
+    Args:
+        address (str): Server address.
+    Returns:
+        (tuple): ("tcp", host, port) or ("unix", path)
+    '''
+    host, _, port = address.rpartition(":")
+    if port.isdigit():
+        return "tcp", host or LOCALHOST, int(port)
+    return "unix", address
+
+class PricingServer:
+    '''
+    Implementation of PricingServer as a long-running asyncio pricing daemon,
+    keeping one compiled BaseProductData resident between requests.
+    - Requests and responses are NDJSON, one per line, over a Unix socket or
+      TCP connection. A request is a cart (list of cart products), or
+      {"cart": [...], "breakdown": true} for per-line prices too:
+      -> {"total": cents[, "lines": [...]]} or {"error": message}
+    - At most max_concurrent requests are in flight at once; the others wait
+      for a slot. Carts are priced off the event loop, by a single pricing
+      thread - pure-Python pricing holds the GIL, so more threads would not
+      price faster, and lookups (PriceCache, lazy generation) are not
+      thread-safe. The event loop keeps reading requests and answering
+      commands meanwhile.
+    - The catalog is hot-swapped by {"command": "reload"} (or SIGHUP): a new
+      BaseProductData is built off the event loop, then replaces the
+      resident one in a single assignment. Requests in flight keep pricing
+      against the catalog they started with; the replaced one is closed once
+      the last of them is done.
+    - {"command": "profile"} returns the profile recorded so far, while a
+      profiler is enabled (see profiling.py).
+    '''
+    def __init__(self, json_prices, max_concurrent = MAX_CONCURRENT, \
+                 **options):
+        '''
+        Constructor for PricingServer - loads the base-prices.
+
+        Args:
+            json_prices (str): Path to the base-prices JSON.
+            max_concurrent (int): Maximum number of requests in flight.
+            options: Options of BaseProductData (ex. snapshot, backend).
+        Returns:
+            None.
+        Raises:
+            SchemaException: for conflicting or invalid base-prices.
+        '''
+        self.__json_prices = json_prices
+        self.__options = options
+        self.__prices = BaseProductData(json_prices, **options)
+        self.__max_concurrent = max_concurrent
+        self.__semaphore = None
+        self.__reload_lock = None
+        self.__executor = None
+        # BaseProductData -> number of requests pricing against it
+        self.__in_flight = {}
+
+    async def reload(self):
+        '''
+        Rebuilds the base-prices from the base-prices JSON in a thread, and
+        swaps them in once built - closing the replaced base-prices, once no
+        request prices against them. Concurrent reloads are serialised.
+
+        Args:
+            (self)
+        Returns:
+            (BaseProductData): The new base-prices.
+        Raises:
+            SchemaException: for conflicting or invalid base-prices (the
+                             resident base-prices are kept).
+        '''
+        loop = asyncio.get_running_loop()
+        async with self.__reload_lock:
+            prices = await loop.run_in_executor(None, \
+                        lambda: BaseProductData(self.__json_prices, \
+                                                **self.__options))
+            replaced, self.__prices = self.__prices, prices
+            if replaced not in self.__in_flight:
+                replaced.close()
+        return prices
+
+    def price(self, request, prices = None):
+        '''
+        Prices a single request against the resident base-prices.
+
+        Args:
+            request (any): Decoded request line.
+            prices (BaseProductData): Base-prices to price against, instead
+                                      of the resident ones.
+        Returns:
+            (dict): Response.
+        '''
+        if prices is None:
+            prices = self.__prices
+        breakdown = False
+        items = request
+        if isinstance(request, dict):
+            items = request.get("cart")
+            breakdown = bool(request.get("breakdown"))
+        if not isinstance(items, list):
+            return {"error": "Malformed request - expected a cart"}
+
+        try:
+            cart = Cart.from_items(items, name = "request")
+            lines = BreakdownList() if breakdown else None
+            total = CLIPriceCalculator(cart, prices, \
+                                       breakdown = lines).cart_total
+            response = {"total": total}
+            if breakdown:
+                response["lines"] = lines
+        except PriceCalcException as error:
+            return {"error": error.message}
+        except SystemExit as error:
+            return {"error": str(error.code)}
+        except (KeyError, TypeError, AttributeError) as error:
+            return {"error": f"Malformed cart product - {error!r}"}
+        return response
+
+    async def handle(self, reader, writer):
+        '''
+        Serves the requests of a connection until it is closed.
+
+        Args:
+            reader (asyncio.StreamReader): Connection input.
+            writer (asyncio.StreamWriter): Connection output.
+        Returns:
+            None.
+        '''
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Request over LINE_LIMIT - the connection is unusable
+                    writer.write(b'{"error": "Request too large"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                async with self.__semaphore:
+                    response = await self.respond(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line):
+        '''
+        Returns the response to a request line.
+
+        Args:
+            line (bytes): Request line.
+        Returns:
+            (dict): Response.
+        '''
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"error": "Malformed request - invalid JSON"}
+
+        if isinstance(request, dict) and request.get("command") == "reload":
+            try:
+                prices = await self.reload()
+            except PriceCalcException as error:
+                return {"error": error.message}
+            except SystemExit as error:
+                return {"error": str(error.code)}
+            return {"reloaded": True, "count": prices.count}
+
+        if isinstance(request, dict) and request.get("command") == "profile":
+            profiler = get_profiler()
+            if profiler is None:
+                return {"error": "Profiling is not enabled"}
+            return {"profile": profiler.report()}
+
+        return await self.__price_off_loop(request)
+
+    async def __price_off_loop(self, request):
+        '''
+        Prices a request in the pricing thread, against the resident 
+        base-prices, which are kept open until it is done.
+
+        Args:
+            request (any): Decoded request line.
+        Returns:
+            (dict): Response.
+        '''
+        prices = self.__prices
+        self.__in_flight[prices] = self.__in_flight.get(prices, 0) + 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor( \
+                        self.__executor, self.price, request, prices)
+        finally:
+            self.__in_flight[prices] -= 1
+            if not self.__in_flight[prices]:
+                del self.__in_flight[prices]
+                if prices is not self.__prices:
+                    # Replaced by a reload while priced
+                    prices.close()
+
+    async def __hangup(self):
+        '''
+        Reloads the catalog on SIGHUP. A failed reload keeps the resident
+        base-prices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        try:
+            await self.reload()
+        except (PriceCalcException, SystemExit):
+            pass
+
+    async def start(self, address):
+        '''
+        Starts listening on address (see parse_address()).
+
+        Args:
+            address (str): Server address.
+        Returns:
+            (asyncio.Server): The listening server.
+        '''
+        self.__semaphore = asyncio.Semaphore(self.__max_concurrent)
+        self.__reload_lock = asyncio.Lock()
+        self.__executor = ThreadPoolExecutor(1, \
+                                             thread_name_prefix = "pricing")
+
+        kind, *where = parse_address(address)
+        if kind == "tcp":
+            return await asyncio.start_server(self.handle, *where, \
+                                              limit = LINE_LIMIT)
+        return await asyncio.start_unix_server(self.handle, *where, \
+                                               limit = LINE_LIMIT)
+
+    async def serve(self, address):
+        '''
+        Serves requests on address until cancelled. SIGHUP (where available)
+        hot-swaps the catalog. A Unix socket is removed once done.
+
+        Args:
+            address (str): Server address.
+        Returns:
+            None.
+        '''
+        server = await self.start(address)
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, \
+                                    lambda: loop.create_task(self.__hangup()))
+        except (AttributeError, NotImplementedError):
+            # No SIGHUP (ex. Windows) - reload by request only
+            pass
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+            kind, *where = parse_address(address)
+            if kind == "unix" and os.path.exists(where[0]):
+                os.unlink(where[0])
+
+    def close(self):
+        '''
+        Stops the pricing thread (once the requests queued to it are priced)
+        and closes the resident base-prices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        self.__prices.close()
+
+    ##############################  Properties  ################################
+
+    @property
+    def prices(self):
+        '''
+        Property-based Getter for the resident base-prices.
+
+        Args:
+            (self)
+        Returns
+            (BaseProductData): Base-prices requests are priced against.
+        '''
+        return self.__prices
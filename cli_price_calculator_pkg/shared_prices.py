@@ -0,0 +1,122 @@
+'''
+shared_prices.py
+'''
+from multiprocessing import shared_memory
+from cli_price_calculator_pkg.snapshot import SnapshotPriceIndex, \
+                                             dump_price_index
+
+class SharedPriceTable:
+    '''
+    Implementation of SharedPriceTable as the owner of a read-only, compiled
+    price table published to multiprocessing.shared_memory, so pricing
+    workers can attach to it (BaseProductData.attach_shared()) instead of each
+    loading the base-prices JSON.
+    - The table uses the snapshot layout (see snapshot.py) and is probed in
+      place by workers, without copying.
+    - The owning process closes and unlinks the segment - use it as a context
+      manager, or call close() and unlink().
+    '''
+    def __init__(self, prices, name = None):
+        '''
+        Publishes the compiled base-prices of prices to a new shared memory
+        segment.
+
+        Args:
+            prices (BaseProductData): Base-prices to publish.
+            name (str): Optional name of the segment (random if None).
+        Returns:
+            None.
+        Raises:
+            SchemaException: if option values cannot be stored in the table.
+            FileExistsError: if a segment called name already exists.
+        '''
+        data = dump_price_index(prices.price_index, prices.relevant_options, \
+                                prices.count)
+        self.__shm = shared_memory.SharedMemory(name = name, create = True, \
+                                                size = len(data))
+        self.__shm.buf[:len(data)] = data
+        self.__unlinked = False
+
+    def close(self):
+        '''
+        Closes the owner's mapping of the segment. Workers stay attached.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.__shm.close()
+
+    def unlink(self):
+        '''
+        Removes the segment, once the workers are done with it. Attached
+        workers keep their mapping until they close it.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        if not self.__unlinked:
+            self.__shm.unlink()
+            self.__unlinked = True
+
+    ##############################  Properties  ################################
+
+    @property
+    def name(self):
+        '''
+        Property-based Getter for the name of the segment, to pass to
+        workers.
+
+        Args:
+            (self)
+        Returns
+            (str): Shared memory segment name.
+        '''
+        return self.__shm.name
+
+    ##############################  Overridden  ################################
+
+    def __enter__(self):
+        '''
+        Context manager entry - the published table.
+        '''
+        return self
+
+    def __exit__(self, *exc_info):
+        '''
+        Context manager exit - closes and unlinks the segment.
+        '''
+        self.close()
+        self.unlink()
+
+def attach_shared_index(name):
+    '''
+    Attaches to the price table published as segment name.
+
+    Workers should be started by the owning process (ex. via multiprocessing),
+    so they share its resource tracker and the segment is not unlinked when a
+    worker exits.
+
+    Args:
+        name (str): Shared memory segment name (SharedPriceTable.name).
+    Returns:
+        (tuple): SnapshotPriceIndex (closing it detaches), relevant_options
+                 (dict), count (int)
+    Raises:
+        FileNotFoundError: if there is no segment called name.
+        ValueError: if the segment is not a price table.
+    '''
+    try:
+        shm = shared_memory.SharedMemory(name = name, track = False)
+    except TypeError:
+        # Python < 3.13 - no track argument
+        shm = shared_memory.SharedMemory(name = name)
+
+    try:
+        return SnapshotPriceIndex.from_buffer(shm.buf, resource = shm)
+    except ValueError:
+        shm.close()
+        raise
@@ -0,0 +1,357 @@
+'''
+snapshot.py
+'''
+import os
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+from cli_price_calculator_pkg.exceptions import SchemaException
+
+# Snapshot layout (little-endian):
+#   header -> magic, version, source size, source mtime (ns), source sha256,
+#             count of base-prices, number of keys, metadata length,
+#             slot count, keys length
+#   metadata -> JSON of relevant_options (product-type -> [option-types])
+#   slots -> open-addressing hash table of (key offset, key length, price)
+#   keys -> NUL-joined, UTF-8 encoded price_index keys, in price_index order
+MAGIC = b"RBPS"
+VERSION = 1
+HEADER = struct.Struct("<4sIqq32sqQIIQ")
+SLOT = struct.Struct("<IIq")
+EMPTY_SLOT = 0xFFFFFFFF
+KEY_SEPARATOR = "\x00"
+# Fingerprint of a snapshot without a source file (ex. in shared memory)
+NO_SOURCE = (0, 0, bytes(32))
+
+def source_fingerprint(json_prices):
+    '''
+    Returns the size, modification time and content hash of the base-prices
+    JSON a snapshot is compiled from - a snapshot is only valid while all
+    three match.
+
+    Args:
+        json_prices (str): Path to the base-prices JSON.
+    Returns:
+        (tuple): size (int), mtime in ns (int), sha256 digest (bytes)
+    '''
+    stat = os.stat(json_prices)
+    digest = hashlib.sha256()
+    with open(json_prices, "rb") as prices_f:
+        for chunk in iter(lambda: prices_f.read(1 << 20), b""):
+            digest.update(chunk)
+    return stat.st_size, stat.st_mtime_ns, digest.digest()
+
+def encode_key(key):
+    '''
+    Encodes a price_index key into the bytes stored in, and hashed by, the
+    snapshot.
+
+    Args:
+        key (tuple): (product-type, option-value-1, .., option-value-n)
+    Returns:
+        (bytes): NUL-joined UTF-8 key.
+    Raises:
+        TypeError: if a key value is not a string.
+    '''
+    return KEY_SEPARATOR.join(key).encode("utf-8")
+
+def dump_price_index(price_index, relevant_options, count, \
+                     fingerprint = NO_SOURCE):
+    '''
+    Serialises the compiled price structures into the snapshot layout
+    described above.
+
+    Args:
+        price_index (dict): (product-type, option-values..) -> base-price
+        relevant_options (dict): product-type -> [option-types]
+        count (int): Number of base-prices.
+        fingerprint (tuple): source_fingerprint() of the base-prices JSON.
+                             (NO_SOURCE if there is none).
+    Returns:
+        (bytes): The snapshot.
+    Raises:
+        SchemaException: if a key or base-price cannot be represented in the
+                         snapshot.
+    '''
+    metadata = json.dumps(relevant_options).encode("utf-8")
+
+    slot_count = 1
+    while slot_count < 2 * len(price_index):
+        slot_count *= 2
+    slots = [None] * slot_count
+
+    keys = bytearray()
+    for key, base_price in price_index.items():
+        if not all(isinstance(value, str) and KEY_SEPARATOR not in value \
+                    for value in key):
+            raise SchemaException(f"Cannot snapshot option values - {key}")
+        # Base-prices are stored as signed 64-bit integers (SLOT)
+        if type(base_price) is not int or \
+                not -2 ** 63 <= base_price < 2 ** 63:
+            raise SchemaException(f"Cannot snapshot base-price - {base_price}")
+        encoded = encode_key(key)
+
+        # Linear probing from the key's hash
+        slot = zlib.crc32(encoded) & (slot_count - 1)
+        while slots[slot] is not None:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = (len(keys), len(encoded), base_price)
+        keys += encoded
+
+    size, mtime_ns, digest = fingerprint
+    header = HEADER.pack(MAGIC, VERSION, size, mtime_ns, digest, count, \
+                         len(price_index), len(metadata), slot_count, len(keys))
+    body = b"".join(SLOT.pack(*(slot or (EMPTY_SLOT, EMPTY_SLOT, 0))) \
+                        for slot in slots)
+
+    return header + metadata + body + bytes(keys)
+
+def write_snapshot(snapshot_path, price_index, relevant_options, count, \
+                   fingerprint):
+    '''
+    Writes a snapshot of the compiled price structures to snapshot_path. The
+    file is replaced atomically so a concurrent reader never sees a partial
+    snapshot.
+
+    Args:
+        snapshot_path (str): Path of the snapshot file.
+        (rest): As in dump_price_index().
+    Returns:
+        None.
+    '''
+    data = dump_price_index(price_index, relevant_options, count, fingerprint)
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as snapshot_f:
+            snapshot_f.write(data)
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        # No partial snapshot left behind
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def load_snapshot(snapshot_path, json_prices):
+    '''
+    Maps the snapshot at snapshot_path into memory if it is valid for the
+    current state of the base-prices JSON.
+
+    Args:
+        snapshot_path (str): Path of the snapshot file.
+        json_prices (str): Path to the base-prices JSON.
+    Returns:
+        (tuple) or None: SnapshotPriceIndex, relevant_options (dict),
+                         count (int) - or None if the snapshot is missing,
+                         corrupt, of another version, or stale.
+    '''
+    try:
+        with open(snapshot_path, "rb") as snapshot_f:
+            buffer = mmap.mmap(snapshot_f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    compiled = None
+    try:
+        compiled = map_snapshot(buffer, json_prices)
+    finally:
+        # Unmapped unless owned by the SnapshotPriceIndex
+        if compiled is None:
+            buffer.close()
+    return compiled
+
+def map_snapshot(buffer, json_prices):
+    '''
+    Returns the compiled structures of the snapshot mapped as buffer, if it
+    is valid for the current state of the base-prices JSON.
+
+    Args:
+        buffer (mmap.mmap): Snapshot mapping, owned by the SnapshotPriceIndex
+                            if valid.
+        json_prices (str): Path to the base-prices JSON.
+    Returns:
+        (tuple) or None: As in load_snapshot().
+    '''
+    try:
+        header = HEADER.unpack_from(buffer, 0)
+    except struct.error:
+        return None
+    magic, version, size, mtime_ns, digest = header[:5]
+    if magic != MAGIC or version != VERSION:
+        return None
+
+    # Cheap stat check first, content hash only if size and mtime still match
+    try:
+        stat = os.stat(json_prices)
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns) or \
+                source_fingerprint(json_prices)[2] != digest:
+            return None
+    except OSError:
+        return None
+
+    try:
+        return SnapshotPriceIndex.from_buffer(buffer, resource = buffer)
+    except (ValueError, struct.error):
+        return None
+
+class SnapshotPriceIndex:
+    '''
+    Implementation of SnapshotPriceIndex as a read-only, dict-like view of the
+    price_index stored in a snapshot buffer (a mmap, or any other buffer).
+    - Keys are hashed and probed in place, without deserialising the index.
+    '''
+    def __init__(self, buffer, slots_offset, slot_count, keys_offset, length, \
+                 resource = None):
+        '''
+        Initialises the view over buffer. Use from_buffer() to read the
+        offsets from a snapshot header.
+
+        Args:
+            buffer (buffer): Snapshot bytes.
+            slots_offset (int): Offset of the slot table.
+            slot_count (int): Number of slots (power of two).
+            keys_offset (int): Offset of the keys blob.
+            length (int): Number of keys in the index.
+            resource: Object owning buffer, closed by close() (ex. the mmap).
+        Returns:
+            None.
+        '''
+        self.__buffer = buffer
+        self.__resource = resource
+        self.__slots_offset = slots_offset
+        self.__mask = slot_count - 1
+        self.__keys_offset = keys_offset
+        self.__length = length
+
+    @classmethod
+    def from_buffer(cls, buffer, resource = None):
+        '''
+        Parses the snapshot header in buffer.
+
+        Args:
+            buffer (buffer): Snapshot bytes.
+            resource: Object owning buffer, closed by close().
+        Returns:
+            (tuple): SnapshotPriceIndex, relevant_options (dict), count (int)
+        Raises:
+            ValueError: if the buffer is not a complete snapshot.
+        '''
+        (magic, version, _, _, _, count, length, meta_len, slot_count, \
+                                keys_len) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a price snapshot")
+
+        meta_offset = HEADER.size
+        slots_offset = meta_offset + meta_len
+        keys_offset = slots_offset + slot_count * SLOT.size
+        if len(buffer) < keys_offset + keys_len:
+            raise ValueError("Truncated price snapshot")
+
+        relevant_options = json.loads(bytes(buffer[meta_offset:slots_offset]))
+        index = cls(buffer, slots_offset, slot_count, keys_offset, length, \
+                    resource)
+        return index, relevant_options, count
+
+    def get(self, key, default = None):
+        '''
+        Returns the base-price for key, or default if key is not in the index.
+
+        Args:
+            key (tuple): (product-type, option-value-1, .., option-value-n)
+            default: Returned for a missing key.
+        Returns:
+            (int): Base-price.
+        '''
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        '''
+        Returns all (key, base-price) pairs of the index in the order they
+        were compiled in.
+
+        Args:
+            (self)
+        Returns:
+            ([tuple]): (key, base-price) pairs.
+        '''
+        entries = []
+        for slot in range(self.__mask + 1):
+            offset, length, base_price = SLOT.unpack_from(self.__buffer, \
+                                    self.__slots_offset + slot * SLOT.size)
+            if offset != EMPTY_SLOT:
+                entries.append((offset, length, base_price))
+
+        start = self.__keys_offset
+        return [(tuple(bytes(self.__buffer[start + offset:start + offset + \
+                        length]).decode("utf-8").split(KEY_SEPARATOR)), price) \
+                    for offset, length, price in sorted(entries)]
+
+    def close(self):
+        '''
+        Releases the underlying buffer by closing the resource owning it
+        (ex. the mmap), if any. The index cannot be used afterwards.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.__buffer = None
+        if self.__resource is not None:
+            self.__resource.close()
+            self.__resource = None
+
+    ##############################  Overridden  ################################
+
+    def __getitem__(self, key):
+        '''
+        Probes the slot table for key.
+
+        Args:
+            key (tuple): (product-type, option-value-1, .., option-value-n)
+        Returns:
+            (int): Base-price.
+        Raises:
+            KeyError: if key is not in the index.
+            TypeError: if a key value is not a string.
+        '''
+        encoded = encode_key(key)
+        buffer = self.__buffer
+        slot = zlib.crc32(encoded) & self.__mask
+        while True:
+            offset, length, base_price = SLOT.unpack_from(buffer, \
+                                    self.__slots_offset + slot * SLOT.size)
+            if offset == EMPTY_SLOT:
+                raise KeyError(key)
+            start = self.__keys_offset + offset
+            if length == len(encoded) and buffer[start:start + length] == encoded:
+                return base_price
+            slot = (slot + 1) & self.__mask
+
+    def __contains__(self, key):
+        '''
+        Membership (in) of key in the index.
+
+        Args:
+            key (tuple): (product-type, option-value-1, .., option-value-n)
+        Returns:
+            (bool): Whether key is in the index.
+        '''
+        return self.get(key) is not None
+
+    def __len__(self):
+        '''
+        Number of keys in the index.
+
+        Args:
+            (self)
+        Returns:
+            (int): Number of keys.
+        '''
+        return self.__length
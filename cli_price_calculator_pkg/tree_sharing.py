@@ -0,0 +1,134 @@
+'''
+tree_sharing.py
+'''
+import sys
+
+class FrozenLevel(dict):
+    '''
+    Implementation of FrozenLevel as an immutable price_tree level (a dict that
+    refuses mutation), so it can be safely shared between every branch of the
+    price_tree with the same option-values and base-prices.
+    '''
+    __slots__ = ()
+
+    def __blocked(self, *args, **kwargs):
+        '''
+        Replaces every mutating dict method.
+
+        Raises:
+            TypeError: always - shared levels are immutable.
+        '''
+        raise TypeError("Shared price_tree levels are immutable")
+
+    __setitem__ = __delitem__ = __blocked
+    clear = pop = popitem = setdefault = update = __blocked
+
+    def __reduce__(self):
+        '''
+        Pickles as a plain copy of the level (dict pickling would rebuild it
+        item by item through the blocked __setitem__).
+
+        Args:
+            (self)
+        Returns:
+            (tuple): FrozenLevel and a dict of its items.
+        '''
+        return (FrozenLevel, (dict(self),))
+
+def share_subtrees(price_tree):
+    '''
+    Canonicalises identical subtrees of price_tree into shared FrozenLevel(s),
+    turning the tree into a DAG - ex. every colour under a size with the same
+    sizes and base-prices ends up pointing at one level. The top-level (by
+    product-type) stays a mutable dict.
+
+    Levels are canonicalised bottom-up, keyed on their option-values and the
+    identity (or base-price) of their children, so each level is visited once.
+
+    Args:
+        price_tree (dict): price_tree, as generated by BaseProductData.
+    Returns:
+        shared_tree (dict): price_tree with shared levels.
+        report (dict): levels and bytes of the nested-dicts before and after
+                       sharing, and the bytes saved.
+    '''
+    canonical = {}
+    before = {}
+
+    def share(level):
+        '''
+        Returns the canonical FrozenLevel for level, recording every visited
+        level in before.
+        '''
+        before[id(level)] = sys.getsizeof(level)
+        children = {option: share(child) if isinstance(child, dict) else child \
+                        for option, child in level.items()}
+        signature = frozenset((option, ("level", id(child))) \
+                                if isinstance(child, dict) \
+                                else (option, ("price", child)) \
+                              for option, child in children.items())
+        if signature not in canonical:
+            canonical[signature] = FrozenLevel(children)
+        return canonical[signature]
+
+    shared_tree = {product_type: share(level) if isinstance(level, dict) \
+                        else level \
+                   for product_type, level in price_tree.items()}
+
+    bytes_before = sum(before.values())
+    bytes_after = sum(sys.getsizeof(level) for level in canonical.values())
+    report = {
+        "levels_before": len(before),
+        "levels_after": len(canonical),
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_before - bytes_after,
+    }
+    return shared_tree, report
+
+def index_bytes(price_index):
+    '''
+    Returns the bytes of a dict price_index - the dict, its key tuples, and
+    the option-values and base-prices they hold, each object counted once.
+
+    Args:
+        price_index (dict): (product-type, option-value-1, ..) -> base-price
+    Returns:
+        (int): Bytes.
+    '''
+    seen = set()
+    size = sys.getsizeof(price_index)
+    for key, base_price in price_index.items():
+        size += sys.getsizeof(key)
+        for value in key + (base_price,):
+            if id(value) not in seen:
+                seen.add(id(value))
+                size += sys.getsizeof(value)
+    return size
+
+def share_index(price_index):
+    '''
+    Canonicalises the option-values and base-prices of a dict price_index, 
+    so every equal value is one shared object - ex. the "small" of every
+    colour's route, decoded from the JSON as a separate string each time.
+
+    Args:
+        price_index (dict): (product-type, option-value-1, ..) -> base-price
+    Returns:
+        shared_index (dict): price_index with shared values, in the same
+                             order.
+        report (dict): bytes of the price_index before and after sharing
+                       (see index_bytes()).
+    '''
+    # Keyed on the type too, so ex. 1 and True stay apart
+    canonical = {}
+    shared_index = {}
+    for key, base_price in price_index.items():
+        shared_key = tuple([canonical.setdefault((type(value), value), value) \
+                                for value in key])
+        shared_index[shared_key] = canonical.setdefault( \
+                                    (type(base_price), base_price), base_price)
+
+    report = {"index_bytes_before": index_bytes(price_index),
+              "index_bytes_after": index_bytes(shared_index)}
+    return shared_index, report
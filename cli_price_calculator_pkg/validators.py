@@ -0,0 +1,216 @@
+'''
+validators.py
+'''
+import os
+import json
+from cli_price_calculator_pkg.exceptions import ValidationException, \
+                                               SchemaException
+from cli_price_calculator_pkg.json_stream import iter_json_array
+
+# Copies of the Schema/ contracts, installed with the package (package_data)
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), \
+                          "schemas")
+CART_SCHEMA = os.path.join(SCHEMA_DIR, "cart.schema.json")
+BASE_PRICES_SCHEMA = os.path.join(SCHEMA_DIR, "base-prices.schema.json")
+
+# Maximum number of offending records listed in a ValidationException message
+MAX_REPORTED = 10
+
+# JSON schema type -> Python expression that is True for a mismatching value
+TYPE_CHECKS = {
+    "string": "type({0}) is not str",
+    "integer": "type({0}) is not int",
+    "number": "type({0}) not in (int, float)",
+    "boolean": "type({0}) is not bool",
+    "object": "type({0}) is not dict",
+    "array": "type({0}) is not list",
+    "null": "{0} is not None",
+}
+
+class SchemaValidator:
+    '''
+    Implementation of SchemaValidator as a validator of the records (items)
+    of a JSON array against the "items" schema of a Schema/*.json contract.
+    - The schema is compiled once into a specialised Python function (via.
+      generated source), so checking a record interprets no schema.
+    - Supports the draft-04 keywords the contracts use: type, properties,
+      required and items (others, like description, are ignored).
+    '''
+    def __init__(self, schema_path):
+        '''
+        Constructor for SchemaValidator - loads and compiles the schema.
+
+        Args:
+            schema_path (str): Path to a JSON schema of an array.
+        Returns:
+            None.
+        Raises:
+            SchemaException: if the schema cannot be loaded.
+        '''
+        try:
+            with open(schema_path, "r") as schema_f:
+                schema = json.load(schema_f)
+        except (OSError, ValueError):
+            raise SchemaException(f"Could not load schema {schema_path}")
+
+        self.__source = self.__generate_source(schema.get("items", {}))
+        namespace = {"MISSING": object()}
+        exec(compile(self.__source, schema_path, "exec"), namespace)
+        self.__check = namespace["check"]
+
+    def __generate_source(self, schema):
+        '''
+        Generates the source of check(record), which returns an error message
+        for the first violation of schema in record, or None if it is valid.
+
+        Args:
+            schema (dict): Schema of a single record.
+        Returns:
+            (str): Python source.
+        '''
+        lines = ["def check(record):"]
+        self.__variables = 0
+        self.__generate_checks(schema, "record", "record", 1, lines)
+        lines.append("    return None")
+        return "\n".join(lines) + "\n"
+
+    def __generate_checks(self, schema, variable, path, depth, lines):
+        '''
+        Recursively appends the checks of schema on variable to lines.
+
+        Args:
+            schema (dict): (Sub-)schema to check.
+            variable (str): Name of the variable holding the value.
+            path (str): Path of the value, for error messages.
+            depth (int): Indentation level.
+            lines ([str]): Generated source lines.
+        Returns:
+            None.
+        '''
+        indent = "    " * depth
+
+        def fail(condition, message):
+            lines.append(f"{indent}if {condition}:")
+            lines.append(f"{indent}    return {message!r}")
+
+        schema_type = schema.get("type")
+        if schema_type is not None:
+            types = schema_type if isinstance(schema_type, list) \
+                                else [schema_type]
+            condition = " and ".join(f"({TYPE_CHECKS[name].format(variable)})" \
+                                        for name in types)
+            fail(condition, f"{path}: expected {' or '.join(types)}")
+
+        for name in schema.get("required", []):
+            fail(f"{name!r} not in {variable}", \
+                 f"{path}: missing required property {name!r}")
+
+        for name, subschema in schema.get("properties", {}).items():
+            if not any(key in subschema for key in \
+                            ("type", "properties", "required", "items")):
+                continue
+            self.__variables += 1
+            value = f"value_{self.__variables}"
+            lines.append(f"{indent}{value} = {variable}.get({name!r}, MISSING)")
+            lines.append(f"{indent}if {value} is not MISSING:")
+            self.__generate_checks(subschema, value, f"{path}[{name!r}]", \
+                                   depth + 1, lines)
+
+        if "items" in schema:
+            self.__variables += 1
+            item = f"item_{self.__variables}"
+            lines.append(f"{indent}for {item} in {variable}:")
+            self.__generate_checks(schema["items"], item, f"{path}[]", \
+                                   depth + 1, lines)
+            # Keep the loop body non-empty for a schema without checks
+            lines.append(f"{indent}    pass")
+
+    def check(self, record):
+        '''
+        Checks a single record.
+
+        Args:
+            record (any): A decoded record.
+        Returns:
+            (str): Error message for the first violation, or None if valid.
+        '''
+        return self.__check(record)
+
+    def validate(self, records, source = None):
+        '''
+        Checks every record in a single pass, then raises for all offending
+        records at once.
+
+        Args:
+            records (iterable): Decoded records (ex. streamed).
+            source (str): Name of the input, for the error message.
+        Returns:
+            (int): Number of (valid) records.
+        Raises:
+            ValidationException: listing the offending record indices.
+        '''
+        check = self.__check
+        errors = []
+        count = 0
+        for index, record in enumerate(records):
+            count += 1
+            error = check(record)
+            if error is not None:
+                errors.append((index, error))
+
+        if errors:
+            reported = "; ".join(f"[{index}] {error}" \
+                                    for index, error in errors[:MAX_REPORTED])
+            if len(errors) > MAX_REPORTED:
+                reported += f"; ... {len(errors) - MAX_REPORTED} more"
+            raise ValidationException(f"{len(errors)} invalid record(s) in " + \
+                                      f"{source or 'input'} - {reported}", \
+                                      errors = errors)
+        return count
+
+    def validate_file(self, json_path):
+        '''
+        Streams the JSON array in json_path and validates its records in a
+        single pass, without holding the array in memory.
+
+        Args:
+            json_path (str): Path to a JSON file with an array at the top-level.
+        Returns:
+            (int): Number of (valid) records.
+        Raises:
+            ValidationException: listing the offending record indices.
+            OSError, ValueError: if json_path cannot be read or parsed.
+        '''
+        return self.validate(iter_json_array(json_path), source = json_path)
+
+    ##############################  Properties  ################################
+
+    @property
+    def source(self):
+        '''
+        Property-based Getter for the generated source of check().
+
+        Args:
+            (self)
+        Returns
+            (str): Python source.
+        '''
+        return self.__source
+
+# Compiled validators, by schema path
+_validators = {}
+
+def get_validator(schema_path):
+    '''
+    Returns the SchemaValidator for schema_path, compiling it on first use.
+
+    Args:
+        schema_path (str): Path to a JSON schema (ex. CART_SCHEMA).
+    Returns:
+        (SchemaValidator): Compiled validator.
+    Raises:
+        SchemaException: if the schema cannot be loaded.
+    '''
+    if schema_path not in _validators:
+        _validators[schema_path] = SchemaValidator(schema_path)
+    return _validators[schema_path]
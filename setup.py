@@ -13,5 +13,6 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/namanj123in/rb-price-calculator",
     packages=setuptools.find_packages(),
+    package_data={"cli_price_calculator_pkg": ["schemas/*.json"]},
     python_requires='>=3.2.5',
 )
\ No newline at end of file
@@ -0,0 +1,148 @@
+'''
+test_batch.py
+To run: `python -m unittest tests.test_batch -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.batch import price_carts
+from cli_price_calculator_pkg.product_data import BaseProductData
+
+class TestBatch(unittest.TestCase):
+    '''
+    Testing file for batch mode (batch.py) in main package 
+    cli_price_calculator_pkg.
+
+    Cases:
+        - Tests a glob of the 'normal' test cart files is priced as expected,
+          against one BaseProductData.
+        - Tests an NDJSON stream of carts yields a result per cart, with 
+          errors reported per cart instead of exiting.
+        - Tests the CLI reports an unreadable batch source as a read error,
+          and stops quietly when the reader of its results goes away.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestBatch is called. 
+        
+        Sets absolute path to tests\fixtures, a temporary directory and the 
+        'normal' base-prices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.temp_dir = tempfile.mkdtemp()
+        self.prices = BaseProductData(join(self.abs_path, 
+                                           "base-prices-normal.json"))
+
+    @classmethod
+    def tearDownClass(self):
+        '''
+        Removes the temporary directory.
+        '''
+        shutil.rmtree(self.temp_dir)
+
+    def test_glob_batch(self):
+        '''
+        Tests if the carts matching cart-*-normal.json are priced, in order of
+        name, to their expected totals.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        results = list(price_carts(join(self.abs_path, "cart-*-normal.json"), 
+                                   self.prices))
+
+        expected = []
+        for cart_file in sorted(os.listdir(self.abs_path)):
+            if cart_file.startswith("cart-") and \
+                    cart_file.endswith("-normal.json"):
+                with open(join(self.abs_path, 
+                               cart_file[:-5] + "-expected.json"), "r") as f:
+                    expected.append({"cart": join(self.abs_path, cart_file), 
+                                     "total": json.load(f)["total_price"]})
+        self.assertEqual(results, expected)
+
+    def test_ndjson_batch(self):
+        '''
+        Tests if every line of an NDJSON stream of carts gets a result - its 
+        total, or its error.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        with open(join(self.abs_path, "cart-4560-normal.json"), "r") as f:
+            products = json.load(f)
+        unknown = [{"product-type": "unknown", "options": {}, 
+                    "artist-markup": 10, "quantity": 1}]
+
+        carts = join(self.temp_dir, "carts.ndjson")
+        with open(carts, "w") as f:
+            f.write(json.dumps(products) + "\n")
+            f.write(json.dumps({"id": "b2b-1", "products": products}) + "\n")
+            f.write(json.dumps(unknown) + "\n")
+            f.write("not json\n")
+
+        results = list(price_carts(carts, self.prices))
+        self.assertEqual(results[:2], [{"cart": 0, "total": 4560}, 
+                                       {"cart": "b2b-1", "total": 4560}])
+        self.assertEqual([result["cart"] for result in results], 
+                         [0, "b2b-1", 2, 3])
+        self.assertIn("Unknown product-type", results[2]["error"])
+        self.assertIn("error", results[3])
+
+    def test_batch_cli_errors(self):
+        '''
+        Tests if the --batch CLI exits with "Could not read" for a missing
+        NDJSON source, and without a traceback (or a read error) when its 
+        stdout is closed early.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        command = [sys.executable, "-m", "cli_price_calculator_pkg", "--batch"]
+        json_prices = join(self.abs_path, "base-prices-normal.json")
+
+        missing = subprocess.run(command + [join(self.temp_dir, "none.ndjson"), 
+                                            json_prices], 
+                                 capture_output = True, text = True)
+        self.assertNotEqual(missing.returncode, 0)
+        self.assertIn("Could not read", missing.stderr)
+
+        carts = join(self.temp_dir, "many.ndjson")
+        with open(carts, "w") as f:
+            f.write("[]\n" * 100000)
+        process = subprocess.Popen(command + [carts, json_prices], 
+                                   stdout = subprocess.PIPE, 
+                                   stderr = subprocess.PIPE, text = True)
+        self.assertEqual(json.loads(process.stdout.readline()), 
+                         {"cart": 0, "total": 0})
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.wait()
+        process.stderr.close()
+        self.assertNotIn("Traceback", stderr)
+        self.assertNotIn("Could not", stderr)
@@ -0,0 +1,158 @@
+'''
+test_benchmarks.py
+To run: `python -m unittest tests.test_benchmarks -v`(from top-level folder)
+
+More information in README.
+'''
+import shutil
+import tempfile
+import unittest
+from benchmarks.generator import generate_catalog, generate_cart
+from benchmarks.suite import write_workload, run_scenario, PHASES, SCENARIOS
+from benchmarks.regression import summarise, compare, skipped, \
+                                  format_diff, sample_scenario, save_baseline, \
+                                  load_baseline, baseline_path
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+
+class TestBenchmarks(unittest.TestCase):
+    '''
+    Testing file for the synthetic workload generator and the benchmark
+    suite (benchmarks/).
+
+    Cases:
+        - Tests the generator is deterministic for a seed, and the catalog
+          has a record per combination of value groups.
+        - Tests every line item of a generated cart can be priced against the
+          generated catalog.
+        - Tests a scenario reports every phase, with the cart total.
+        - Tests the regression gate flags a phase only beyond both the
+          relative threshold and the noise of its baseline, reports the
+          scenarios it cannot compare, and baselines round-trip per machine
+          fingerprint.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestBenchmarks is called. 
+        
+        Sets a tiny workload and a temporary directory.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.params = dict(SCENARIOS["small"], cart_size = 200)
+        self.tmp_path = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(self):
+        '''
+        Removes the temporary directory.
+        '''
+        shutil.rmtree(self.tmp_path)
+
+    def test_generator(self):
+        '''
+        Tests the generator is deterministic, and the shape of the catalog.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.assertEqual(generate_catalog(seed = 1), generate_catalog(seed = 1))
+        self.assertEqual(generate_cart(seed = 1, duplication = 0.5), \
+                         generate_cart(seed = 1, duplication = 0.5))
+        self.assertNotEqual(generate_cart(seed = 1), generate_cart(seed = 2))
+
+        # 3 product-types x (4 values / fanout 2) ** 3 option-types
+        catalog = generate_catalog(product_types = 3, option_types = 3, \
+                                   values_per_option = 4, fanout = 2)
+        self.assertEqual(len(catalog), 3 * 2 ** 3)
+
+    def test_generated_cart_prices(self):
+        '''
+        Tests the generated cart is priced against the generated catalog.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        json_prices, json_cart = write_workload(self.tmp_path, self.params)
+        cart = Cart(json_cart)
+        self.assertEqual(cart.get_count(), self.params["cart_size"])
+        self.assertGreater(CLIPriceCalculator(cart, \
+                                BaseProductData(json_prices)).cart_total, 0)
+
+    def test_run_scenario(self):
+        '''
+        Tests a scenario reports the timings of every phase.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        report = run_scenario("tiny", self.params)
+        self.assertEqual(report["scenario"], "tiny")
+        self.assertGreater(report["cart_total"], 0)
+        self.assertEqual(tuple(report["phases"]), PHASES)
+        for phase in report["phases"].values():
+            self.assertGreaterEqual(phase["seconds"], 0)
+            self.assertGreater(phase["items"], 0)
+            self.assertIn("peak_bytes", phase)
+        self.assertEqual(report["phases"]["lookup"]["items"], \
+                         self.params["cart_size"])
+
+        report = run_scenario("tiny", self.params, memory = False)
+        self.assertNotIn("peak_bytes", report["phases"]["total"])
+
+    def test_regression_gate(self):
+        '''
+        Tests the comparison of samples with a baseline.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        def results(samples):
+            return {"scenarios": {"tiny": {"params": self.params, "seed": 0, 
+                        "phases": {phase: summarise(samples) \
+                                    for phase in PHASES}}}}
+
+        baseline = results([1.0, 1.1, 0.9, 1.0, 1.0])
+        rows = compare(baseline, results([1.05] * 5), threshold = 0.10)
+        self.assertEqual(len(rows), len(PHASES))
+        self.assertFalse(any(row["regressed"] for row in rows))
+
+        rows = compare(baseline, results([1.5] * 5), threshold = 0.10)
+        self.assertTrue(all(row["regressed"] for row in rows))
+        self.assertIn("+50.0%", format_diff(rows))
+
+        # Within the noise of the baseline
+        noisy = results([1.0, 2.0, 0.5, 1.0, 1.5])
+        rows = compare(noisy, results([1.5] * 5), threshold = 0.10)
+        self.assertFalse(any(row["regressed"] for row in rows))
+
+        # Other params - not compared
+        other = results([1.0] * 5)
+        other["scenarios"]["tiny"]["seed"] = 1
+        self.assertEqual(compare(other, results([1.5] * 5)), [])
+        self.assertEqual(skipped(other, results([1.5] * 5)), 
+                         [("tiny", "seed differs from the baseline")])
+        self.assertEqual(skipped(baseline, results([1.5] * 5)), [])
+        self.assertEqual(skipped({"scenarios": {}}, results([1.5] * 5)),
+                         [("tiny", "not in the baseline")])
+
+        samples = sample_scenario(self.params, warmup = 0, repeat = 2)
+        self.assertEqual(len(samples["lookup"]["samples"]), 2)
+
+        path = baseline_path("fingerprint", self.tmp_path)
+        save_baseline(path, baseline)
+        self.assertEqual(load_baseline(path), baseline)
+        self.assertIsNone(load_baseline(baseline_path("other", self.tmp_path)))
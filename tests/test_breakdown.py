@@ -0,0 +1,100 @@
+'''
+test_breakdown.py
+To run: `python -m unittest tests.test_breakdown -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.breakdown import BreakdownWriter, FIELDS
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+
+class TestBreakdown(unittest.TestCase):
+    '''
+    Testing file for the per-line-item breakdown (breakdown.py) in main 
+    package cli_price_calculator_pkg.
+
+    Cases:
+        - Tests NDJSON and CSV breakdowns have a row per line item, whose line
+          totals add up to the cart total.
+        - Tests for ValueError on an unknown format.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestBreakdown is called. 
+        
+        Sets absolute path to tests\fixtures and a temporary directory.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.temp_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(self):
+        '''
+        Removes the temporary directory.
+        '''
+        shutil.rmtree(self.temp_dir)
+
+    def test_breakdown_formats(self):
+        '''
+        Tests the NDJSON and CSV breakdowns of cart-repeated_cart_value.json.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        cart = Cart(join(self.abs_path, "cart-repeated_cart_value.json"))
+        prices = BaseProductData(join(self.abs_path, 
+                                      "base-prices-custom_option.json"))
+
+        ndjson_path = join(self.temp_dir, "breakdown.ndjson")
+        with BreakdownWriter(ndjson_path) as breakdown:
+            total = CLIPriceCalculator(cart, prices, 
+                                       breakdown = breakdown).cart_total
+        with open(ndjson_path, "r") as f:
+            rows = [json.loads(line) for line in f]
+
+        self.assertEqual(total, 29270)
+        self.assertEqual([row["line"] for row in rows], [0, 1, 2, 3])
+        self.assertEqual(sum(row["line_total"] for row in rows), total)
+        self.assertEqual(rows[0], {"line": 0, "product_type": "hoodie", 
+                                   "base_price": 3500, "markup": 1050, 
+                                   "quantity": 2, "line_total": 9100})
+
+        csv_path = join(self.temp_dir, "breakdown.csv")
+        with BreakdownWriter(csv_path, "csv") as breakdown:
+            CLIPriceCalculator(cart, prices, breakdown = breakdown)
+        with open(csv_path, "r", newline = "") as f:
+            csv_rows = list(csv.reader(f))
+
+        self.assertEqual(tuple(csv_rows[0]), FIELDS)
+        self.assertEqual([[str(value) for value in row.values()] 
+                            for row in rows], csv_rows[1:])
+
+    def test_unknown_format(self):
+        '''
+        Tests if ValueError is raised for an unknown breakdown format.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        with self.assertRaises(ValueError):
+            BreakdownWriter(join(self.temp_dir, "breakdown.xml"), "xml")
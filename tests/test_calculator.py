@@ -11,6 +11,7 @@ from os.path import join
 from cli_price_calculator_pkg.cart import Cart
 from cli_price_calculator_pkg.product_data import BaseProductData
 from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+from cli_price_calculator_pkg.coalesce import coalesce_products
 
 class TestCalculator(unittest.TestCase):
     '''
@@ -28,6 +29,9 @@ class TestCalculator(unittest.TestCase):
         - Tests calculated total cart price for an empty cart.
         - Tests calculated total cart price for a cart with duplicate products
           with different quantities.
+        - Every case is also calculated for the streamed Cart (stream=True)
+          and with coalesced products (coalesce=True).
+        - Tests coalescing groups repeated products into one line item.
     '''
     @classmethod
     def setUpClass(self):
@@ -126,6 +130,27 @@ class TestCalculator(unittest.TestCase):
                                  "base-prices-custom_option.json"
                                 )
 
+    def test_coalesce_products(self):
+        '''
+        Tests if the repeated leggings of cart-repeated_cart_value.json are 
+        coalesced into a single line item with their summed quantity.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        cart = Cart(join(self.abs_path, "cart-repeated_cart_value.json"))
+        base_prices = BaseProductData(join(self.abs_path, 
+                                           "base-prices-custom_option.json"))
+
+        line_items = coalesce_products(cart.products, base_prices)
+        self.assertEqual([(product.product_type, quantity) \
+                            for product, quantity in line_items],
+                         [("hoodie", 2), ("sticker", 1), ("leggings", 3)])
+
     def general_test_runner(self, cart, expected, prices):
         '''
         A general test runner for total_price tests. Checks if the calculated
@@ -153,3 +178,11 @@ class TestCalculator(unittest.TestCase):
             expected_total = json.load(f)["total_price"]
 
         self.assertEqual(calculator.cart_total, expected_total)
+
+        calculator = CLIPriceCalculator(cart, base_prices, coalesce = True)
+        self.assertEqual(calculator.cart_total, expected_total)
+
+        # Streamed cart - same total, products consumed as a generator
+        calculator = CLIPriceCalculator(Cart(test_cart, stream = True), 
+                                        base_prices)
+        self.assertEqual(calculator.cart_total, expected_total)
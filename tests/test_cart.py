@@ -6,6 +6,8 @@ More information in README.
 '''
 import os
 import json
+import shutil
+import tempfile
 import unittest
 from os.path import join
 from cli_price_calculator_pkg.cart import Cart
@@ -20,6 +22,8 @@ class TestCart(unittest.TestCase):
         - Tests Cart counts and content for 'normal' test cart files - ie., 
           files mentioned in NORMAL_FILES.json
         - Tests Cart count and content for an empty cart file.
+        - Tests streamed Cart(s) (JSON array and NDJSON) yield the same 
+          products as the loaded Cart.
     '''
     @classmethod
     def setUpClass(self):
@@ -34,15 +38,15 @@ class TestCart(unittest.TestCase):
             None.
         '''
         self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.temp_dir = tempfile.mkdtemp()
 
     @classmethod
     def tearDownClass(self):
         '''
-        Runs at the end of the TestCart call to perform clean-up duties. No
-        real purpose at the moment as no side-effects take place but might need
-        in the future.
+        Runs at the end of the TestCart call to perform clean-up duties - 
+        removes the temporary directory.
         '''
-        pass
+        shutil.rmtree(self.temp_dir)
 
     ################################  TESTS  ##################################
 
@@ -118,6 +122,39 @@ class TestCart(unittest.TestCase):
                                  "cart-0-empty-expected.json"
                                 )
 
+    def test_streamed_cart(self):
+        '''
+        Tests if streamed Cart(s) - of the 'normal' cart files, the empty cart
+        and their NDJSON equivalents - have the same count and content as the 
+        loaded Cart(s), and yield CartProduct(s) lazily.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        with open(os.path.join(self.abs_path, "NORMAL_FILES.json"), "r") as f:
+            cart_files = json.load(f)["cart_files"] + ["cart-0-empty"]
+
+        for cart_file in cart_files:
+            test_cart = join(self.abs_path, f"{cart_file}.json")
+            loaded = Cart(test_cart)
+
+            # NDJSON equivalent of the cart - one product per line
+            with open(test_cart, "r") as f:
+                products = json.load(f)
+            ndjson_cart = join(self.temp_dir, f"{cart_file}.ndjson")
+            with open(ndjson_cart, "w") as f:
+                f.writelines(json.dumps(product) + "\n" for product in products)
+
+            for streamed_file in (test_cart, ndjson_cart):
+                streamed = Cart(streamed_file, stream = True)
+                self.assertEqual(streamed.get_count(), loaded.get_count())
+                self.assertEqual(str(streamed), str(loaded))
+                self.assertFalse(isinstance(streamed.products, list))
+
     def counts_test_runner(self, cart, expected):
         '''
         A general test runner for cart count and content tests. 
@@ -0,0 +1,126 @@
+'''
+test_cart_batch.py
+To run: `python -m unittest tests.test_cart_batch -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import json
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.exceptions import SchemaException
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.cart_batch import CartBatch
+from cli_price_calculator_pkg.cart_product import SlottedCartProduct, \
+                                                 CartProduct
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+
+class TestCartBatch(unittest.TestCase):
+    '''
+    Testing file for class CartBatch (cart_batch.py) in main package 
+    cli_price_calculator_pkg.
+
+    Cases:
+        - Tests the columns of CartBatch(s) of the 'normal' test cart files 
+          match their Cart(s), and they price to the expected totals.
+        - Tests rows are SlottedCartProduct(s), without a __dict__.
+        - Tests for SchemaException on an artist-markup or quantity too large
+          for its column, leaving the columns the same length.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestCartBatch is called. 
+        
+        Sets absolute path to tests\fixtures.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+
+    def test_normal_batches(self):
+        '''
+        Tests if CartBatch(s) of the 'normal' carts store the same products,
+        with one interned key per distinct price_index key, and price to the
+        expected totals.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        with open(join(self.abs_path, "NORMAL_FILES.json"), "r") as f:
+            normal_cart_files = json.load(f)["cart_files"]
+        prices = BaseProductData(join(self.abs_path, "base-prices-normal.json"))
+
+        for cart_file in normal_cart_files:
+            cart = Cart(join(self.abs_path, f"{cart_file}.json"))
+            batch = CartBatch.from_products(cart.iter_products(), prices)
+
+            self.assertEqual(batch.get_count(), cart.get_count())
+            self.assertEqual(list(batch.artist_markups), 
+                             [product.artist_markup for product in cart.products])
+            self.assertEqual(list(batch.quantities), 
+                             [product.quantity for product in cart.products])
+            self.assertEqual([batch.keys[key_id] for key_id in batch.key_ids],
+                             [prices.price_key(product) \
+                                for product in cart.products])
+            self.assertEqual(len(set(batch.keys)), len(batch.keys))
+
+            with open(join(self.abs_path, f"{cart_file}-expected.json"), "r") as f:
+                expected_total = json.load(f)["total_price"]
+            self.assertEqual(CLIPriceCalculator(batch, prices).cart_total, 
+                             expected_total)
+
+    def test_slotted_rows(self):
+        '''
+        Tests if the rows of a CartBatch are SlottedCartProduct(s), without a 
+        per-instance __dict__.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        prices = BaseProductData(join(self.abs_path, "base-prices-normal.json"))
+        cart = Cart(join(self.abs_path, "cart-4560-normal.json"))
+        batch = CartBatch.from_products(cart.iter_products(), prices)
+
+        for row in batch.iter_products():
+            self.assertIsInstance(row, SlottedCartProduct)
+            self.assertFalse(hasattr(row, "__dict__"))
+
+    def test_column_overflow(self):
+        '''
+        Tests for SchemaException if an artist-markup or quantity does not fit
+        its column, and the columns stay the same length.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        prices = BaseProductData(join(self.abs_path, "base-prices-normal.json"))
+        cart = Cart(join(self.abs_path, "cart-4560-normal.json"))
+        product = cart.products[0]
+        batch = CartBatch.from_products([product], prices)
+
+        for artist_markup, quantity in [(2 ** 31, 1), (20, 2 ** 63)]:
+            large = CartProduct(product.product_type, product.options, 
+                                artist_markup, quantity)
+            with self.assertRaises(SchemaException):
+                CartBatch.from_products([large], prices)
+            with self.assertRaises(SchemaException):
+                batch.append(large)
+            self.assertEqual((len(batch.artist_markups), len(batch.quantities)),
+                             (1, 1))
@@ -0,0 +1,114 @@
+'''
+test_cart_chunks.py
+To run: `python -m unittest tests.test_cart_chunks -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.cart_chunks import price_cart_parallel
+from cli_price_calculator_pkg.exceptions import SchemaException
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+
+class TestCartChunks(unittest.TestCase):
+    '''
+    Testing file for intra-cart parallel pricing (cart_chunks.py) in main 
+    package cli_price_calculator_pkg.
+
+    Cases:
+        - Tests the chunked total of a large NDJSON cart (split into byte 
+          ranges) and of a loaded cart equals the sequential total.
+        - Tests the first invalid line item is reported by its global index.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestCartChunks is called. 
+        
+        Sets absolute path to tests\fixtures, the 'normal' base-prices and 
+        the products of a 'normal' cart, and a temporary directory.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.temp_dir = tempfile.mkdtemp()
+        self.prices = BaseProductData(join(self.abs_path, 
+                                           "base-prices-normal.json"))
+        with open(join(self.abs_path, "cart-9363-normal.json"), "r") as f:
+            self.products = json.load(f)
+
+    @classmethod
+    def tearDownClass(self):
+        '''
+        Removes the temporary directory.
+        '''
+        shutil.rmtree(self.temp_dir)
+
+    def write_ndjson_cart(self, products):
+        '''
+        Writes products as an NDJSON cart, one line item per line.
+
+        Args:
+            products (list): Cart products.
+        Returns:
+            (str): Path to the NDJSON cart.
+        '''
+        json_cart = join(self.temp_dir, "cart.ndjson")
+        with open(json_cart, "w") as f:
+            f.writelines(json.dumps(product) + "\n" for product in products)
+        return json_cart
+
+    def test_chunked_totals(self):
+        '''
+        Tests if pricing chunks of line items in worker processes gives the
+        sequential total, for a streamed NDJSON cart and a loaded cart.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        json_cart = self.write_ndjson_cart(self.products * 250)
+        cart = Cart(json_cart, stream = True)
+        expected = CLIPriceCalculator(cart, self.prices).cart_total
+
+        for workers in (1, 3):
+            self.assertEqual(price_cart_parallel(cart, self.prices, workers), 
+                             expected)
+
+        cart = Cart(join(self.abs_path, "cart-9363-normal.json"))
+        self.assertEqual(price_cart_parallel(cart, self.prices, 2, 
+                                             chunk_size = 1), 9363)
+
+    def test_global_error_index(self):
+        '''
+        Tests if the first invalid line item - in cart order - is reported by
+        its index in the whole cart.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        products = self.products * 300
+        products[437] = {"product-type": "unknown", "options": {}, 
+                         "artist-markup": 10, "quantity": 1}
+        products[580] = {"product-type": "hoodie"}
+        cart = Cart(self.write_ndjson_cart(products), stream = True)
+
+        with self.assertRaises(SchemaException) as context:
+            price_cart_parallel(cart, self.prices, 3)
+        self.assertTrue(context.exception.message.startswith("Line-item 437:"))
@@ -0,0 +1,177 @@
+'''
+test_json_backend.py
+To run: `python -m unittest tests.test_json_backend -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import glob
+import math
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from cli_price_calculator_pkg import json_backend
+
+class TestJSONBackend(unittest.TestCase):
+    '''
+    Testing file for the JSON backend (json_backend.py) in main package 
+    cli_price_calculator_pkg.
+
+    Cases:
+        - Tests every fixture parses identically with the stdlib and orjson 
+          decoders, read whole or memory-mapped, and as a streamed (or opted-
+          in whole) array.
+        - Tests documents orjson rejects still parse as with the stdlib.
+        - Tests the decoders recorded for documents and arrays are the ones
+          that actually parsed them.
+        - Tests for ValueError on an unknown (or missing) backend.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestJSONBackend is called. 
+        
+        Sets absolute path to tests\fixtures and a temporary directory.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.tmp_path = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(self):
+        '''
+        Removes the temporary directory.
+        '''
+        shutil.rmtree(self.tmp_path)
+
+    def setUp(self):
+        '''
+        Records the backend in use, restored after every test.
+        '''
+        self.backend = json_backend.get_backend()
+
+    def tearDown(self):
+        '''
+        Restores the backend in use before the test.
+        '''
+        json_backend.set_backend(self.backend)
+
+    def load_all(self, backend, json_path):
+        '''
+        Returns json_path parsed by backend - read whole, memory-mapped, and
+        (for arrays) streamed.
+        '''
+        json_backend.set_backend(backend)
+        loaded = json_backend.load_path(json_path)
+        self.assertEqual(json_backend.load_path(json_path, 
+                                                mmap_threshold = 1), loaded)
+        if isinstance(loaded, list):
+            self.assertEqual(list(json_backend.iter_array(json_path)), loaded)
+            json_backend.set_whole_arrays(True)
+            try:
+                self.assertEqual(list(json_backend.iter_array(json_path)), 
+                                 loaded)
+            finally:
+                json_backend.set_whole_arrays(False)
+        return loaded
+
+    @unittest.skipUnless(json_backend.orjson, "orjson is not installed")
+    def test_identical_backends(self):
+        '''
+        Tests the stdlib and orjson decoders parse every fixture alike.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        json_paths = sorted(glob.glob(join(self.abs_path, "*.json")))
+        self.assertTrue(json_paths)
+        for json_path in json_paths:
+            with self.subTest(json_path = json_path):
+                self.assertEqual(self.load_all("orjson", json_path), 
+                                 self.load_all("stdlib", json_path))
+
+    def test_stdlib_fallback(self):
+        '''
+        Tests documents outside of what orjson accepts.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        json_path = join(self.tmp_path, "extended.json")
+        with open(json_path, "wb") as json_f:
+            json_f.write(b'[NaN, 123456789012345678901234567890, "\\u00e9"]')
+
+        for backend in ("auto", "stdlib"):
+            json_backend.set_backend(backend)
+            not_a_number, big, text = json_backend.load_path(json_path)
+            self.assertTrue(math.isnan(not_a_number))
+            self.assertEqual(big, 123456789012345678901234567890)
+            self.assertEqual(text, "é")
+
+            with self.assertRaises(ValueError):
+                json_backend.loads(b"[1,")
+
+    @unittest.skipUnless(json_backend.orjson, "orjson is not installed")
+    def test_decoders_used(self):
+        '''
+        Tests the decoders recorded as used - orjson for documents (and the
+        stdlib for one it rejects), the stdlib for streamed arrays unless 
+        they are parsed whole.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        json_path = join(self.abs_path, "base-prices-normal.json")
+        json_backend.set_backend("orjson")
+        json_backend._decoders_used.clear()
+        try:
+            json_backend.load_path(json_path)
+            list(json_backend.iter_array(json_path))
+            self.assertEqual(json_backend.get_decoders_used(), 
+                             {"documents": ["orjson"], "arrays": ["stdlib"]})
+
+            json_backend.loads(b"[NaN]")
+            json_backend.set_whole_arrays(True)
+            json_backend._decoders_used.pop("arrays")
+            list(json_backend.iter_array(json_path))
+            self.assertEqual(json_backend.get_decoders_used(), 
+                             {"documents": ["orjson", "stdlib"], 
+                              "arrays": ["orjson"]})
+        finally:
+            json_backend.set_whole_arrays(False)
+            json_backend._decoders_used.clear()
+
+    def test_unknown_backend(self):
+        '''
+        Tests for ValueError on an unknown or missing backend.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        with self.assertRaises(ValueError):
+            json_backend.set_backend("simdjson")
+        if json_backend.orjson is None:
+            with self.assertRaises(ValueError):
+                json_backend.set_backend("orjson")
+        self.assertEqual(json_backend.set_backend("stdlib"), "stdlib")
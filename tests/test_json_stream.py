@@ -0,0 +1,133 @@
+'''
+test_json_stream.py
+To run: `python -m unittest tests.test_json_stream -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.json_stream import iter_json_array
+
+class TestJSONStream(unittest.TestCase):
+    '''
+    Testing file for the streaming JSON loader (json_stream.py) in main 
+    package cli_price_calculator_pkg.
+
+    Cases:
+        - Tests streamed elements match json.load for all fixture arrays, at
+          chunk sizes small enough to split every element.
+        - Tests numbers split by every chunk size decode whole.
+        - Tests for ValueError on malformed or non-array JSON.
+        - Tests a malformed early element is rejected without reading the
+          rest of the file.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestJSONStream is called. 
+        
+        Sets absolute path to tests\fixtures and a temporary directory.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.temp_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(self):
+        '''
+        Removes the temporary directory.
+        '''
+        shutil.rmtree(self.temp_dir)
+
+    def test_fixture_arrays(self):
+        '''
+        Tests if streaming every fixture array (cart and base-prices files) 
+        yields the same elements as json.load.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        for file_name in sorted(os.listdir(self.abs_path)):
+            with open(join(self.abs_path, file_name), "r") as f:
+                expected = json.load(f)
+            if not isinstance(expected, list):
+                continue
+
+            for chunk_size in (1, 7, 4096):
+                actual = list(iter_json_array(join(self.abs_path, file_name),
+                                              chunk_size = chunk_size))
+                self.assertEqual(actual, expected, file_name)
+
+    def test_split_numbers(self):
+        '''
+        Tests if arrays of numbers (bare, and nested in the elements) stream
+        as json.load reads them at every chunk size, so a number cut by a 
+        chunk boundary (ex. "1e" | "5") is never decoded as its prefix.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        contents = ["[1e5, 12.5]", "[1e5,12.5]", "[-0.25E-3,100,0,1234567]",
+                    "[ 3.14159 , 2E+10 ]\n", "[12345678901234567890]",
+                    '[{"base-price": 1e3}, [1.5, -2], 7, true, null]']
+        json_path = join(self.temp_dir, "numbers.json")
+        for content in contents:
+            with open(json_path, "w") as f:
+                f.write(content)
+            for chunk_size in range(1, len(content) + 1):
+                with self.subTest(content = content, chunk_size = chunk_size):
+                    self.assertEqual(list(iter_json_array(json_path, 
+                                            chunk_size = chunk_size)), 
+                                     json.loads(content))
+
+    def test_malformed_json(self):
+        '''
+        Tests if ValueError is raised for malformed or non-array JSON.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        for content in ["", "{}", "[1, 2", "[1 2]", "[1,]", "[1x]", "[1e]"]:
+            json_path = join(self.temp_dir, "malformed.json")
+            with open(json_path, "w") as f:
+                f.write(content)
+
+            with self.assertRaises(ValueError):
+                list(iter_json_array(json_path, chunk_size = 2))
+
+    def test_malformed_early_element(self):
+        '''
+        Tests a malformed element is raised from the chunk it is found in.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        json_path = join(self.temp_dir, "malformed_early.json")
+        with open(json_path, "w") as f:
+            f.write('[{"quantity": 1}, {"quantity": nope}, ' + 
+                    ", ".join(['{"quantity": 1}'] * 100000) + "]")
+
+        with self.assertRaises(json.JSONDecodeError) as context:
+            list(iter_json_array(json_path, chunk_size = 4096))
+        self.assertLessEqual(len(context.exception.doc), 2 * 4096)
+        self.assertEqual(context.exception.msg, "Expecting value")
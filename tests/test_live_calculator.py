@@ -0,0 +1,107 @@
+'''
+test_live_calculator.py
+To run: `python -m unittest tests.test_live_calculator -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.cart_product import CartProduct
+from cli_price_calculator_pkg.exceptions import SchemaException
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+from cli_price_calculator_pkg.live_calculator import LiveCartCalculator
+
+class TestLiveCalculator(unittest.TestCase):
+    '''
+    Testing file for class LiveCartCalculator (live_calculator.py) and the
+    mutable Cart in main package cli_price_calculator_pkg.
+
+    Cases:
+        - Tests the live total follows line items being added, updated and 
+          removed, matching a full re-calculation after every change.
+        - Tests a change without a base-price is rejected, leaving the cart 
+          and the total unchanged.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestLiveCalculator is called. 
+        
+        Sets absolute path to tests\fixtures and the base-prices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.prices = BaseProductData(join(self.abs_path, 
+                                           "base-prices-custom_option.json"))
+
+    def assert_total(self, cart, calculator):
+        '''
+        Asserts the live total equals the total of a full calculation.
+        '''
+        self.assertEqual(calculator.cart_total, 
+                         CLIPriceCalculator(cart, self.prices).cart_total)
+
+    def test_live_changes(self):
+        '''
+        Tests the live total after adding, updating and removing line items.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        cart = Cart(join(self.abs_path, "cart-repeated_cart_value.json"))
+        calculator = LiveCartCalculator(cart, self.prices)
+        self.assertEqual(calculator.cart_total, 29270)
+
+        line_id = cart.add_product(CartProduct("leggings", {"size": "small"}, 
+                                               20, 4))
+        self.assertEqual(line_id, 4)
+        self.assert_total(cart, calculator)
+
+        cart.update_product(0, quantity = 5)
+        cart.update_product(line_id, artist_markup = 55)
+        self.assertEqual(cart.get_product(0).quantity, 5)
+        self.assert_total(cart, calculator)
+
+        removed = cart.remove_product(1)
+        self.assertEqual(removed.product_type, "sticker")
+        self.assertEqual([line for line, _ in cart.lines()], [0, 2, 3, 4])
+        self.assert_total(cart, calculator)
+
+        calculator.close()
+        cart.remove_product(0)
+        self.assertNotEqual(calculator.cart_total, 
+                            CLIPriceCalculator(cart, self.prices).cart_total)
+
+    def test_rejected_change(self):
+        '''
+        Tests adding a product without a base-price raises SchemaException,
+        without changing the cart or the total.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        cart = Cart(join(self.abs_path, "cart-repeated_cart_value.json"))
+        calculator = LiveCartCalculator(cart, self.prices)
+
+        with self.assertRaises(SchemaException):
+            cart.add_product(CartProduct("unknown", {}, 0, 1))
+        with self.assertRaises(KeyError):
+            cart.update_product(42, quantity = 1)
+
+        self.assertEqual(cart.get_count(), 4)
+        self.assertEqual(calculator.cart_total, 29270)
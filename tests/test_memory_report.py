@@ -0,0 +1,104 @@
+'''
+test_memory_report.py
+To run: `python -m unittest tests.test_memory_report -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+from cli_price_calculator_pkg.memory_report import memory_report, \
+                                                  product_tree_stats
+
+class TestMemoryReport(unittest.TestCase):
+    '''
+    Testing file for the memory footprint report (memory_report.py) in main
+    package cli_price_calculator_pkg.
+
+    Cases:
+        - Tests the shape of a price_tree level - nodes, leaves, depth, 
+          fan-out and expansion - with shared subtrees counted once.
+        - Tests the report of a cart and base-prices covers the allocations
+          and the price_index of every product-type (with either backend),
+          does not build the price_tree view, and the cart still prices as
+          expected.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestMemoryReport is called. 
+        
+        Sets absolute path to tests\fixtures.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+
+    def test_product_tree_stats(self):
+        '''
+        Tests the shape of price_tree levels.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        sizes = {"small": 100, "large": 200}
+        stats = product_tree_stats({"red": sizes, "blue": dict(sizes)}, 2)
+        self.assertEqual((stats["nodes"], stats["leaves"], stats["depth"]), 
+                         (3, 4, 2))
+        self.assertEqual(stats["max_fanout"], 2)
+        self.assertEqual(stats["expansion"], 2.0)
+
+        shared = product_tree_stats({"red": sizes, "blue": sizes}, 2)
+        self.assertEqual((shared["nodes"], shared["leaves"]), (2, 2))
+        self.assertLess(shared["bytes"], stats["bytes"])
+
+        self.assertEqual(product_tree_stats(1000, 1)["depth"], 0)
+
+    def test_memory_report(self):
+        '''
+        Tests the report of the sample cart and base-prices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        json_prices = join(self.abs_path, "base-prices-normal.json")
+        cart, prices, report = memory_report(
+            join(self.abs_path, "cart-11356-normal.json"), json_prices)
+
+        self.assertEqual(CLIPriceCalculator(cart, prices).cart_total, 11356)
+        self.assertEqual(set(report["allocations"]), 
+                         {"cart_json", "cart_products", "prices"})
+        for allocation in report["allocations"].values():
+            self.assertGreaterEqual(allocation["peak_bytes"], 
+                                    allocation["retained_bytes"])
+
+        product_types = set(BaseProductData(json_prices).price_tree)
+        index = report["price_index"]
+        self.assertEqual(set(index["product_types"]), product_types)
+        self.assertEqual(index["totals"]["records"], prices.count)
+        self.assertEqual(index["totals"]["entries"], len(prices.price_index))
+        self.assertGreater(index["totals"]["bytes"], 0)
+        self.assertIsNone(report["price_tree"])
+        self.assertFalse(prices.price_tree_built)
+
+        _, compact, report = memory_report(
+            join(self.abs_path, "cart-11356-normal.json"), json_prices,
+            backend = "compact")
+        index = report["price_index"]
+        self.assertEqual(index["totals"]["entries"], len(compact.price_index))
+        for stats in index["product_types"].values():
+            self.assertGreater(stats["bytes"], 0)
+        self.assertIsNone(report["price_tree"])
@@ -0,0 +1,99 @@
+'''
+test_parallel.py
+To run: `python -m unittest tests.test_parallel -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.batch import price_carts
+from cli_price_calculator_pkg.parallel import price_carts_parallel
+from cli_price_calculator_pkg.product_data import BaseProductData
+
+class TestParallel(unittest.TestCase):
+    '''
+    Testing file for parallel pricing (parallel.py) in main package 
+    cli_price_calculator_pkg.
+
+    Cases:
+        - Tests pricing an NDJSON corpus of carts in worker processes gives the
+          same results as the sequential batch - in order, or in any order.
+        - Tests for ValueError on non-positive workers or chunk sizes.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestParallel is called. 
+        
+        Sets absolute path to tests\fixtures, the 'normal' base-prices, and an
+        NDJSON corpus of the 'normal' carts (and an invalid one) in a 
+        temporary directory.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.temp_dir = tempfile.mkdtemp()
+        self.prices = BaseProductData(join(self.abs_path, 
+                                           "base-prices-normal.json"))
+
+        with open(join(self.abs_path, "NORMAL_FILES.json"), "r") as f:
+            normal_cart_files = json.load(f)["cart_files"]
+
+        self.corpus = join(self.temp_dir, "carts.ndjson")
+        with open(self.corpus, "w") as corpus_f:
+            for index in range(25):
+                cart_file = normal_cart_files[index % len(normal_cart_files)]
+                with open(join(self.abs_path, f"{cart_file}.json"), "r") as f:
+                    corpus_f.write(json.dumps(json.load(f)) + "\n")
+            corpus_f.write("[{\"product-type\": \"unknown\"}]\n")
+
+    @classmethod
+    def tearDownClass(self):
+        '''
+        Removes the temporary directory.
+        '''
+        shutil.rmtree(self.temp_dir)
+
+    def test_parallel_results(self):
+        '''
+        Tests if the parallel results (ordered and unordered) equal the 
+        sequential results.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        expected = list(price_carts(self.corpus, self.prices))
+
+        ordered = list(price_carts_parallel(self.corpus, self.prices, 2, 
+                                            chunk_size = 3))
+        self.assertEqual(ordered, expected)
+
+        unordered = list(price_carts_parallel(self.corpus, self.prices, 2, 
+                                              chunk_size = 2, ordered = False))
+        self.assertEqual(sorted(unordered, key = lambda result: result["cart"]),
+                         expected)
+
+    def test_invalid_arguments(self):
+        '''
+        Tests if ValueError is raised for non-positive workers or chunk sizes.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        with self.assertRaises(ValueError):
+            price_carts_parallel(self.corpus, self.prices, 0)
+        with self.assertRaises(ValueError):
+            price_carts_parallel(self.corpus, self.prices, 2, chunk_size = 0)
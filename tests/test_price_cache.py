@@ -0,0 +1,96 @@
+'''
+test_price_cache.py
+To run: `python -m unittest tests.test_price_cache -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.exceptions import SchemaException
+from cli_price_calculator_pkg.cart_product import CartProduct
+from cli_price_calculator_pkg.price_cache import PriceCache
+from cli_price_calculator_pkg.product_data import BaseProductData
+
+class TestPriceCache(unittest.TestCase):
+    '''
+    Testing file for class PriceCache in main package cli_price_calculator_pkg.
+
+    Cases:
+        - Tests least-recently-used eviction and the hit/miss/eviction 
+          counters.
+        - Tests BaseProductData memoises base-prices and misses, and clears 
+          the cache on reload.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestPriceCache is called. 
+        
+        Sets absolute path to tests\fixtures.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+
+    def test_lru_eviction(self):
+        '''
+        Tests if the least recently used key is evicted once the cache is 
+        full, and if the counters record it.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        cache = PriceCache(2)
+        cache.put(("sticker", "small"), 221)
+        cache.put(("sticker", "medium"), 583)
+
+        # Touch small -> medium is now least recently used
+        self.assertEqual(cache.get(("sticker", "small")), 221)
+        cache.put(("sticker", "large"), 1000)
+
+        self.assertIsNone(cache.get(("sticker", "medium")))
+        self.assertEqual(cache.get(("sticker", "large")), 1000)
+        self.assertEqual(cache.stats(), {"size": 2, "max_size": 2, "hits": 2,
+                                         "misses": 1, "evictions": 1})
+
+        with self.assertRaises(ValueError):
+            PriceCache(0)
+
+    def test_product_data_cache(self):
+        '''
+        Tests if BaseProductData with a cache returns the same base-prices,
+        caches misses (still raising SchemaException), and clears the cache
+        on reload.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        base_prices = BaseProductData(join(self.abs_path, 
+                                           "base-prices-normal.json"),
+                                      cache_size = 8)
+        sticker = CartProduct("sticker", {"size": "xl"}, 10, 1)
+        unknown = CartProduct("sticker", {"size": "tiny"}, 10, 1)
+
+        for _ in range(3):
+            self.assertEqual(base_prices.cart_product_base_price(sticker), 1417)
+            with self.assertRaises(SchemaException):
+                base_prices.cart_product_base_price(unknown)
+
+        cache = base_prices.cache
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (4, 2, 2))
+
+        base_prices.reload()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(base_prices.cart_product_base_price(sticker), 1417)
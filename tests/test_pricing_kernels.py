@@ -0,0 +1,95 @@
+'''
+test_pricing_kernels.py
+To run: `python -m unittest tests.test_pricing_kernels -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import json
+import random
+import unittest
+from os.path import join
+from cli_price_calculator_pkg import pricing_kernels
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+
+class TestPricingKernels(unittest.TestCase):
+    '''
+    Testing file for the pricing kernels (pricing_kernels.py) in main package 
+    cli_price_calculator_pkg.
+
+    Cases:
+        - Tests the numpy engine (or its fallback) totals the 'normal' test 
+          cart files as expected.
+        - Tests the numpy kernel matches the python kernel on random columns,
+          including markups rounding half-way (half to even).
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestPricingKernels is called. 
+        
+        Sets absolute path to tests\fixtures.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+
+    def test_numpy_engine_totals(self):
+        '''
+        Tests if the numpy engine - or the python kernel it falls back to - 
+        totals the 'normal' carts as expected.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        with open(join(self.abs_path, "NORMAL_FILES.json"), "r") as f:
+            normal_cart_files = json.load(f)["cart_files"]
+        prices = BaseProductData(join(self.abs_path, "base-prices-normal.json"))
+
+        for cart_file in normal_cart_files:
+            cart = Cart(join(self.abs_path, f"{cart_file}.json"))
+            with open(join(self.abs_path, f"{cart_file}-expected.json"), "r") as f:
+                expected_total = json.load(f)["total_price"]
+
+            calculator = CLIPriceCalculator(cart, prices, engine = "numpy")
+            self.assertEqual(calculator.cart_total, expected_total)
+
+    @unittest.skipUnless(pricing_kernels.numpy, "numpy is not installed")
+    def test_numpy_matches_python(self):
+        '''
+        Tests if the numpy kernel reproduces the python kernel exactly, for 
+        random columns and for markups of exactly half a cent (rounded half
+        to even).
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        rng = random.Random(14)
+        base_prices = [rng.randrange(1, 100000) for _ in range(50)] + [50, 150]
+        key_ids = [rng.randrange(len(base_prices)) for _ in range(10000)]
+        markups = [rng.randrange(0, 200) for _ in key_ids]
+        quantities = [rng.randrange(1, 20) for _ in key_ids]
+
+        # 50 * 1% = 0.5 -> 0, 150 * 1% = 1.5 -> 2
+        key_ids += [50, 51]
+        markups += [1, 1]
+        quantities += [1, 1]
+
+        self.assertEqual(
+            pricing_kernels.total_cents_numpy(base_prices, key_ids, markups, 
+                                              quantities),
+            pricing_kernels.total_cents_python(base_prices, key_ids, markups, 
+                                               quantities))
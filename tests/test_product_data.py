@@ -10,7 +10,9 @@ import os
 from os.path import join
 from cli_price_calculator_pkg.exceptions import SchemaException
 from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.cart_product import CartProduct
 from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.compact_index import CompactPriceIndex
 
 class TestProductData(unittest.TestCase):
     '''
@@ -25,6 +27,22 @@ class TestProductData(unittest.TestCase):
           products in cart-base-values-custom_option.json
         - Tests for SchemaException in the case a product (with same options)
           is encountered in base-prices with different prices.
+        - Tests the compiled price_index against every route in the price_tree.
+        - Tests for SchemaException on unknown product-types and option values.
+        - Tests lazy mode only generates the looked up product-types, and 
+          matches the eager price_tree once fully generated.
+        - Tests the compact backend has the same price_tree view and 
+          base-prices as the dict backend, keeps the last base-price of a
+          repeated option-less product as it does, and raises on conflicts.
+        - Tests the compact backend keeps sparse tables as dict entries, with
+          the same lookups and conflict detection.
+        - Tests compiling decoded base-price products (from_records()) gives
+          the base-prices of the JSON, and cannot be reloaded.
+        - Tests sharing identical subtrees keeps the price_tree and lookups
+          unchanged, shares levels of the price_tree view and values of the
+          price_index, and makes shared levels immutable.
+        - Tests generating the price_tree in worker processes is identical to
+          the serial generation, and raises on conflicts.
     '''
     @classmethod
     def setUpClass(self):
@@ -85,3 +103,267 @@ class TestProductData(unittest.TestCase):
         base_prices = join(self.abs_path, "base-prices-repeated_val.json")
         with self.assertRaises(SchemaException):
             BaseProductData(base_prices)
+
+    def test_price_index_matches_tree(self):
+        '''
+        Tests if every base-price in price_index is reachable at the same 
+        route in price_tree and that no route is missing from price_index.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        base_prices = BaseProductData(join(self.abs_path, 
+                                           "base-prices-custom_option.json"))
+        for key, base_price in base_prices.price_index.items():
+            level = base_prices.price_tree
+            for option in key:
+                level = level[option]
+            self.assertEqual(level, base_price)
+
+        # hoodie: 2 colours x 6 sizes x 2 genders, sticker: 4, leggings: 1
+        self.assertEqual(len(base_prices.price_index), 29)
+        self.assertEqual(base_prices.option_keys["hoodie"], 
+                         ("colour", "gender", "size"))
+
+    def test_unknown_product_exception(self):
+        '''
+        Tests if SchemaException is raised for a CartProduct with an unknown
+        product-type or option value.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        base_prices = BaseProductData(join(self.abs_path, 
+                                           "base-prices-normal.json"))
+        unknown_type = CartProduct("mug", {"size": "small"}, 10, 1)
+        unknown_option = CartProduct("sticker", {"size": "tiny"}, 10, 1)
+
+        with self.assertRaises(SchemaException):
+            base_prices.cart_product_base_price(unknown_type)
+        with self.assertRaises(SchemaException):
+            base_prices.cart_product_base_price(unknown_option)
+
+    def test_lazy_generation(self):
+        '''
+        Tests if lazy BaseProductData generates only the product-types looked
+        up, with the same base-prices, and raises SchemaException for
+        conflicting base-prices only once that product-type is looked up.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        test_prices = join(self.abs_path, "base-prices-custom_option.json")
+        eager = BaseProductData(test_prices)
+        lazy = BaseProductData(test_prices, lazy = True)
+        self.assertEqual(lazy.count, eager.count)
+        self.assertEqual(lazy.pending_product_types, 
+                         ["hoodie", "sticker", "leggings"])
+
+        sticker = CartProduct("sticker", {"size": "medium"}, 10, 1)
+        self.assertEqual(lazy.cart_product_base_price(sticker), 583)
+        self.assertEqual(lazy.pending_product_types, ["hoodie", "leggings"])
+
+        # Full structure requested -> remaining product-types generated
+        self.assertEqual(lazy.price_tree, eager.price_tree)
+        self.assertEqual(lazy.pending_product_types, [])
+
+        repeated = BaseProductData(join(self.abs_path, 
+                                        "base-prices-repeated_val.json"),
+                                   lazy = True)
+        hoodie = CartProduct("hoodie", {"size": "small", "colour": "white"}, 
+                             10, 1)
+        with self.assertRaises(SchemaException):
+            repeated.cart_product_base_price(hoodie)
+
+    def test_compact_backend(self):
+        '''
+        Tests if the compact backend resolves the same base-prices as the 
+        dict backend, exposes the same price_tree and relevant_options views,
+        keeps the last base-price of a repeated option-less product like the
+        dict backend, and raises SchemaException for conflicting base-prices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        for prices_file in ["base-prices-normal.json", 
+                            "base-prices-custom_option.json"]:
+            test_prices = join(self.abs_path, prices_file)
+            dict_prices = BaseProductData(test_prices)
+            compact_prices = BaseProductData(test_prices, backend = "compact")
+
+            self.assertEqual(compact_prices.price_tree, dict_prices.price_tree)
+            self.assertEqual(compact_prices.relevant_options, 
+                             dict_prices.relevant_options)
+            self.assertEqual(dict(compact_prices.price_index.items()),
+                             dict_prices.price_index)
+
+        cart = Cart(join(self.abs_path, "cart-base-values-custom_option.json"))
+        self.assertEqual([compact_prices.cart_product_base_price(product) \
+                            for product in cart.products], [3500, 583, 5000])
+
+        repeated = [{"product-type": "mug", "options": {}, "base-price": 100},
+                    {"product-type": "mug", "options": {}, "base-price": 200},
+                    {"product-type": "hoodie", "options": {"size": ["small"]}, 
+                     "base-price": 3800}]
+        for backend in BaseProductData.BACKENDS:
+            prices = BaseProductData.from_records(repeated, backend = backend)
+            self.assertEqual(dict(prices.price_index.items()), 
+                             {("mug",): 200, ("hoodie", "small"): 3800})
+
+        with self.assertRaises(SchemaException):
+            BaseProductData(join(self.abs_path, "base-prices-repeated_val.json"),
+                            backend = "compact")
+
+    def test_compact_sparse_table(self):
+        '''
+        Tests if a CompactPriceIndex table filled by few of the combinations
+        of its option-values (one "sku" per base-price product) falls back to
+        dict entries, with the same lookups and conflict detection.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        price_index = CompactPriceIndex()
+        for sku in range(20):
+            price_index.add("mug", [("colour", [f"c{sku}"]), \
+                                    ("size", [f"s{sku}"])], 100 + sku)
+        price_index.compile("mug")
+
+        self.assertEqual(len(price_index), 20)
+        self.assertEqual(price_index[("mug", "c3", "s3")], 103)
+        self.assertIsNone(price_index.get(("mug", "c3", "s4")))
+        self.assertEqual(dict(price_index.items()), 
+                         {("mug", f"c{sku}", f"s{sku}"): 100 + sku \
+                            for sku in range(20)})
+
+        price_index.add("cap", [("colour", ["c0"]), ("size", ["s0"])], 1)
+        for sku in range(20):
+            price_index.add("cap", [("colour", [f"c{sku}"]), \
+                                    ("size", [f"s{sku}"])], 2)
+        with self.assertRaises(SchemaException):
+            price_index.compile("cap")
+
+    def test_from_records(self):
+        '''
+        Tests if BaseProductData.from_records() compiles decoded base-price
+        products into the same price_index and price_tree as the JSON, and
+        raises ValueError on reload.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        test_prices = join(self.abs_path, "base-prices-custom_option.json")
+        with open(test_prices, "r") as prices_f:
+            price_products = json.load(prices_f)
+
+        json_prices = BaseProductData(test_prices)
+        for backend in BaseProductData.BACKENDS:
+            prices = BaseProductData.from_records(price_products, \
+                                                  backend = backend)
+            self.assertEqual(dict(prices.price_index.items()), 
+                             json_prices.price_index)
+            self.assertEqual(prices.price_tree, json_prices.price_tree)
+            self.assertEqual(prices.count, json_prices.count)
+
+        with self.assertRaises(ValueError):
+            prices.reload()
+
+    def test_share_subtrees(self):
+        '''
+        Tests if share_subtrees() leaves the price_tree and base-prices 
+        unchanged while sharing identical levels (every colour of t-shirt and
+        hoodie has the same sizes at the same base-prices), and if shared 
+        levels refuse mutation.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        test_prices = join(self.abs_path, "base-prices-shared_subtrees.json")
+        expected = BaseProductData(test_prices)
+        base_prices = BaseProductData(test_prices)
+        report = base_prices.share_subtrees()
+
+        # The view was not built (nor rebuilt) - only the price_index shared
+        self.assertNotIn("levels_before", report)
+        self.assertLess(report["index_bytes_after"], 
+                        report["index_bytes_before"])
+        self.assertEqual(report["bytes_saved"], 
+                         report["index_bytes_before"] - 
+                         report["index_bytes_after"])
+        self.assertEqual(base_prices.price_tree, expected.price_tree)
+        self.assertEqual(base_prices.price_index, expected.price_index)
+
+        # Built view - t-shirt: 1 + 3 colours, hoodie: 1 + 2 colours, 
+        # sticker: 1 -> t-shirt, hoodie, one shared colour level, sticker
+        built = BaseProductData(test_prices)
+        built.price_tree
+        report = built.share_subtrees()
+        self.assertEqual(report["levels_before"], 8)
+        self.assertEqual(report["levels_after"], 4)
+        self.assertGreater(report["bytes_saved"], 
+                           report["index_bytes_before"] - 
+                           report["index_bytes_after"])
+        self.assertIs(base_prices.price_tree["t-shirt"]["navy"],
+                      base_prices.price_tree["hoodie"]["white"])
+
+        hoodie = CartProduct("hoodie", {"size": "xl", "colour": "dark"}, 10, 1)
+        self.assertEqual(base_prices.cart_product_base_price(hoodie), 2400)
+
+        with self.assertRaises(TypeError):
+            base_prices.price_tree["hoodie"]["white"]["small"] = 1
+
+    def test_parallel_generation(self):
+        '''
+        Tests if generating the price_tree in worker processes gives the same
+        price_tree (including key order), relevant_options, price_index and 
+        count as the serial generation, and raises SchemaException for 
+        conflicting base-prices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        test_prices = join(self.abs_path, "base-prices-custom_option.json")
+        serial = BaseProductData(test_prices)
+        parallel = BaseProductData(test_prices, workers = 2)
+
+        self.assertEqual(str(parallel), str(serial))
+        self.assertEqual(parallel.relevant_options, serial.relevant_options)
+        self.assertEqual(list(parallel.price_index.items()), 
+                         list(serial.price_index.items()))
+        self.assertEqual(parallel.count, serial.count)
+
+        with self.assertRaises(SchemaException):
+            BaseProductData(join(self.abs_path, "base-prices-repeated_val.json"),
+                            workers = 2)
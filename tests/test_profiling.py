@@ -0,0 +1,94 @@
+'''
+test_profiling.py
+To run: `python -m unittest tests.test_profiling -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import unittest
+from os.path import join
+from cli_price_calculator_pkg import profiling
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.cart_product import CartProduct
+from cli_price_calculator_pkg.exceptions import SchemaException
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.cli_price_calculator import CLIPriceCalculator
+
+class TestProfiling(unittest.TestCase):
+    '''
+    Testing file for the instrumentation layer (profiling.py) in main 
+    package cli_price_calculator_pkg.
+
+    Cases:
+        - Tests a disabled profiler leaves the lookup uninstrumented.
+        - Tests a profiled run reports the time of every phase, and counts
+          of cart items, lookups, misses and tree nodes, with a latency
+          histogram of the lookups.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestProfiling is called. 
+        
+        Sets absolute path to tests\fixtures.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+
+    def test_disabled(self):
+        '''
+        Tests the instrumentation points are no-ops while disabled.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        self.assertIsNone(profiling.get_profiler())
+        lookup = len
+        self.assertIs(profiling.instrument_lookup(lookup), lookup)
+        self.assertIs(profiling.phase("pricing"), profiling.phase("total"))
+        profiling.count("lookups")
+
+    def test_profiled_run(self):
+        '''
+        Tests the report of a profiled run.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        with profiling.profile(histogram = True) as profiler:
+            cart = Cart(join(self.abs_path, "cart-11356-normal.json"))
+            prices = BaseProductData(join(self.abs_path, 
+                                          "base-prices-normal.json"))
+            CLIPriceCalculator(cart, prices)
+            lookup = profiling.instrument_lookup(prices.cart_product_base_price)
+            with self.assertRaises(SchemaException):
+                lookup(CartProduct("unknown", {}, 0, 1))
+        self.assertIsNone(profiling.get_profiler())
+
+        report = profiler.report()
+        self.assertIn("stdlib", report["json_decoders"]["arrays"])
+        for phase in ("cart_load", "prices_load", "pricing"):
+            self.assertEqual(report["phases"][phase]["calls"], 1)
+            self.assertGreaterEqual(report["phases"][phase]["wall_seconds"], 0)
+
+        counters = report["counters"]
+        self.assertEqual(counters["cart_items"], cart.get_count())
+        self.assertEqual(counters["lookups"], cart.get_count() + 1)
+        self.assertEqual(counters["lookup_misses"], 1)
+        self.assertEqual(counters["price_records"], prices.count)
+        self.assertEqual(counters["index_entries"], len(prices.price_index))
+        self.assertGreater(counters["tree_leaves"], 0)
+        self.assertEqual(sum(report["lookup_latency_ns"].values()), 
+                         counters["lookups"])
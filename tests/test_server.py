@@ -0,0 +1,140 @@
+'''
+test_server.py
+To run: `python -m unittest tests.test_server -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.server import PricingServer, parse_address
+from cli_price_calculator_pkg.product_data import BaseProductData
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    '''
+    Testing file for the pricing daemon (server.py) in main package 
+    cli_price_calculator_pkg.
+
+    Cases:
+        - Tests carts sent over a Unix socket are priced as expected, with an
+          optional per-line breakdown, and bad requests get an error.
+        - Tests the catalog is hot-swapped by a reload request, and the
+          replaced (snapshot-mapped) base-prices are closed.
+        - Tests a profile request without an enabled profiler is an error.
+        - Tests parsing of TCP and Unix socket addresses.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestServer is called. 
+        
+        Sets absolute path to tests\fixtures and a temporary directory.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+        self.temp_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(self):
+        '''
+        Removes the temporary directory.
+        '''
+        shutil.rmtree(self.temp_dir)
+
+    async def request(self, reader, writer, request):
+        '''
+        Sends a request line and returns the decoded response line.
+        '''
+        writer.write((request if isinstance(request, bytes) 
+                      else json.dumps(request).encode()) + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    async def test_pricing_requests(self):
+        '''
+        Tests totals, breakdowns, errors and a catalog reload over a Unix 
+        socket.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        json_prices = join(self.temp_dir, "base-prices.json")
+        shutil.copy(join(self.abs_path, "base-prices-normal.json"), json_prices)
+        with open(join(self.abs_path, "cart-4560-normal.json"), "r") as f:
+            cart = json.load(f)
+
+        # Resident base-prices mapped from a snapshot
+        snapshot = join(self.temp_dir, "prices.snap")
+        BaseProductData(json_prices, snapshot = snapshot)
+        server = PricingServer(json_prices, max_concurrent = 2, \
+                               snapshot = snapshot)
+        address = join(self.temp_dir, "pricing.sock")
+        listening = await server.start(address)
+        reader, writer = await asyncio.open_unix_connection(address)
+        try:
+            self.assertEqual(await self.request(reader, writer, cart), 
+                             {"total": 4560})
+
+            response = await self.request(reader, writer, 
+                                          {"cart": cart, "breakdown": True})
+            self.assertEqual(response["total"], 4560)
+            self.assertEqual(sum(line["line_total"] for line in 
+                                 response["lines"]), 4560)
+
+            self.assertIn("error", await self.request(reader, writer, b"nope"))
+            self.assertIn("error", await self.request(reader, writer, 
+                [{"product-type": "unknown", "options": {}, 
+                  "artist-markup": 0, "quantity": 1}]))
+
+            # Hot-swap to another catalog
+            resident = server.prices
+            shutil.copy(join(self.abs_path, "base-prices-custom_option.json"),
+                        json_prices)
+            response = await self.request(reader, writer, 
+                                          {"command": "reload"})
+            self.assertTrue(response["reloaded"])
+            self.assertIsNot(server.prices, resident)
+            self.assertEqual(server.prices.count, response["count"])
+            # Closed - its snapshot mapping is released
+            with self.assertRaises(TypeError):
+                resident.price_index.items()
+            self.assertEqual(await self.request(reader, writer, 
+                [{"product-type": "leggings", "options": {"size": "small"}, 
+                  "artist-markup": 0, "quantity": 1}]), {"total": 5000})
+
+            # No profiler enabled
+            self.assertIn("error", await self.request(reader, writer, 
+                                                      {"command": "profile"}))
+        finally:
+            writer.close()
+            listening.close()
+            await listening.wait_closed()
+            server.close()
+
+    def test_parse_address(self):
+        '''
+        Tests TCP (HOST:PORT, :PORT) and Unix socket addresses are told apart.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        self.assertEqual(parse_address(":8765"), ("tcp", "127.0.0.1", 8765))
+        self.assertEqual(parse_address("localhost:80"), ("tcp", "localhost", 80))
+        self.assertEqual(parse_address("/tmp/pricing.sock"), 
+                         ("unix", "/tmp/pricing.sock"))
@@ -0,0 +1,89 @@
+'''
+test_shared_prices.py
+To run: `python -m unittest tests.test_shared_prices -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import unittest
+import multiprocessing
+from os.path import join
+from concurrent.futures import ProcessPoolExecutor
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.shared_prices import SharedPriceTable
+
+def worker_base_prices(name, cart_file):
+    '''
+    Worker - attaches to the shared price table and returns the base-prices
+    of the products in cart_file.
+
+    Args:
+        name (str): Shared memory segment name.
+        cart_file (str): Path to a cart JSON.
+    Returns:
+        ([int]): Base-prices of the cart products.
+    '''
+    prices = BaseProductData.attach_shared(name)
+    try:
+        return [prices.cart_product_base_price(product) \
+                    for product in Cart(cart_file).products]
+    finally:
+        prices.close()
+
+class TestSharedPrices(unittest.TestCase):
+    '''
+    Testing file for class SharedPriceTable in main package 
+    cli_price_calculator_pkg.
+
+    (The tests are conducted for sample test cart and base-price files stored 
+    in fixtures.)
+
+    Cases:
+        - Tests base-prices attached from shared memory match the JSON-built 
+          ones, in the owning process and in worker processes.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestSharedPrices is called. 
+        
+        Sets absolute path to tests\fixtures.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+
+    def test_attach_shared(self):
+        '''
+        Tests if BaseProductData attached to a SharedPriceTable resolves the
+        same base-prices and exposes the same price_tree, count and 
+        relevant_options as the published BaseProductData.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        prices = BaseProductData(join(self.abs_path, 
+                                      "base-prices-custom_option.json"))
+        cart_file = join(self.abs_path, "cart-base-values-custom_option.json")
+
+        with SharedPriceTable(prices) as table:
+            attached = BaseProductData.attach_shared(table.name)
+            self.assertEqual(attached.price_tree, prices.price_tree)
+            self.assertEqual(attached.count, prices.count)
+            self.assertEqual(attached.relevant_options, prices.relevant_options)
+            attached.close()
+
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(2, mp_context = context) as executor:
+                results = list(executor.map(worker_base_prices, 
+                                            [table.name] * 2, [cart_file] * 2))
+
+        self.assertEqual(results, [[3500, 583, 5000]] * 2)
@@ -0,0 +1,244 @@
+'''
+test_snapshot.py
+To run: `python -m unittest tests.test_snapshot -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.snapshot import SnapshotPriceIndex, \
+                                             load_snapshot, write_snapshot, \
+                                             source_fingerprint
+
+# Memory mappings of the process (Linux)
+PROC_MAPS = "/proc/self/maps"
+
+class TestSnapshot(unittest.TestCase):
+    '''
+    Testing file for base-prices snapshots (snapshot.py) in main package
+    cli_price_calculator_pkg.
+
+    (The tests are conducted on copies of sample base-price files stored in
+    fixtures.)
+
+    Cases:
+        - Tests base-prices loaded from a snapshot match the JSON-built ones.
+        - Tests a snapshot is rebuilt once the base-prices JSON changes.
+        - Tests corrupt and stale snapshots are rejected without leaving the
+          snapshot mapped.
+        - Tests base-prices a snapshot cannot store are loaded without one.
+        - Tests a failed snapshot write leaves no temporary file behind.
+        - Tests base-prices JSON changed during the build is not stamped on
+          the snapshot of what was read.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestSnapshot is called.
+
+        Sets absolute path to tests\fixtures.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+
+    def setUp(self):
+        '''
+        Copies base-prices-custom_option.json to a temporary directory, to be
+        snapshotted (and modified) by each test.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.temp_dir = tempfile.mkdtemp()
+        self.prices = join(self.temp_dir, "base-prices.json")
+        self.snapshot = join(self.temp_dir, "base-prices.snapshot")
+        shutil.copy(join(self.abs_path, "base-prices-custom_option.json"),
+                    self.prices)
+
+    def tearDown(self):
+        '''
+        Removes the temporary directory of the test.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        shutil.rmtree(self.temp_dir)
+
+    ################################  TESTS  ##################################
+
+    def test_snapshot_round_trip(self):
+        '''
+        Tests if base-prices loaded from a snapshot have the same price_tree,
+        count, relevant_options and base-prices as the JSON-built ones.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        built = BaseProductData(self.prices, snapshot = self.snapshot)
+        self.assertTrue(os.path.exists(self.snapshot))
+
+        loaded = BaseProductData(self.prices, snapshot = self.snapshot)
+        self.assertIsInstance(loaded.price_index, SnapshotPriceIndex)
+        self.assertEqual(loaded.price_tree, built.price_tree)
+        self.assertEqual(loaded.count, built.count)
+        self.assertEqual(loaded.relevant_options, built.relevant_options)
+
+        cart = Cart(join(self.abs_path, "cart-base-values-custom_option.json"))
+        self.assertEqual([loaded.cart_product_base_price(product) \
+                            for product in cart.products], [3500, 583, 5000])
+
+    def test_stale_snapshot_rebuilt(self):
+        '''
+        Tests if a snapshot is ignored and rewritten once the base-prices JSON
+        it was compiled from changes.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        BaseProductData(self.prices, snapshot = self.snapshot)
+
+        with open(self.prices, "r") as f:
+            content = f.read()
+        with open(self.prices, "w") as f:
+            f.write(content.replace('"base-price": 5000', '"base-price": 5100'))
+
+        rebuilt = BaseProductData(self.prices, snapshot = self.snapshot)
+        self.assertIsInstance(rebuilt.price_index, dict)
+        self.assertEqual(rebuilt.price_tree["leggings"]["small"], 5100)
+
+        reloaded = BaseProductData(self.prices, snapshot = self.snapshot)
+        self.assertIsInstance(reloaded.price_index, SnapshotPriceIndex)
+        self.assertEqual(reloaded.price_tree["leggings"]["small"], 5100)
+
+    def mapped(self, path):
+        '''
+        Returns whether path is memory-mapped by the process.
+        '''
+        with open(PROC_MAPS, "r") as maps_f:
+            return any(line.rstrip("\n").endswith(path) for line in maps_f)
+
+    @unittest.skipUnless(os.path.exists(PROC_MAPS), "no /proc/self/maps")
+    def test_rejected_snapshot_unmapped(self):
+        '''
+        Tests if a stale, and a corrupt, snapshot are rejected by 
+        load_snapshot() and left unmapped.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        BaseProductData(self.prices, snapshot = self.snapshot)
+        other = join(self.abs_path, "base-prices-normal.json")
+        self.assertIsNone(load_snapshot(self.snapshot, other))
+        self.assertFalse(self.mapped(self.snapshot))
+
+        with open(self.snapshot, "r+b") as snapshot_f:
+            snapshot_f.write(b"JUNK")
+        self.assertIsNone(load_snapshot(self.snapshot, self.prices))
+        self.assertFalse(self.mapped(self.snapshot))
+
+        # Valid again - mapped until closed
+        BaseProductData(self.prices, snapshot = self.snapshot)
+        compiled = load_snapshot(self.snapshot, self.prices)
+        self.assertTrue(self.mapped(self.snapshot))
+        compiled[0].close()
+        self.assertFalse(self.mapped(self.snapshot))
+
+    def test_unsnapshottable_base_price(self):
+        '''
+        Tests if base-prices with a non-integer base-price are still loaded
+        from the JSON, without writing a snapshot.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        with open(self.prices, "r") as f:
+            content = f.read()
+        with open(self.prices, "w") as f:
+            f.write(content.replace('"base-price": 5000', 
+                                    '"base-price": 5000.5'))
+
+        prices = BaseProductData(self.prices, snapshot = self.snapshot)
+        self.assertEqual(prices.price_tree["leggings"]["small"], 5000.5)
+        self.assertFalse(os.path.exists(self.snapshot))
+
+    def test_failed_write_cleaned_up(self):
+        '''
+        Tests if a snapshot that cannot replace its path (a directory) raises
+        OSError without leaving its temporary file behind.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        os.mkdir(self.snapshot)
+        with self.assertRaises(OSError):
+            write_snapshot(self.snapshot, {("sticker", "xl"): 1417}, 
+                           {"sticker": ["size"]}, 1, 
+                           source_fingerprint(self.prices))
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), 
+                         ["base-prices.json", "base-prices.snapshot"])
+
+    def test_changed_during_build(self):
+        '''
+        Tests if base-prices JSON replaced while it is streamed into the 
+        build does not validate a snapshot of the old base-prices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        prices_path = self.prices
+        with open(prices_path, "r") as f:
+            changed = f.read().replace('"base-price": 5000', 
+                                       '"base-price": 5100')
+
+        class ChangingPrices(BaseProductData):
+            def _BaseProductData__load_prices(self):
+                price_products = list(super()._BaseProductData__load_prices())
+                # Replaced once read - ex. by a concurrent deploy
+                with open(prices_path, "w") as f:
+                    f.write(changed)
+                os.utime(prices_path, ns = (1, 1))
+                yield from price_products
+
+        old = ChangingPrices(prices_path, snapshot = self.snapshot)
+        self.assertEqual(old.price_tree["leggings"]["small"], 5000)
+
+        loaded = BaseProductData(prices_path, snapshot = self.snapshot)
+        self.assertIsInstance(loaded.price_index, dict)
+        self.assertEqual(loaded.price_tree["leggings"]["small"], 5100)
@@ -0,0 +1,126 @@
+'''
+test_validators.py
+To run: `python -m unittest tests.test_validators -v`(from top-level folder)
+
+More information in README.
+'''
+import os
+import json
+import unittest
+from os.path import join
+from cli_price_calculator_pkg.exceptions import ValidationException, \
+                                               SchemaException
+from cli_price_calculator_pkg.cart import Cart
+from cli_price_calculator_pkg.product_data import BaseProductData
+from cli_price_calculator_pkg.validators import get_validator, CART_SCHEMA, \
+                                               BASE_PRICES_SCHEMA, SCHEMA_DIR
+
+class TestValidators(unittest.TestCase):
+    '''
+    Testing file for class SchemaValidator in main package 
+    cli_price_calculator_pkg.
+
+    (The tests are conducted for sample test cart and base-price files stored 
+    in fixtures.)
+
+    Cases:
+        - Tests all supplied cart and base-prices files are valid.
+        - Tests invalid cart and base-prices files are rejected with the 
+          indices of all offending records.
+        - Tests the packaged schemas match the Schema/ contracts, and a
+          missing schema raises SchemaException.
+    '''
+    @classmethod
+    def setUpClass(self):
+        '''
+        Runs once when TestValidators is called. 
+        
+        Sets absolute path to tests\fixtures.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        '''
+        self.abs_path = join(os.getcwd(), "tests", "fixtures")
+
+    def test_valid_fixtures(self):
+        '''
+        Tests if every cart and base-prices fixture (other than the invalid
+        ones) passes validation.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        for file_name in sorted(os.listdir(self.abs_path)):
+            if "expected" in file_name or "invalid" in file_name:
+                continue
+            if file_name.startswith("cart-"):
+                schema = CART_SCHEMA
+            elif file_name.startswith("base-prices-"):
+                schema = BASE_PRICES_SCHEMA
+            else:
+                continue
+
+            with open(join(self.abs_path, file_name), "r") as f:
+                records = json.load(f)
+            # cart-0-empty.json is an empty object rather than an array
+            if not isinstance(records, list):
+                continue
+
+            count = len(records)
+            self.assertEqual(get_validator(schema).validate_file(
+                                join(self.abs_path, file_name)), count)
+
+    def test_invalid_records(self):
+        '''
+        Tests if invalid cart and base-prices files raise ValidationException
+        for all (and only the) offending record indices.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        with self.assertRaises(ValidationException) as context:
+            Cart(join(self.abs_path, "cart-invalid_records.json"), 
+                 validate = True)
+        self.assertEqual([index for index, _ in context.exception.errors], 
+                         [1, 3])
+
+        with self.assertRaises(ValidationException) as context:
+            BaseProductData(join(self.abs_path, 
+                                 "base-prices-invalid_records.json"), 
+                            validate = True)
+        self.assertEqual([index for index, _ in context.exception.errors], 
+                         [1, 2])
+        self.assertIn("[2] record['options']: expected object", 
+                      context.exception.message)
+
+    def test_packaged_schemas(self):
+        '''
+        Tests the schemas installed with the package are the Schema/ 
+        contracts, and a missing schema is a SchemaException.
+
+        Args:
+            (self)
+        Returns:
+            None.
+        Raises:
+            AssertionError: if test fails.
+        '''
+        for schema in (CART_SCHEMA, BASE_PRICES_SCHEMA):
+            with open(schema, "r") as f:
+                packaged = json.load(f)
+            with open(join(os.getcwd(), "Schema", os.path.basename(schema)), 
+                      "r") as f:
+                self.assertEqual(packaged, json.load(f))
+
+        with self.assertRaises(SchemaException):
+            get_validator(join(SCHEMA_DIR, "missing.schema.json"))